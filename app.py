@@ -3,7 +3,7 @@ from flask import Flask
 # from flask_session import Session  # 標準のFlaskセッションを使用
 from app.config import Config
 from app.views import Views
-from app.utils import setup_logging, cleanup_caches
+from app.utils import setup_logging
 
 def create_app():
     """Flaskアプリケーションを作成"""
@@ -63,6 +63,22 @@ def create_app():
     def api_get_user_data():
         return views.api_get_user_data()
     
+    @app.route("/api/videos")
+    def api_get_videos():
+        return views.api_get_videos()
+    
+    @app.route("/api/videos/query")
+    def api_query_videos():
+        return views.api_query_videos()
+    
+    @app.route("/api/videos/<video_id>/growth")
+    def api_video_growth(video_id):
+        return views.api_video_growth(video_id)
+    
+    @app.route("/api/account-growth")
+    def api_account_growth():
+        return views.api_account_growth()
+    
     @app.route("/api/users")
     def api_get_users():
         return views.api_get_users()
@@ -71,6 +87,34 @@ def create_app():
     def debug_session():
         return views.debug_session()
     
+    @app.route("/debug/cache")
+    def debug_cache():
+        return views.debug_cache()
+    
+    @app.route("/debug/cache/metrics")
+    def debug_cache_metrics():
+        return views.debug_cache_metrics()
+    
+    @app.route("/debug/http-pool")
+    def debug_http_pool():
+        return views.debug_http_pool()
+    
+    @app.route("/debug/rate-limits")
+    def debug_rate_limits():
+        return views.debug_rate_limits()
+    
+    @app.route("/debug/circuit-breakers")
+    def debug_circuit_breakers():
+        return views.debug_circuit_breakers()
+    
+    @app.route("/debug/singleflight")
+    def debug_singleflight():
+        return views.debug_singleflight()
+    
+    @app.route("/debug/revalidate")
+    def debug_revalidate():
+        return views.debug_revalidate()
+    
     @app.route("/upload")
     def video_upload():
         return views.video_upload()
@@ -83,14 +127,6 @@ def create_app():
     def api_upload_draft():
         return views.api_upload_draft()
     
-    # 定期的なキャッシュクリーンアップ
-    @app.before_request
-    def before_request():
-        # リクエストの10%でキャッシュクリーンアップを実行
-        import random
-        if random.random() < 0.1:
-            cleanup_caches()
-    
     return app
 
 if __name__ == "__main__":
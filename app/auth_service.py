@@ -6,6 +6,8 @@ import logging
 from flask import request, session
 from app.config import Config
 from app.services.user_manager import UserManager
+from app.services.http_client import http_client
+from app.services.utils import decode_json_response
 
 logger = logging.getLogger(__name__)
 
@@ -142,11 +144,11 @@ class AuthService:
         logger.debug(f"トークン要求 - リダイレクトURI: {self.get_redirect_uri()}")
         
         try:
-            token_res = requests.post(
+            token_res = http_client.request(
+                "POST",
                 self.config.TIKTOK_TOKEN_URL,
                 headers={"Content-Type": "application/x-www-form-urlencoded"},
-                data=token_request_data,
-                timeout=30
+                data=token_request_data
             )
             
             logger.debug(f"トークンレスポンスステータス: {token_res.status_code}")
@@ -156,7 +158,7 @@ class AuthService:
                 return None, f"Token Error: {token_res.text}"
 
             # レスポンスの詳細をデバッグ出力
-            response_json = token_res.json()
+            response_json = decode_json_response(token_res)
             logger.debug(f"トークンレスポンスJSON: {response_json}")
             
             # TikTok v2の仕様に合わせて、ルート直下からアクセス
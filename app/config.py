@@ -22,8 +22,9 @@ class Config:
     SESSION_COOKIE_DOMAIN = os.getenv("SESSION_COOKIE_DOMAIN")
     
     # TikTok API設定
-    TIKTOK_AUTH_URL = "https://www.tiktok.com/v2/auth/authorize"
-    TIKTOK_TOKEN_URL = "https://open.tiktokapis.com/v2/oauth/token/"
+    TIKTOK_AUTH_URL = os.getenv("TIKTOK_AUTH_URL", "https://www.tiktok.com/v2/auth/authorize")
+    TIKTOK_API_BASE_URL = os.getenv("TIKTOK_API_BASE_URL", "https://open.tiktokapis.com").rstrip("/")
+    TIKTOK_TOKEN_URL = f"{TIKTOK_API_BASE_URL}/v2/oauth/token/"
     
     # アプリケーション設定
     DEBUG = os.getenv("DEBUG", "True").lower() == "true"
@@ -33,6 +34,91 @@ class Config:
     DEFAULT_VIDEO_COUNT = int(os.getenv("DEFAULT_VIDEO_COUNT", "10"))
     MAX_VIDEO_COUNT = int(os.getenv("MAX_VIDEO_COUNT", "20"))
     
+    # 差分同期設定（初回同期の最大件数、既存動画の統計を更新する間隔（秒））
+    VIDEO_SYNC_MAX_VIDEOS = int(os.getenv("VIDEO_SYNC_MAX_VIDEOS", "1000"))
+    VIDEO_SYNC_REFRESH_INTERVAL = int(os.getenv("VIDEO_SYNC_REFRESH_INTERVAL", "900"))
+    
+    # 動画一覧の次ページを先読みするスレッド数（すべての取得で共有）
+    VIDEO_LIST_PREFETCH_WORKERS = int(os.getenv("VIDEO_LIST_PREFETCH_WORKERS", "4"))
+    
+    # HTTP接続プール設定
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+    HTTP_POOL_BLOCK = os.getenv("HTTP_POOL_BLOCK", "False").lower() == "true"
+    HTTP_KEEP_ALIVE = os.getenv("HTTP_KEEP_ALIVE", "True").lower() == "true"
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    # エンドポイント別の設定がない場合の読み込みタイムアウト（秒）
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+    
+    # クライアント側レート制限設定（wait: 枠が空くまで待機, fail: 即時に失敗）
+    RATE_LIMIT_MODE = os.getenv("RATE_LIMIT_MODE", "wait")
+    RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "10"))
+    
+    # 再試行設定（試行回数は初回を含む、予算は1リクエストあたりの待機時間の合計）
+    RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "8"))
+    RETRY_BUDGET_SECONDS = float(os.getenv("RETRY_BUDGET_SECONDS", "15"))
+    
+    # video/query 一括取得設定（1リクエストあたりのID数の上限は20）
+    VIDEO_QUERY_BATCH_SIZE = min(int(os.getenv("VIDEO_QUERY_BATCH_SIZE", "20")), 20)
+    VIDEO_QUERY_CONCURRENCY = int(os.getenv("VIDEO_QUERY_CONCURRENCY", "4"))
+    
+    # サーキットブレーカー設定（エンドポイント系統ごと）
+    BREAKER_WINDOW_SIZE = int(os.getenv("BREAKER_WINDOW_SIZE", "20"))
+    BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+    BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+    BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "5"))
+    BREAKER_SLOW_CALL_RATE = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.5"))
+    BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+    BREAKER_HALF_OPEN_CALLS = int(os.getenv("BREAKER_HALF_OPEN_CALLS", "2"))
+    
+    # 期限切れキャッシュをAPI障害時のフォールバック用に保持する秒数
+    CACHE_MAX_STALE = int(os.getenv("CACHE_MAX_STALE", "3600"))
+    
+    # キャッシュの保存先（memory: ワーカーごとのメモリ、sqlite: 同じホストの全ワーカーで共有するファイル）
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "data/cache.db")
+    
+    # キャッシュの値のコーデック（msgpack / json、空の場合はオブジェクトのまま保持）と圧縮（zlib / lz4 / none）
+    # おおよそのサイズがMIN_BYTES以上の値のみシリアライズし、シリアライズ後がCOMPRESS_MIN_BYTES以上なら圧縮する
+    # memoryバックエンドでは動画一覧のレコードを同期状態と共有しているため、エンコードしてもメモリは減らない
+    # （sqliteバックエンドの保存サイズを小さくする場合に使う）
+    CACHE_CODEC = os.getenv("CACHE_CODEC", "")
+    CACHE_CODEC_COMPRESSION = os.getenv("CACHE_CODEC_COMPRESSION", "zlib")
+    CACHE_CODEC_MIN_BYTES = int(os.getenv("CACHE_CODEC_MIN_BYTES", "4096"))
+    CACHE_CODEC_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_CODEC_COMPRESS_MIN_BYTES", "1024"))
+    
+    # キャッシュ統計のPrometheus形式（/debug/cache/metrics）をログインなしで取得するためのトークン（空の場合はログインが必要）
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+    
+    # キャッシュの上限（超えた場合は最も使われていないエントリから削除、0で無制限）
+    VIDEO_CACHE_MAX_ENTRIES = int(os.getenv("VIDEO_CACHE_MAX_ENTRIES", "5000"))
+    VIDEO_CACHE_MAX_MB = int(os.getenv("VIDEO_CACHE_MAX_MB", "128"))
+    PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "1000"))
+    PROFILE_CACHE_MAX_MB = int(os.getenv("PROFILE_CACHE_MAX_MB", "8"))
+    
+    # stale-while-revalidate設定（TTL後の猶予秒数の間は古い値を返して裏で更新、0で無効）
+    # 経過時間がMAX_AGEを超えたエントリは猶予内でも使わず、呼び出し元が取得を待つ
+    SWR_PROFILE_GRACE = int(os.getenv("SWR_PROFILE_GRACE", "300"))
+    SWR_PROFILE_MAX_AGE = int(os.getenv("SWR_PROFILE_MAX_AGE", "900"))
+    SWR_VIDEO_DETAIL_GRACE = int(os.getenv("SWR_VIDEO_DETAIL_GRACE", "600"))
+    SWR_VIDEO_DETAIL_MAX_AGE = int(os.getenv("SWR_VIDEO_DETAIL_MAX_AGE", "1800"))
+    SWR_VIDEO_LIST_GRACE = int(os.getenv("SWR_VIDEO_LIST_GRACE", "600"))
+    SWR_VIDEO_LIST_MAX_AGE = int(os.getenv("SWR_VIDEO_LIST_MAX_AGE", "1800"))
+    SWR_REFRESH_WORKERS = int(os.getenv("SWR_REFRESH_WORKERS", "4"))
+    
+    # 永続ストア設定（SQLiteファイルのパス、空の場合は無効）
+    STORE_PATH = os.getenv("STORE_PATH", "data/tiktok_store.db")
+    # ストアの動画を最新とみなす秒数（これより古い場合はAPIから再取得）
+    STORE_FRESH_SECONDS = int(os.getenv("STORE_FRESH_SECONDS", "600"))
+    
+    # 統計の時系列設定（生データの間隔と、解像度ごとの保持期間（秒））
+    STATS_RAW_INTERVAL = int(os.getenv("STATS_RAW_INTERVAL", "300"))
+    STATS_RAW_RETENTION = int(os.getenv("STATS_RAW_RETENTION", "172800"))
+    STATS_HOURLY_RETENTION = int(os.getenv("STATS_HOURLY_RETENTION", "2592000"))
+    STATS_DAILY_RETENTION = int(os.getenv("STATS_DAILY_RETENTION", "31536000"))
+    
     # 複数ユーザー管理設定
     MAX_USERS_PER_SESSION = int(os.getenv("MAX_USERS_PER_SESSION", "5"))
     
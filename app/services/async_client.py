@@ -0,0 +1,103 @@
+"""TikTok API非同期クライアント
+
+同期サービスと同じ結果を返す非同期版を提供し、独立したAPI呼び出しを
+同時に実行できるようにする。HTTP通信は共有の接続プール（http_client）を
+専用スレッドプール上で利用するため、キャッシュやエラー処理は同期版と共通。
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Awaitable, Callable, Iterable
+from app.config import Config
+from app.services.utils import make_tiktok_api_request
+from app.services.get_profile import get_user_profile
+from app.services.get_video_list import get_video_list, get_video_details_batch
+from app.services.get_video_details import get_video_details
+from app.services.video_upload import get_post_status
+
+logger = logging.getLogger(__name__)
+
+# 動画詳細ページでプロフィールから使うフィールド
+VIDEO_DETAIL_PROFILE_FIELDS = ("follower_count",)
+
+# 接続プールの上限を超えないように同時実行数を揃える
+_executor = ThreadPoolExecutor(max_workers=Config.HTTP_POOL_MAXSIZE, thread_name_prefix="tiktok-async")
+
+async def _run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """ブロッキング関数をスレッドプールで実行"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+async def async_make_tiktok_api_request(method: str, url: str, access_token: str,
+                                        params: Optional[Dict[str, Any]] = None,
+                                        json_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """TikTok APIリクエストを非同期で実行（make_tiktok_api_requestと同じ契約）"""
+    return await _run_blocking(make_tiktok_api_request, method, url, access_token,
+                               params=params, json_data=json_data)
+
+async def async_get_user_profile(access_token: str, fields: Optional[Iterable[str]] = None,
+                                 open_id: Optional[str] = None) -> Dict[str, Any]:
+    """ユーザープロフィール情報を非同期で取得"""
+    return await _run_blocking(get_user_profile, access_token, fields=fields, open_id=open_id)
+
+async def async_get_video_list(access_token: str, open_id: str, max_count: int = 10,
+                               incremental: bool = False) -> List[Dict[str, Any]]:
+    """動画一覧を非同期で取得"""
+    return await _run_blocking(get_video_list, access_token, open_id, max_count=max_count, incremental=incremental)
+
+async def async_get_video_details_batch(access_token: str, video_ids: List[str],
+                                        fields: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """複数の動画の詳細情報を非同期で一括取得"""
+    return await _run_blocking(get_video_details_batch, access_token, video_ids, fields=fields)
+
+async def async_get_video_details(access_token: str, video_id: str, fields: Optional[Iterable[str]] = None,
+                                  open_id: Optional[str] = None) -> Dict[str, Any]:
+    """単一動画の詳細情報を非同期で取得"""
+    return await _run_blocking(get_video_details, access_token, video_id, fields=fields, open_id=open_id)
+
+async def async_get_post_status(access_token: str, publish_id: str) -> Dict[str, Any]:
+    """投稿ステータスを非同期で取得"""
+    return await _run_blocking(get_post_status, access_token, publish_id)
+
+async def gather_api_calls(*calls: Awaitable[Any], return_exceptions: bool = False) -> List[Any]:
+    """
+    独立したAPI呼び出しを同時に実行
+
+    Args:
+        *calls: 実行するコルーチン
+        return_exceptions: Trueの場合、例外を結果として返す（Falseの場合は最初の例外を送出）
+
+    Returns:
+        引数と同じ順序の結果リスト
+    """
+    return list(await asyncio.gather(*calls, return_exceptions=return_exceptions))
+
+def run_sync(coro: Awaitable[Any]) -> Any:
+    """
+    コルーチンを同期的に実行（Flaskのビューなど同期コードからの呼び出し用）
+
+    Args:
+        coro: 実行するコルーチン
+
+    Returns:
+        コルーチンの戻り値
+    """
+    return asyncio.run(coro)
+
+def fetch_dashboard_data(access_token: str, open_id: str, max_count: int = 10,
+                         incremental: bool = False) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """ダッシュボード用のプロフィールと動画一覧を同時に取得"""
+    return run_sync(gather_api_calls(
+        async_get_user_profile(access_token, open_id=open_id),
+        async_get_video_list(access_token, open_id, max_count=max_count, incremental=incremental)
+    ))
+
+def fetch_video_detail_data(access_token: str, video_id: str,
+                            open_id: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """動画詳細ページ用の動画詳細とプロフィールを同時に取得（プロフィールはエンゲージメント率に使うフォロワー数のみ）"""
+    return run_sync(gather_api_calls(
+        async_get_video_details(access_token, video_id, open_id=open_id),
+        async_get_user_profile(access_token, fields=VIDEO_DETAIL_PROFILE_FIELDS, open_id=open_id)
+    ))
@@ -0,0 +1,112 @@
+"""ID集合をAPIのサイズ上限ごとに分割し、同時実行数を制限して取得するバッチ計画"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Iterable
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# バッチ取得専用のスレッドプール（全呼び出し元で同時実行数を共有する）
+_executor = ThreadPoolExecutor(max_workers=Config.VIDEO_QUERY_CONCURRENCY, thread_name_prefix="video-query-batch")
+
+def plan_batches(ids: Iterable[str], batch_size: int) -> List[List[str]]:
+    """
+    IDを重複を除いて順序を保ったままバッチに分割
+
+    Args:
+        ids: IDのリスト
+        batch_size: 1バッチあたりの最大件数
+
+    Returns:
+        バッチのリスト
+    """
+    unique_ids = list(dict.fromkeys(video_id for video_id in ids if video_id))
+    return [unique_ids[i:i + batch_size] for i in range(0, len(unique_ids), batch_size)]
+
+class BatchReport:
+    """バッチ取得の結果（idごとにマージした結果と各バッチの実行記録）"""
+
+    def __init__(self):
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.batches: List[Dict[str, Any]] = []
+
+    @property
+    def batch_count(self) -> int:
+        """バッチ数"""
+        return len(self.batches)
+
+    @property
+    def failed_batches(self) -> List[Dict[str, Any]]:
+        """失敗したバッチ"""
+        return [batch for batch in self.batches if batch["error"] is not None]
+
+    @property
+    def latencies_ms(self) -> List[float]:
+        """各バッチのレイテンシ（ミリ秒、バッチ順）"""
+        return [batch["latency_ms"] for batch in self.batches]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ログ・デバッグ表示用の辞書に変換"""
+        return {
+            "batch_count": self.batch_count,
+            "failed": len(self.failed_batches),
+            "result_count": len(self.results),
+            "batches": self.batches
+        }
+
+def run_batches(ids: Iterable[str], fetch: Callable[[List[str]], Dict[str, Dict[str, Any]]],
+                batch_size: Optional[int] = None, label: str = "batch") -> BatchReport:
+    """
+    IDをバッチに分割して同時に取得し、結果をidでマージ
+
+    一部のバッチが失敗しても残りの結果を返す。すべてのバッチが失敗した場合は
+    最初のバッチの例外を送出する（サーキットブレーカーやレート制限の例外を呼び出し元に伝えるため）。
+
+    Args:
+        ids: 取得するIDのリスト
+        fetch: 1バッチ分のIDを受け取り、idをキーとした結果を返す関数
+        batch_size: 1バッチあたりの最大件数（省略時はConfig.VIDEO_QUERY_BATCH_SIZE）
+        label: ログ表示用の名前
+
+    Returns:
+        バッチ取得の結果
+    """
+    batches = plan_batches(ids, batch_size or Config.VIDEO_QUERY_BATCH_SIZE)
+    report = BatchReport()
+    if not batches:
+        return report
+
+    def _run(index: int, batch: List[str]):
+        start = time.monotonic()
+        try:
+            result, error = fetch(batch), None
+        except Exception as e:
+            result, error = {}, e
+        return index, batch, result, error, (time.monotonic() - start) * 1000
+
+    # 1バッチだけならスレッドを経由せずに実行する
+    if len(batches) == 1:
+        outcomes = [_run(0, batches[0])]
+    else:
+        outcomes = list(_executor.map(lambda args: _run(*args), enumerate(batches)))
+
+    errors = []
+    for index, batch, result, error, latency_ms in outcomes:
+        report.batches.append({
+            "index": index,
+            "size": len(batch),
+            "latency_ms": round(latency_ms, 1),
+            "error": None if error is None else str(error)
+        })
+        if error is not None:
+            errors.append(error)
+            logger.warning(f"{label} バッチ{index + 1}/{len(batches)}の取得に失敗: {error}")
+        else:
+            report.results.update(result)
+
+    logger.info(f"{label}: {len(batches)}バッチ, 失敗 {len(errors)}, レイテンシ(ms) {report.latencies_ms}")
+    if errors and len(errors) == len(batches):
+        raise errors[0]
+    return report
@@ -2,93 +2,234 @@
 
 import time
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional, Tuple
+from app.config import Config
+from app.services.cache_backends import CacheBackend, approx_size, create_backend  # noqa: F401 (approx_sizeは互換のため)
+from app.services.cache_stats import CacheCounters, with_hit_rates
+from app.services.cache_codec import CacheCodec, create_codec
 
 logger = logging.getLogger(__name__)
 
 class Cache:
-    """シンプルなメモリキャッシュクラス"""
-    
-    def __init__(self, ttl: int = 300):
+    """有効期限と期限切れ保持時間を持つキャッシュ
+
+    有効期限の判定とログはこのクラスで行い、エントリの保存先はバックエンド（cache_backends.py）に任せる。
+    バックエンドは設定（CACHE_BACKEND）で選択し、呼び出し元はどちらが使われているかを意識しない。
+    memoryバックエンドは保存したオブジェクトをそのまま返し、sqliteバックエンドは復元したコピーを返すため、
+    取得した値を変更する場合はコピーしてから変更する。
+
+    コーデック（cache_codec.py、CACHE_CODEC）を設定した場合、閾値以上の値はシリアライズ・圧縮して保存し、
+    取得のたびにデコードする（その場合はmemoryバックエンドでもコピーを返す）。
+
+    取得・保存・削除の回数はキーファミリーごとにロックなしのカウンター（cache_stats.py）で数える。
+    取得の結果は hit（TTL内）、stale（TTLを過ぎたエントリを返した）、expired（TTLを過ぎたためNoneを返した）、
+    miss（エントリなし）のいずれか。
+    """
+
+    def __init__(self, ttl: int = 300, max_stale: int = 0, max_entries: int = 0, max_bytes: int = 0,
+                 name: str = "cache", backend: Optional[CacheBackend] = None, codec: Optional[CacheCodec] = None):
         """
         キャッシュを初期化
-        
+
         Args:
             ttl: キャッシュの有効期限（秒）
+            max_stale: 期限切れ後もget_staleで取得できるよう保持する秒数
+            max_entries: 最大エントリ数（0の場合は無制限）
+            max_bytes: おおよその最大バイト数（0の場合は無制限）
+            name: キャッシュの名前（共有バックエンドでのキャッシュの区別に使う）
+            backend: 保存先（省略時は設定のバックエンド）
+            codec: 値のコーデック（省略時は設定のコーデック、設定が空の場合はオブジェクトのまま保持）
         """
-        self.cache: Dict[str, Any] = {}
         self.ttl = ttl
-        logger.debug(f"キャッシュを初期化 (TTL: {ttl}秒)")
-    
+        self.max_stale = max_stale
+        self.name = name
+        self.backend = backend or create_backend(Config.CACHE_BACKEND, name, max_entries=max_entries,
+                                                 max_bytes=max_bytes, path=Config.CACHE_SQLITE_PATH)
+        self.codec = codec or create_codec(Config.CACHE_CODEC, Config.CACHE_CODEC_COMPRESSION,
+                                           min_bytes=Config.CACHE_CODEC_MIN_BYTES,
+                                           compress_min_bytes=Config.CACHE_CODEC_COMPRESS_MIN_BYTES)
+        self.counters = CacheCounters()
+        self.backend.on_remove = self.counters.incr
+        logger.debug(f"キャッシュを初期化: {name} ({self.backend.name}, TTL: {ttl}秒, 期限切れ保持: {max_stale}秒, "
+                     f"最大件数: {max_entries or '無制限'}, 最大バイト数: {max_bytes or '無制限'})")
+
     def get(self, key: str) -> Optional[Any]:
         """
         キャッシュから値を取得
-        
+
         Args:
             key: キャッシュキー
-            
+
         Returns:
             キャッシュされた値、またはNone（期限切れまたは存在しない場合）
         """
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if time.time() - timestamp < self.ttl:
-                logger.debug(f"キャッシュヒット: {key}")
-                return data
-            else:
-                logger.debug(f"キャッシュ期限切れ: {key}")
-                del self.cache[key]
-        else:
+        entry = self.backend.get(key)
+        if entry is None:
+            self.counters.incr(key, "miss")
             logger.debug(f"キャッシュミス: {key}")
-        return None
-    
-    def set(self, key: str, value: Any) -> None:
+            return None
+        data, timestamp, ttl = entry
+        if time.time() - timestamp >= ttl:
+            self.counters.incr(key, "expired")
+            logger.debug(f"キャッシュ期限切れ: {key}")
+            return None
+        self.counters.incr(key, "hit")
+        logger.debug(f"キャッシュヒット: {key}")
+        return self._decode(data)
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """
+        期限切れを含めてキャッシュから値を取得（API障害時のフォールバック用）
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            キャッシュされた値、またはNone（保持期間を過ぎたまたは存在しない場合）
+        """
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        logger.debug(f"期限切れを含むキャッシュ取得: {key}")
+        return entry[0]
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        """
+        期限切れを含めて値と経過時間を取得（stale-while-revalidateの判定用）
+
+        Returns:
+            (値, 保存からの経過秒数, TTL)、または None（保持期間を過ぎたまたは存在しない場合）
+        """
+        entry = self.backend.get(key)
+        if entry is None:
+            self.counters.incr(key, "miss")
+            return None
+        data, timestamp, ttl = entry
+        age = time.time() - timestamp
+        self.counters.incr(key, "hit" if age < ttl else "stale")
+        return self._decode(data), age, ttl
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
         """
         キャッシュに値を保存
-        
+
         Args:
             key: キャッシュキー
             value: 保存する値
+            ttl: このエントリの有効期限（秒、省略時はキャッシュの設定値）
+            tags: invalidate_tagでまとめて削除するためのタグ
+        """
+        ttl = self.ttl if ttl is None else ttl
+        size = self.backend.set(key, self._encode(value), ttl, ttl + self.max_stale, tags)
+        self.counters.incr(key, "set")
+        logger.debug(f"キャッシュに保存: {key} (約{size}バイト)")
+
+    def set_many(self, entries: Iterable[Tuple[str, Any]], ttl: Optional[int] = None,
+                 tags: Iterable[str] = ()) -> None:
         """
-        self.cache[key] = (value, time.time())
-        logger.debug(f"キャッシュに保存: {key}")
-    
+        複数の値を同じTTL・タグでまとめて保存（共有バックエンドでは1回の書き込みになる）
+
+        Args:
+            entries: (キャッシュキー, 値) のリスト
+        """
+        entries = [(key, self._encode(value)) for key, value in entries]
+        ttl = self.ttl if ttl is None else ttl
+        size = self.backend.set_many(entries, ttl, ttl + self.max_stale, tags)
+        self.counters.incr_many((key for key, _ in entries), "set")
+        logger.debug(f"キャッシュにまとめて保存: {len(entries)}個 (約{size}バイト)")
+
+    def _encode(self, value: Any) -> Any:
+        return self.codec.encode(value) if self.codec is not None else value
+
+    def _decode(self, value: Any) -> Any:
+        return self.codec.decode(value) if self.codec is not None else value
+
+    def delete(self, key: str) -> bool:
+        """
+        エントリを削除（共有バックエンドではすべてのワーカーから削除される）
+
+        Returns:
+            削除した場合True
+        """
+        deleted = self.backend.delete(key)
+        if deleted:
+            logger.debug(f"キャッシュを削除: {key}")
+        return deleted
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """
+        キーが指定の文字列で始まるエントリを削除（cache_keysのキーでは、アカウントやリソースの単位）
+
+        Returns:
+            削除されたエントリ数
+        """
+        removed = self.backend.delete_prefix(prefix)
+        logger.debug(f"キャッシュを前方一致で削除: {prefix}* ({removed}個)")
+        return removed
+
+    def invalidate_tag(self, tag: str) -> int:
+        """
+        タグを付けたエントリを削除
+
+        Returns:
+            削除されたエントリ数
+        """
+        removed = self.backend.delete_tag(tag)
+        logger.debug(f"キャッシュをタグで削除: {tag} ({removed}個)")
+        return removed
+
     def clear(self) -> None:
         """キャッシュをクリア"""
-        self.cache.clear()
+        self.backend.clear()
         logger.debug("キャッシュをクリア")
-    
+
     def size(self) -> int:
         """キャッシュサイズを取得"""
-        return len(self.cache)
-    
+        return self.backend.size()
+
     def cleanup(self) -> int:
         """
-        期限切れのエントリを削除
-        
+        保持期間を過ぎたエントリを削除
+
         Returns:
             削除されたエントリ数
         """
-        current_time = time.time()
-        expired_keys = [
-            key for key, (_, timestamp) in self.cache.items()
-            if current_time - timestamp >= self.ttl
-        ]
-        
-        for key in expired_keys:
-            del self.cache[key]
-        
-        if expired_keys:
-            logger.debug(f"期限切れエントリを削除: {len(expired_keys)}個")
-        
-        return len(expired_keys)
+        removed = self.backend.cleanup()
+
+        if removed:
+            logger.debug(f"期限切れエントリを削除: {removed}個")
+
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """バックエンドの統計（件数、おおよそのバイト数、上限など）と、キーファミリーごとの回数とヒット率"""
+        return {"name": self.name, "ttl": self.ttl, "max_stale": self.max_stale, **self.backend.stats(),
+                "codec": self.codec.describe() if self.codec is not None else None,
+                "families": with_hit_rates(self.counters.snapshot())}
 
 # グローバルキャッシュインスタンス
-video_cache = Cache(ttl=600)  # 動画データ: 10分
-profile_cache = Cache(ttl=300)  # プロフィールデータ: 5分
+video_cache = Cache(ttl=600, max_stale=Config.CACHE_MAX_STALE, name="video",  # 動画データ: 10分
+                    max_entries=Config.VIDEO_CACHE_MAX_ENTRIES, max_bytes=Config.VIDEO_CACHE_MAX_MB * 1024 * 1024)
+profile_cache = Cache(ttl=300, max_stale=Config.CACHE_MAX_STALE, name="profile",  # プロフィールデータ: 5分
+                      max_entries=Config.PROFILE_CACHE_MAX_ENTRIES, max_bytes=Config.PROFILE_CACHE_MAX_MB * 1024 * 1024)
+
+def invalidate_tag(tag: str) -> int:
+    """
+    すべてのキャッシュからタグを付けたエントリを削除
+
+    Returns:
+        削除されたエントリ数
+    """
+    removed = video_cache.invalidate_tag(tag) + profile_cache.invalidate_tag(tag)
+    logger.info(f"キャッシュを無効化: {tag} ({removed}個)")
+    return removed
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """すべてのキャッシュの統計を取得"""
+    return {cache.name: cache.stats() for cache in (video_cache, profile_cache)}
 
 def clear_all_caches():
     """すべてのキャッシュをクリア"""
     video_cache.clear()
     profile_cache.clear()
-    logger.info("すべてのキャッシュをクリアしました") 
+    logger.info("すべてのキャッシュをクリアしました")
@@ -0,0 +1,527 @@
+"""キャッシュの保存先（バックエンド）
+
+Cache（cache.py）は有効期限の判定とログを担当し、エントリの保存・削除はバックエンドに任せる。
+
+- MemoryBackend: プロセス内のLRU（ワーカーごとに独立）
+- SqliteBackend: 同じホストの全ワーカーで共有するSQLiteファイル（外部サービス不要）
+
+SqliteBackend はプロセス内に複製を持たず毎回ファイルから読み込むため、どのワーカーの書き込みも
+直後から全ワーカーに反映され、古い複製の無効化は不要。
+"""
+
+import logging
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Iterable, Optional, Set, Tuple
+from app.services.cache_codec import approx_size, from_bytes, to_bytes
+
+logger = logging.getLogger(__name__)
+
+class CacheBackend(ABC):
+    """キャッシュの保存先のインターフェース
+
+    エントリは (値, 保存時刻, TTL) で、保持期間（retention秒）を過ぎたものは返さない。
+    """
+
+    name = "base"
+    # エントリを削除したときに (キー, 理由) で呼ぶ関数（理由は expiration / eviction / invalidation、統計用）
+    on_remove: Optional[Callable[[str, str], None]] = None
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        """保持期間内のエントリ (値, 保存時刻, TTL) を取得（なければNone）"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: int, retention: float, tags: Iterable[str] = ()) -> int:
+        """
+        エントリを保存
+
+        Args:
+            ttl: 有効期限（秒）
+            retention: 保存してから削除するまでの秒数（TTL + 期限切れ保持時間）
+            tags: まとめて削除するためのタグ（保存し直した場合は置き換える）
+
+        Returns:
+            おおよそのバイト数
+        """
+
+    def set_many(self, entries: Iterable[Tuple[str, Any]], ttl: int, retention: float,
+                 tags: Iterable[str] = ()) -> int:
+        """
+        複数のエントリを同じTTL・タグで保存
+
+        Returns:
+            おおよそのバイト数の合計
+        """
+        tags = tuple(tags)
+        return sum(self.set(key, value, ttl, retention, tags) for key, value in entries)
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """エントリを削除（削除した場合True）"""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        """キーが指定の文字列で始まるエントリを削除して削除数を返す"""
+
+    @abstractmethod
+    def delete_tag(self, tag: str) -> int:
+        """タグを付けたエントリを削除して削除数を返す"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """すべてのエントリを削除"""
+
+    @abstractmethod
+    def size(self) -> int:
+        """エントリ数"""
+
+    @abstractmethod
+    def cleanup(self) -> int:
+        """保持期間を過ぎたエントリを削除して削除数を返す"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "entries": self.size()}
+
+class MemoryBackend(CacheBackend):
+    """件数とおおよそのバイト数で上限を設けたプロセス内のLRU
+
+    エントリは最後に使われた順（OrderedDict）に保持し、上限を超えた場合は最も使われていない
+    エントリから削除する。保持期限は保持期間ごとの保存順のキューで管理し、先頭から期限を過ぎた
+    エントリだけを削除するため、全件の走査は行わない（償却O(1)）。タグはタグごとのキーの集合で
+    管理し、前方一致の削除のみ全件を走査する。すべての操作はロックで保護する。
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 0, max_bytes: int = 0):
+        """
+        Args:
+            max_entries: 最大エントリ数（0の場合は無制限）
+            max_bytes: おおよその最大バイト数（0の場合は無制限）
+        """
+        # キー -> (値, 保存時刻, TTL, 保持期間, おおよそのバイト数, タグ)（最後に使われた順）
+        self.entries: "OrderedDict[str, Tuple[Any, float, int, float, int, Tuple[str, ...]]]" = OrderedDict()
+        # 保持期間ごとの キー -> 削除時刻（保存順 = 削除時刻順）
+        self._expiry: Dict[float, "OrderedDict[str, float]"] = {}
+        # タグ -> キー
+        self._tags: Dict[str, Set[str]] = {}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        with self._lock:
+            self._expire(time.time())
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+        return entry[0], entry[1], entry[2]
+
+    def set(self, key: str, value: Any, ttl: int, retention: float, tags: Iterable[str] = ()) -> int:
+        size = approx_size(value)
+        tags = tuple(tags)
+        now = time.time()
+        with self._lock:
+            self._remove(key)
+            self.entries[key] = (value, now, ttl, retention, size, tags)
+            self.bytes += size
+            self._expiry.setdefault(retention, OrderedDict())[key] = now + retention
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._expire(now)
+            self._evict()
+        return size
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._remove(key, "invalidation")
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self.entries if key.startswith(prefix)]
+            for key in keys:
+                self._remove(key, "invalidation")
+        return len(keys)
+
+    def delete_tag(self, tag: str) -> int:
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key, "invalidation")
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self._expiry.clear()
+            self._tags.clear()
+            self.bytes = 0
+
+    def size(self) -> int:
+        return len(self.entries)
+
+    def cleanup(self) -> int:
+        with self._lock:
+            return self._expire(time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": self.name, "entries": len(self.entries), "bytes": self.bytes,
+                    "max_entries": self.max_entries, "max_bytes": self.max_bytes,
+                    "evictions": self.evictions, "expirations": self.expirations}
+
+    def _remove(self, key: str, reason: Optional[str] = None) -> bool:
+        """エントリを削除（ロック内で呼ぶ、reasonは統計用で保存し直す場合はNone）"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        if reason is not None and self.on_remove is not None:
+            self.on_remove(key, reason)
+        self.bytes -= entry[4]
+        queue = self._expiry.get(entry[3])
+        if queue is not None:
+            queue.pop(key, None)
+        for tag in entry[5]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def _expire(self, now: float) -> int:
+        """各キューの先頭から保持期間を過ぎたエントリを削除（ロック内で呼ぶ）"""
+        removed = 0
+        for retention, queue in list(self._expiry.items()):
+            while queue:
+                key, deadline = next(iter(queue.items()))
+                if deadline > now:
+                    break
+                self._remove(key, "expiration")
+                removed += 1
+            if not queue:
+                del self._expiry[retention]
+        self.expirations += removed
+        return removed
+
+    def _evict(self) -> None:
+        """上限を超えている間、最も使われていないエントリを削除（ロック内で呼ぶ）"""
+        # 最後に保存したエントリは上限を超えていても残す
+        while len(self.entries) > 1 and (
+            (self.max_entries and len(self.entries) > self.max_entries)
+            or (self.max_bytes and self.bytes > self.max_bytes)
+        ):
+            key = next(iter(self.entries))
+            self._remove(key, "eviction")
+            self.evictions += 1
+            logger.debug(f"キャッシュの上限によりエントリを削除: {key}")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    ttl INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries (namespace, expires_at);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_stored_at ON cache_entries (namespace, stored_at);
+CREATE TABLE IF NOT EXISTS cache_tags (
+    namespace TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (namespace, tag, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_tags_key ON cache_tags (namespace, key);
+"""
+
+# 削除したキーを返せるか（DELETE ... RETURNING はSQLite 3.35以降、未対応の場合は削除数のみ数える）
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """前方一致を範囲検索にするための上限（この文字列未満のキーが前方一致する）"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+# 期限切れの削除と上限の確認を行う書き込み回数の間隔
+_MAINTENANCE_EVERY = 100
+
+class SqliteBackend(CacheBackend):
+    """同じホストのワーカー間で共有するSQLiteファイルのキャッシュ
+
+    値はJSON（コーデックでエンコード済みの値はそのバイト列）で保存する（cache_codec.to_bytes）。
+    ファイルを書き換えられてもコードが実行されないよう、pickleは使わない。
+    接続はスレッドごとに作成し、WALモードで読み込みと書き込みを並行させる。
+    上限を超えた場合は保存が古い順に削除する（読み込みのたびに書き込まないためLRUの近似）。
+    タグは別のテーブルに保持し、前方一致の削除は主キーの範囲検索で行う。
+    ファイルの障害はAPI呼び出しを妨げないよう、ログに記録してキャッシュミスとして扱う。
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 0, max_bytes: int = 0):
+        """
+        Args:
+            path: データベースファイルのパス（全ワーカーで同じパスを使う）
+            namespace: キャッシュごとの名前（同じファイルに複数のキャッシュを保存する）
+            max_entries: 最大エントリ数（0の場合は無制限）
+            max_bytes: 保存した値の合計の最大バイト数（0の場合は無制限）
+        """
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self.expirations = 0
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """スレッドごとの接続を取得（初回はスキーマを作成）"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        try:
+            row = self._connect().execute(
+                "SELECT value, stored_at, ttl FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.namespace, key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"共有キャッシュの読み込みに失敗: {e}")
+            return None
+        if row is None:
+            return None
+        try:
+            return from_bytes(row[0]), row[1], row[2]
+        except Exception as e:
+            logger.warning(f"共有キャッシュの値を復元できません: {key}: {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: int, retention: float, tags: Iterable[str] = ()) -> int:
+        blob = to_bytes(value)
+        now = time.time()
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, stored_at, ttl, expires_at, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, blob, now, ttl, now + retention, len(blob))
+                )
+                connection.execute("DELETE FROM cache_tags WHERE namespace = ? AND key = ?", (self.namespace, key))
+                connection.executemany("INSERT OR IGNORE INTO cache_tags (namespace, tag, key) VALUES (?, ?, ?)",
+                                       [(self.namespace, tag, key) for tag in tags])
+        except sqlite3.Error as e:
+            logger.warning(f"共有キャッシュへの書き込みに失敗: {e}")
+            return len(blob)
+
+        self._after_writes(1)
+        return len(blob)
+
+    def set_many(self, entries: Iterable[Tuple[str, Any]], ttl: int, retention: float,
+                 tags: Iterable[str] = ()) -> int:
+        """1つのトランザクションでまとめて保存"""
+        now = time.time()
+        rows = [(self.namespace, key, to_bytes(value), now, ttl, now + retention)
+                for key, value in entries]
+        if not rows:
+            return 0
+        tags = tuple(tags)
+        try:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, stored_at, ttl, expires_at, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [row + (len(row[2]),) for row in rows]
+                )
+                connection.executemany("DELETE FROM cache_tags WHERE namespace = ? AND key = ?",
+                                       [(self.namespace, row[1]) for row in rows])
+                connection.executemany("INSERT OR IGNORE INTO cache_tags (namespace, tag, key) VALUES (?, ?, ?)",
+                                       [(self.namespace, tag, row[1]) for row in rows for tag in tags])
+        except sqlite3.Error as e:
+            logger.warning(f"共有キャッシュへの書き込みに失敗: {e}")
+        else:
+            self._after_writes(len(rows))
+        return sum(len(row[2]) for row in rows)
+
+    def _after_writes(self, count: int) -> None:
+        """書き込み回数に応じて期限切れの削除と上限の確認を行う"""
+        with self._lock:
+            before = self._writes
+            self._writes += count
+            maintenance_due = self._writes // _MAINTENANCE_EVERY > before // _MAINTENANCE_EVERY
+        if maintenance_due:
+            self.cleanup()
+            self._evict()
+
+    def delete(self, key: str) -> bool:
+        try:
+            connection = self._connect()
+            with connection:
+                removed = self._delete_entries(connection, "key = ?", (key,), "invalidation")
+                connection.execute("DELETE FROM cache_tags WHERE namespace = ? AND key = ?", (self.namespace, key))
+            return removed > 0
+        except sqlite3.Error as e:
+            logger.warning(f"共有キャッシュの削除に失敗: {e}")
+            return False
+
+    def delete_prefix(self, prefix: str) -> int:
+        if not prefix:
+            removed = self.size()
+            self.clear()
+            return removed
+        bounds = (prefix, _prefix_upper_bound(prefix))
+        try:
+            connection = self._connect()
+            with connection:
+                removed = self._delete_entries(connection, "key >= ? AND key < ?", bounds, "invalidation")
+                connection.execute("DELETE FROM cache_tags WHERE namespace = ? AND key >= ? AND key < ?",
+                                   (self.namespace,) + bounds)
+            return removed
+        except sqlite3.Error as e:
+            logger.warning(f"共有キャッシュの前方一致削除に失敗: {e}")
+            return 0
+
+    def delete_tag(self, tag: str) -> int:
+        tagged = "SELECT key FROM cache_tags WHERE namespace = ? AND tag = ?"
+        try:
+            connection = self._connect()
+            with connection:
+                removed = self._delete_entries(connection, f"key IN ({tagged})", (self.namespace, tag), "invalidation")
+                connection.execute(
+                    f"DELETE FROM cache_tags WHERE namespace = ? AND key IN ({tagged})",
+                    (self.namespace, self.namespace, tag)
+                )
+            return removed
+        except sqlite3.Error as e:
+            logger.warning(f"共有キャッシュのタグ削除に失敗: {e}")
+            return 0
+
+    def clear(self) -> None:
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+                connection.execute("DELETE FROM cache_tags WHERE namespace = ?", (self.namespace,))
+        except sqlite3.Error as e:
+            logger.warning(f"共有キャッシュのクリアに失敗: {e}")
+
+    def size(self) -> int:
+        try:
+            return self._connect().execute("SELECT COUNT(*) FROM cache_entries WHERE namespace = ? AND expires_at > ?",
+                                           (self.namespace, time.time())).fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"共有キャッシュの読み込みに失敗: {e}")
+            return 0
+
+    def cleanup(self) -> int:
+        try:
+            connection = self._connect()
+            with connection:
+                removed = self._delete_entries(connection, "expires_at <= ?", (time.time(),), "expiration")
+                # 削除済みのエントリのタグ
+                connection.execute(
+                    "DELETE FROM cache_tags WHERE namespace = ? AND key NOT IN "
+                    "(SELECT key FROM cache_entries WHERE namespace = ?)",
+                    (self.namespace, self.namespace)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"共有キャッシュの期限切れ削除に失敗: {e}")
+            return 0
+        with self._lock:
+            self.expirations += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries, total = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        except sqlite3.Error:
+            entries, total = 0, 0
+        with self._lock:
+            return {"backend": self.name, "path": self.path, "entries": entries, "bytes": total,
+                    "max_entries": self.max_entries, "max_bytes": self.max_bytes,
+                    "evictions": self.evictions, "expirations": self.expirations}
+
+    def _delete_entries(self, connection: sqlite3.Connection, where: str, params: tuple, reason: str) -> int:
+        """このキャッシュのエントリを条件で削除して削除数を返す（削除したキーをon_removeに渡す）"""
+        sql = f"DELETE FROM cache_entries WHERE namespace = ? AND {where}"
+        params = (self.namespace,) + params
+        if self.on_remove is not None and _HAS_RETURNING:
+            keys = [row[0] for row in connection.execute(sql + " RETURNING key", params).fetchall()]
+            for key in keys:
+                self.on_remove(key, reason)
+            return len(keys)
+        return max(connection.execute(sql, params).rowcount, 0)
+
+    def _evict(self) -> None:
+        """上限を超えている分を保存が古い順に削除"""
+        if not self.max_entries and not self.max_bytes:
+            return
+        try:
+            connection = self._connect()
+            with connection:
+                entries, total = connection.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+                ).fetchone()
+                excess = max(entries - self.max_entries, 0) if self.max_entries else 0
+                if self.max_bytes and total > self.max_bytes:
+                    # 平均サイズから超過分の件数を見積もる
+                    excess = max(excess, -(-(total - self.max_bytes) * entries // max(total, 1)))
+                if excess <= 0:
+                    return
+                oldest = "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY stored_at LIMIT ?"
+                connection.execute(f"DELETE FROM cache_tags WHERE namespace = ? AND key IN ({oldest})",
+                                   (self.namespace, self.namespace, excess))
+                removed = self._delete_entries(connection, f"key IN ({oldest})", (self.namespace, excess), "eviction")
+            with self._lock:
+                self.evictions += removed
+        except sqlite3.Error as e:
+            logger.warning(f"共有キャッシュの上限による削除に失敗: {e}")
+
+def create_backend(kind: str, namespace: str, max_entries: int = 0, max_bytes: int = 0,
+                   path: Optional[str] = None) -> CacheBackend:
+    """
+    設定に応じたバックエンドを作成
+
+    Args:
+        kind: "memory" または "sqlite"
+        namespace: キャッシュごとの名前
+        path: sqliteの場合のデータベースファイルのパス
+
+    Raises:
+        ValueError: 不明なバックエンドの場合
+    """
+    if kind == "memory":
+        return MemoryBackend(max_entries=max_entries, max_bytes=max_bytes)
+    if kind == "sqlite":
+        if not path:
+            raise ValueError("sqliteバックエンドにはCACHE_SQLITE_PATHが必要です")
+        return SqliteBackend(path, namespace, max_entries=max_entries, max_bytes=max_bytes)
+    raise ValueError(f"Unsupported cache backend: {kind}")
@@ -0,0 +1,233 @@
+"""キャッシュの値のコーデック（大きな値をシリアライズ・圧縮したバイト列として保持する）
+
+動画一覧などの大きな値はPythonのオブジェクトのままではJSONの数倍のメモリを使うため、
+おおよそのサイズが閾値以上の値を msgpack（またはコンパクトなJSON）にシリアライズし、
+さらに閾値以上のバイト列は zlib（または lz4）で圧縮して保持する。取得時にデコードする。
+閾値未満の値（プロフィールなど）はオブジェクトのまま保持する。
+
+動画・プロフィールのレコードはAPIの形の辞書として保存し、デコード時にレコードに戻す。
+タプルはリストとして、集合は保存できない（大きな値には使われていない）。
+
+共有キャッシュ（SqliteBackend）のファイルには to_bytes の形式（形式と圧縮のヘッダー + バイト列）で保存する。
+ファイルを書き換えられてもコードが実行されないよう、pickleは使わない。
+
+memoryバックエンドでは、最大の値である動画一覧のレコードは同期済みの動画（VideoSync）や
+一覧から保存した動画詳細のエントリとも共有されているため、一覧をエンコードしてもレコードは解放されず、
+バイト列の分だけメモリが増える（benchmarks/cache_codec.py のプロセス全体の計測では動画10,000件で
+オブジェクトのまま +0MB、msgpack+zlib +8MB）。コーデックはsqliteバックエンドで保存するバイト列を
+小さくする場合（動画10,000件の一覧でJSON 4.5MB → msgpack+zlib 0.5MB）に使う。
+
+メモリ使用量とデコード時間は benchmarks/cache_codec.py で比較できる。
+"""
+
+import sys
+import zlib
+from collections.abc import Mapping
+from typing import Dict, Any, Optional
+
+from app.services import json_codec
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpackは任意の依存
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - lz4は任意の依存
+    lz4_frame = None
+
+FORMATS = ("msgpack", "json")
+COMPRESSIONS = ("none", "zlib", "lz4")
+
+# zlibの圧縮レベル（速度を優先）
+_ZLIB_LEVEL = 1
+
+# レコードの種類（msgpackの拡張型のコード、JSONの目印）
+_RECORD_CODES = {"video": 1, "profile": 2}
+# JSONでレコードを表す辞書のキー
+_RECORD_KEY = "__record__"
+
+# リストのサイズ推定で実際に計測する要素数（残りは平均から推定）
+_SIZE_SAMPLE = 64
+
+def approx_size(value: Any, depth: int = 3) -> int:
+    """
+    値のおおよそのメモリ使用量（バイト）を推定
+
+    コンテナは要素も含めて数える（depth階層まで）。長いリストは先頭の要素の平均から推定し、
+    レコード（to_apiを持つ値）は保持しているフィールドの値を数える。
+    """
+    size = sys.getsizeof(value)
+    if depth <= 0 or isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    to_api = getattr(value, "to_api", None)
+    if to_api is not None:
+        return size + sum(approx_size(item, depth - 1) for item in to_api().values())
+    if isinstance(value, Mapping):
+        return size + sum(approx_size(key, depth - 1) + approx_size(item, depth - 1) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value)[:_SIZE_SAMPLE] if not isinstance(value, (list, tuple)) else value[:_SIZE_SAMPLE]
+        if not items:
+            return size
+        sampled = sum(approx_size(item, depth - 1) for item in items)
+        return size + sampled * len(value) // len(items)
+    return size
+
+_record_types: Dict[str, type] = {}
+
+def _record_classes() -> Dict[str, type]:
+    """レコードの種類 -> クラス（records は projection 経由で cache を読み込むため遅延して読み込む）"""
+    if not _record_types:
+        from app.services.records import VideoRecord, ProfileRecord
+        _record_types.update({"video": VideoRecord, "profile": ProfileRecord})
+    return _record_types
+
+def _record_kind(obj: Any) -> Optional[str]:
+    for kind, cls in _record_classes().items():
+        if type(obj) is cls:
+            return kind
+    return None
+
+class EncodedValue:
+    """シリアライズ（と圧縮）したキャッシュの値"""
+
+    __slots__ = ("data", "format", "compression")
+
+    def __init__(self, data: bytes, format: str, compression: str):
+        self.data = data
+        self.format = format
+        self.compression = compression
+
+    def __sizeof__(self) -> int:
+        # approx_size（sys.getsizeof）がバイト列を含めて数えるように
+        return object.__sizeof__(self) + sys.getsizeof(self.data)
+
+class CacheCodec:
+    """キャッシュの値のエンコード/デコード"""
+
+    def __init__(self, format: str = "msgpack", compression: str = "zlib", min_bytes: int = 4096,
+                 compress_min_bytes: int = 1024):
+        """
+        Args:
+            format: "msgpack" または "json"
+            compression: "zlib"、"lz4" または "none"
+            min_bytes: エンコードする値のおおよその最小サイズ（これ未満はオブジェクトのまま保持）
+            compress_min_bytes: 圧縮するシリアライズ後の最小バイト数
+
+        Raises:
+            ValueError: 不明な形式の場合、または必要なパッケージがインストールされていない場合
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported cache codec: {format}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported cache compression: {compression}")
+        if format == "msgpack" and msgpack is None:
+            raise ValueError("msgpackがインストールされていません")
+        if compression == "lz4" and lz4_frame is None:
+            raise ValueError("lz4がインストールされていません")
+        self.format = format
+        self.compression = compression
+        self.min_bytes = min_bytes
+        self.compress_min_bytes = compress_min_bytes
+
+    def encode(self, value: Any) -> Any:
+        """閾値以上の値をEncodedValueに変換（閾値未満はそのまま返す）"""
+        if value is None or approx_size(value) < self.min_bytes:
+            return value
+        data = _serialize(value, self.format)
+        compression = "none"
+        if self.compression != "none" and len(data) >= self.compress_min_bytes:
+            data = zlib.compress(data, _ZLIB_LEVEL) if self.compression == "zlib" else lz4_frame.compress(data)
+            compression = self.compression
+        return EncodedValue(data, self.format, compression)
+
+    def decode(self, value: Any) -> Any:
+        """EncodedValueを元の値に戻す（それ以外はそのまま返す）"""
+        if not isinstance(value, EncodedValue):
+            return value
+        return _decode(value.data, value.format, value.compression)
+
+    def describe(self) -> Dict[str, Any]:
+        """統計表示用の設定"""
+        return {"format": self.format, "compression": self.compression, "min_bytes": self.min_bytes,
+                "compress_min_bytes": self.compress_min_bytes}
+
+def _serialize(value: Any, format: str) -> bytes:
+    if format == "msgpack":
+        return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+    return json_codec.dumps_bytes(value, default=_json_default)
+
+def _decode(data: bytes, format: str, compression: str) -> Any:
+    if compression == "zlib":
+        data = zlib.decompress(data)
+    elif compression == "lz4":
+        data = lz4_frame.decompress(data)
+    if format == "msgpack":
+        return msgpack.unpackb(data, ext_hook=_msgpack_ext_hook, strict_map_key=False)
+    return _restore_records(json_codec.loads(data))
+
+def to_bytes(value: Any) -> bytes:
+    """
+    共有キャッシュのファイルに保存するバイト列（「形式:圧縮」のヘッダー行 + バイト列）
+
+    EncodedValueはそのバイト列を、それ以外の値はJSONにシリアライズして保存する。
+    """
+    if isinstance(value, EncodedValue):
+        header, data = f"{value.format}:{value.compression}", value.data
+    else:
+        header, data = "json:none", _serialize(value, "json")
+    return header.encode("ascii") + b"\n" + data
+
+def from_bytes(blob: bytes) -> Any:
+    """
+    to_bytesのバイト列を元の値に戻す
+
+    Raises:
+        ValueError: ヘッダーが不正な場合（pickleで保存された古いエントリなど）
+    """
+    header, _, data = bytes(blob).partition(b"\n")
+    format, _, compression = header.decode("ascii", errors="replace").partition(":")
+    if format not in FORMATS or compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported cache value header: {header[:32]!r}")
+    if (format == "msgpack" and msgpack is None) or (compression == "lz4" and lz4_frame is None):
+        raise ValueError(f"{header.decode('ascii')}の値を復元するパッケージがインストールされていません")
+    return _decode(data, format, compression)
+
+def _msgpack_default(obj: Any) -> Any:
+    kind = _record_kind(obj)
+    if kind is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+    return msgpack.ExtType(_RECORD_CODES[kind], msgpack.packb(obj.to_api(), use_bin_type=True))
+
+_KINDS_BY_CODE = {code: kind for kind, code in _RECORD_CODES.items()}
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    kind = _KINDS_BY_CODE.get(code)
+    if kind is None:
+        return msgpack.ExtType(code, data)
+    return _record_classes()[kind].from_api(msgpack.unpackb(data, strict_map_key=False))
+
+def _json_default(obj: Any) -> Any:
+    kind = _record_kind(obj)
+    if kind is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return {_RECORD_KEY: kind, "data": obj.to_api()}
+
+def _restore_records(obj: Any) -> Any:
+    """JSONでレコードを表す辞書をレコードに戻す"""
+    if isinstance(obj, list):
+        return [_restore_records(item) for item in obj]
+    if isinstance(obj, dict):
+        kind = obj.get(_RECORD_KEY)
+        if kind is not None and len(obj) == 2:
+            return _record_classes()[kind].from_api(obj["data"])
+        return {key: _restore_records(item) for key, item in obj.items()}
+    return obj
+
+def create_codec(format: str, compression: str = "zlib", min_bytes: int = 4096,
+                 compress_min_bytes: int = 1024) -> Optional[CacheCodec]:
+    """設定に応じたコーデックを作成（formatが空または"none"の場合はNone = オブジェクトのまま保持）"""
+    if not format or format == "none":
+        return None
+    return CacheCodec(format, compression, min_bytes=min_bytes, compress_min_bytes=compress_min_bytes)
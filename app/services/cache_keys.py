@@ -0,0 +1,70 @@
+"""キャッシュキーとタグの体系
+
+キーは「名前空間:アカウント:リソース」で、射影キャッシュ（projection.py）はその後に「:フィールドセット」を付ける。
+
+    profile:<open_id>:info:<fields>
+    video:<open_id>:list[:<件数>]
+    video:<open_id>:detail:<video_id>:<fields>
+
+アカウントはopen_idで区別する（open_idが分からない呼び出しではアクセストークン全体のハッシュを使う）。
+アカウントやリソースの単位の削除は Cache.invalidate_prefix、リソースをまたぐ削除はタグ（Cache.invalidate_tag）で行う。
+
+- account:<open_id>   アカウントのすべてのエントリ
+- counters:<open_id>  投稿によって変わるエントリ（動画一覧と、動画数などの統計を含むプロフィール）
+"""
+
+import hashlib
+from typing import Iterable, Optional, Tuple
+from app.services.projection import PROFILE_COUNTER_FIELDS
+
+def account_scope(open_id: Optional[str], access_token: Optional[str] = None) -> str:
+    """
+    キーのアカウント部分
+
+    Args:
+        open_id: ユーザーのopen_id（分かる場合は常に指定する）
+        access_token: open_idが分からない場合に使うアクセストークン
+
+    Raises:
+        ValueError: どちらも指定されていない場合
+    """
+    if open_id:
+        return open_id
+    if access_token:
+        # トークンは先頭が共通のため、一部ではなく全体のハッシュで区別する
+        return "token-" + hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:32]
+    raise ValueError("open_idまたはaccess_tokenが必要です")
+
+def profile_key(account: str) -> str:
+    """プロフィールのキー（射影キャッシュのリソースキー）"""
+    return f"profile:{account}:info"
+
+def video_list_key(account: str, limit: Optional[int] = None) -> str:
+    """動画一覧のキー（limitは件数を指定した取得の結果、省略時は差分同期した一覧）"""
+    return f"video:{account}:list" if limit is None else f"video:{account}:list:{limit}"
+
+def video_detail_key(account: str, video_id: str) -> str:
+    """動画詳細のキー（射影キャッシュのリソースキー）"""
+    return f"video:{account}:detail:{video_id}"
+
+def account_tag(account: str) -> str:
+    """アカウントのすべてのエントリのタグ"""
+    return f"account:{account}"
+
+def counters_tag(account: str) -> str:
+    """投稿によって変わるエントリのタグ"""
+    return f"counters:{account}"
+
+def profile_tags(account: str, fields: Iterable[str]) -> Tuple[str, ...]:
+    """プロフィールのエントリのタグ（統計のフィールドを含む場合はcountersも付ける）"""
+    if PROFILE_COUNTER_FIELDS.isdisjoint(fields):
+        return (account_tag(account),)
+    return account_tag(account), counters_tag(account)
+
+def video_list_tags(account: str) -> Tuple[str, ...]:
+    """動画一覧のエントリのタグ"""
+    return account_tag(account), counters_tag(account)
+
+def video_detail_tags(account: str) -> Tuple[str, ...]:
+    """動画詳細のエントリのタグ"""
+    return (account_tag(account),)
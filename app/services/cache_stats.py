@@ -0,0 +1,132 @@
+"""キャッシュの統計（キャッシュ・キーファミリーごとのヒット、ミス、保存、削除の回数）
+
+取得のたびに数えるため、カウンターはスレッドごとの辞書（シャード）に加算し、ロックを取らない。
+集計時のみ全スレッドのシャードを合算する。終了したスレッドのシャードは合算済みの値に移して破棄する
+（リクエストごとにスレッドを作るサーバーでもシャードが増え続けない）。
+"""
+
+import threading
+from typing import Dict, Any, Iterable, List, Tuple
+
+# 取得の結果（ヒット率の計算に使う）
+LOOKUP_EVENTS = ("hit", "stale", "expired", "miss")
+# すべてのイベント（保存と、バックエンドでの削除の理由: 保持期間切れ、上限、無効化）
+EVENTS = LOOKUP_EVENTS + ("set", "expiration", "eviction", "invalidation")
+
+def key_family(key: str) -> str:
+    """
+    キャッシュキーのファミリー（cache_keysのキーでは「名前空間:リソース」）
+
+    例: video:<open_id>:detail:<id>:<fields> -> video:detail、射影キャッシュの索引は video:detail:index
+    """
+    parts = key.split(":", 3)
+    if len(parts) < 3:
+        return parts[0]
+    family = f"{parts[0]}:{parts[2]}"
+    return f"{family}:index" if key.endswith(":__fields__") else family
+
+class CacheCounters:
+    """スレッドごとのシャードに加算するカウンター"""
+
+    def __init__(self):
+        self._local = threading.local()
+        # (スレッド, シャード)
+        self._shards: List[Tuple[threading.Thread, Dict[Tuple[str, str], int]]] = []
+        # 終了したスレッドのシャードを合算した値
+        self._retired: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, key: str, event: str, count: int = 1) -> None:
+        """キーのファミリーのイベントを加算（ロックなし）"""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._register()
+        counter = (key_family(key), event)
+        shard[counter] = shard.get(counter, 0) + count
+
+    def incr_many(self, keys: Iterable[str], event: str) -> None:
+        """複数のキーのイベントを加算"""
+        for key in keys:
+            self.incr(key, event)
+
+    def _register(self) -> Dict[Tuple[str, str], int]:
+        """このスレッドのシャードを作成"""
+        shard: Dict[Tuple[str, str], int] = {}
+        with self._lock:
+            self._retire_finished()
+            self._shards.append((threading.current_thread(), shard))
+        self._local.shard = shard
+        return shard
+
+    def _retire_finished(self) -> None:
+        """終了したスレッドのシャードを合算済みの値に移す（ロック内で呼ぶ）"""
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                for counter, value in shard.copy().items():
+                    self._retired[counter] = self._retired.get(counter, 0) + value
+        self._shards = alive
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """ファミリーごとのイベントの回数"""
+        with self._lock:
+            self._retire_finished()
+            totals = dict(self._retired)
+            # 他のスレッドが加算中でも dict.copy は一度に複製される
+            shards = [shard.copy() for _, shard in self._shards]
+        for shard in shards:
+            for counter, value in shard.items():
+                totals[counter] = totals.get(counter, 0) + value
+
+        families: Dict[str, Dict[str, int]] = {}
+        for (family, event), value in totals.items():
+            families.setdefault(family, {})[event] = value
+        return families
+
+def with_hit_rates(families: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, Any]]:
+    """ファミリーごとの回数にヒット率（hit / 取得回数）を追加"""
+    result = {}
+    for family, counts in sorted(families.items()):
+        lookups = sum(counts.get(event, 0) for event in LOOKUP_EVENTS)
+        result[family] = {**counts, "hit_rate": round(counts.get("hit", 0) / lookups, 4) if lookups else None}
+    return result
+
+def _label(value: Any) -> str:
+    """Prometheusのラベル値をエスケープ"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def render_prometheus(stats: Dict[str, Dict[str, Any]]) -> str:
+    """
+    get_cache_statsの結果をPrometheusのテキスト形式に変換
+
+    Args:
+        stats: キャッシュ名 -> Cache.stats() の結果
+    """
+    lines = [
+        "# HELP tiktok_cache_events_total Cache lookups, sets and removals by cache, key family and event.",
+        "# TYPE tiktok_cache_events_total counter",
+    ]
+    for name, cache_stats in stats.items():
+        for family, counts in cache_stats.get("families", {}).items():
+            for event in EVENTS:
+                if event in counts:
+                    lines.append(f'tiktok_cache_events_total{{cache="{_label(name)}",family="{_label(family)}",'
+                                 f'event="{event}"}} {counts[event]}')
+
+    gauges = (
+        ("entries", "Entries currently stored."),
+        ("bytes", "Approximate bytes currently stored."),
+        ("max_entries", "Configured entry limit (0 means unlimited)."),
+        ("max_bytes", "Configured byte limit (0 means unlimited)."),
+        ("ttl", "Default TTL in seconds."),
+    )
+    for field, help_text in gauges:
+        lines.append(f"# HELP tiktok_cache_{field} {help_text}")
+        lines.append(f"# TYPE tiktok_cache_{field} gauge")
+        for name, cache_stats in stats.items():
+            if field in cache_stats:
+                lines.append(f'tiktok_cache_{field}{{cache="{_label(name)}",'
+                             f'backend="{_label(cache_stats.get("backend", ""))}"}} {cache_stats[field]}')
+    return "\n".join(lines) + "\n"
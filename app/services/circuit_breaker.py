@@ -0,0 +1,211 @@
+"""TikTok APIエンドポイント系統ごとのサーキットブレーカー"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# エンドポイント名 → 系統
+ENDPOINT_FAMILIES = {
+    "user/info": "user",
+    "video/list": "video",
+    "video/query": "video",
+    "creator_info": "publish",
+    "publish/init": "publish",
+    "status/fetch": "publish",
+}
+
+# 状態
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """サーキットブレーカーが開いているため呼び出しを遮断した場合の例外"""
+
+    def __init__(self, family: str, retry_after: float):
+        self.family = family
+        self.retry_after = retry_after
+        super().__init__(f"TikTok API（{family}）は一時的に利用を停止しています（{retry_after:.0f}秒後に再開）")
+
+class CircuitBreaker:
+    """失敗率と遅延率でOPENに遷移するサーキットブレーカー
+
+    直近 window_size 件の結果を保持し、最低 min_calls 件以上で
+    失敗率または遅延率が閾値を超えるとOPENになる。OPENの間は即時に失敗し、
+    open_duration 経過後にHALF_OPENとして少数の試行を許可する。
+    試行がすべて成功すればCLOSEDに戻り、1件でも失敗すれば再びOPENになる。
+    """
+
+    def __init__(self, name: str, window_size: Optional[int] = None, min_calls: Optional[int] = None,
+                 failure_rate_threshold: Optional[float] = None, slow_call_threshold: Optional[float] = None,
+                 slow_rate_threshold: Optional[float] = None, open_duration: Optional[float] = None,
+                 half_open_max_calls: Optional[int] = None):
+        """
+        サーキットブレーカーを初期化
+
+        Args:
+            name: 系統名
+            window_size: 判定に使う直近の呼び出し件数
+            min_calls: 判定を行う最低呼び出し件数
+            failure_rate_threshold: OPENにする失敗率（0〜1）
+            slow_call_threshold: 遅延とみなす応答時間（秒）
+            slow_rate_threshold: OPENにする遅延率（0〜1）
+            open_duration: OPENを維持する秒数
+            half_open_max_calls: HALF_OPENで許可する試行数
+        """
+        self.name = name
+        self.window_size = window_size or Config.BREAKER_WINDOW_SIZE
+        self.min_calls = min_calls or Config.BREAKER_MIN_CALLS
+        self.failure_rate_threshold = failure_rate_threshold or Config.BREAKER_FAILURE_RATE
+        self.slow_call_threshold = slow_call_threshold or Config.BREAKER_SLOW_CALL_SECONDS
+        self.slow_rate_threshold = slow_rate_threshold or Config.BREAKER_SLOW_CALL_RATE
+        self.open_duration = open_duration or Config.BREAKER_OPEN_SECONDS
+        self.half_open_max_calls = half_open_max_calls or Config.BREAKER_HALF_OPEN_CALLS
+
+        self.state = STATE_CLOSED
+        self.opened_at = 0.0
+        self._outcomes: deque = deque(maxlen=self.window_size)  # (失敗, 遅延)
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """
+        呼び出し前に実行可否を判定
+
+        Raises:
+            CircuitOpenError: OPEN中、またはHALF_OPENで試行枠が埋まっている場合
+        """
+        with self._lock:
+            if self.state == STATE_OPEN:
+                remaining = self.opened_at + self.open_duration - time.monotonic()
+                if remaining > 0:
+                    self._rejected += 1
+                    raise CircuitOpenError(self.name, remaining)
+                self._transition(STATE_HALF_OPEN)
+
+            if self.state == STATE_HALF_OPEN:
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    self._rejected += 1
+                    raise CircuitOpenError(self.name, self.open_duration)
+                self._half_open_in_flight += 1
+
+    def cancel(self) -> None:
+        """before_callの後に呼び出しを行わなかった場合（レート制限など）にHALF_OPENの試行枠を返す"""
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                self._half_open_in_flight = max(self._half_open_in_flight - 1, 0)
+
+    def record(self, elapsed: float, failed: bool) -> None:
+        """
+        呼び出し結果を記録
+
+        Args:
+            elapsed: 応答時間（秒）
+            failed: 失敗したかどうか
+        """
+        slow = elapsed >= self.slow_call_threshold
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                self._half_open_in_flight = max(self._half_open_in_flight - 1, 0)
+                if failed or slow:
+                    self._transition(STATE_OPEN)
+                    return
+                self._half_open_successes += 1
+                if self._half_open_successes >= self.half_open_max_calls:
+                    self._transition(STATE_CLOSED)
+                return
+
+            self._outcomes.append((failed, slow))
+            if self.state == STATE_CLOSED and len(self._outcomes) >= self.min_calls:
+                failure_rate, slow_rate = self._rates()
+                if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_rate_threshold:
+                    logger.warning(f"サーキットブレーカーをOPEN: {self.name} "
+                                   f"(失敗率 {failure_rate:.0%}, 遅延率 {slow_rate:.0%})")
+                    self._transition(STATE_OPEN)
+
+    def _rates(self):
+        """直近の失敗率と遅延率"""
+        total = len(self._outcomes)
+        if total == 0:
+            return 0.0, 0.0
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        slows = sum(1 for _, slow in self._outcomes if slow)
+        return failures / total, slows / total
+
+    def _transition(self, state: str) -> None:
+        """状態を遷移（ロック取得済みで呼び出すこと）"""
+        if state == self.state:
+            return
+        logger.info(f"サーキットブレーカー状態遷移: {self.name} {self.state} → {state}")
+        self.state = state
+        if state == STATE_OPEN:
+            self.opened_at = time.monotonic()
+        elif state == STATE_CLOSED:
+            self._outcomes.clear()
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+
+    def reset(self) -> None:
+        """CLOSED状態に戻す"""
+        with self._lock:
+            self._transition(STATE_CLOSED)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """現在の状態を取得"""
+        with self._lock:
+            failure_rate, slow_rate = self._rates()
+            retry_after = 0.0
+            if self.state == STATE_OPEN:
+                retry_after = max(self.opened_at + self.open_duration - time.monotonic(), 0.0)
+            return {
+                "state": self.state,
+                "calls_in_window": len(self._outcomes),
+                "failure_rate": round(failure_rate, 3),
+                "slow_call_rate": round(slow_rate, 3),
+                "rejected_calls": self._rejected,
+                "retry_after": round(retry_after, 1)
+            }
+
+class CircuitBreakerRegistry:
+    """系統ごとのサーキットブレーカーを管理"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str) -> Optional[CircuitBreaker]:
+        """エンドポイントに対応するサーキットブレーカーを取得（対象外の場合はNone）"""
+        family = ENDPOINT_FAMILIES.get(endpoint)
+        if family is None:
+            return None
+        return self._get_family(family)
+
+    def _get_family(self, family: str) -> CircuitBreaker:
+        """系統のサーキットブレーカーを取得"""
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(family, CircuitBreaker(family))
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """すべてのサーキットブレーカーの状態を取得"""
+        families = sorted(set(ENDPOINT_FAMILIES.values()))
+        return {family: self._get_family(family).snapshot() for family in families}
+
+    def reset_all(self) -> None:
+        """すべてのサーキットブレーカーをCLOSEDに戻す"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        for breaker in breakers:
+            breaker.reset()
+
+# グローバルサーキットブレーカーインスタンス
+circuit_breakers = CircuitBreakerRegistry()
@@ -1,11 +1,11 @@
 """下書き投稿サービス"""
 
-import json
 import os
 import logging
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pathlib import Path
+from app.services import json_codec
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +32,8 @@ class DraftService:
             
             # ファイルに保存
             draft_file = self.drafts_dir / f"{draft_id}.json"
-            with open(draft_file, 'w', encoding='utf-8') as f:
-                json.dump(draft_data, f, ensure_ascii=False, indent=2)
+            with open(draft_file, 'wb') as f:
+                f.write(json_codec.dumps_bytes(draft_data, indent=True))
             
             logger.info(f"下書きを保存しました: {draft_id}")
             return draft_id
@@ -49,8 +49,8 @@ class DraftService:
             if not draft_file.exists():
                 return None
             
-            with open(draft_file, 'r', encoding='utf-8') as f:
-                draft_data = json.load(f)
+            with open(draft_file, 'rb') as f:
+                draft_data = json_codec.loads(f.read())
             
             return draft_data
             
@@ -64,8 +64,8 @@ class DraftService:
             drafts = []
             for draft_file in self.drafts_dir.glob("*.json"):
                 try:
-                    with open(draft_file, 'r', encoding='utf-8') as f:
-                        draft_data = json.load(f)
+                    with open(draft_file, 'rb') as f:
+                        draft_data = json_codec.loads(f.read())
                     
                     if draft_data.get('user_open_id') == user_open_id:
                         drafts.append(draft_data)
@@ -89,16 +89,16 @@ class DraftService:
                 return False
             
             # 既存のデータを読み込み
-            with open(draft_file, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
+            with open(draft_file, 'rb') as f:
+                existing_data = json_codec.loads(f.read())
             
             # データを更新
             existing_data.update(draft_data)
             existing_data['updated_at'] = datetime.now().isoformat()
             
             # 保存
-            with open(draft_file, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, ensure_ascii=False, indent=2)
+            with open(draft_file, 'wb') as f:
+                f.write(json_codec.dumps_bytes(existing_data, indent=True))
             
             logger.info(f"下書きを更新しました: {draft_id}")
             return True
@@ -1,31 +1,66 @@
 """ユーザープロフィール情報取得サービス"""
 
 import logging
-from typing import Dict, Any
+from typing import Optional, Iterable
+from app.config import Config
 from app.services.utils import make_tiktok_api_request, extract_user_data
-from app.services.cache import profile_cache
+from app.services.projection import PROFILE_FIELDS, normalize_fields, profile_projection
+from app.services.singleflight import profile_flight
+from app.services.store import store
+from app.services.records import ProfileRecord
+from app.services.revalidate import profile_revalidate
+from app.services.cache_keys import account_scope, profile_key, profile_tags
 
 logger = logging.getLogger(__name__)
 
-def get_user_profile(access_token: str) -> Dict[str, Any]:
-    """ユーザープロフィール情報と統計情報を取得"""
+def get_cached_user_profile(access_token: str, fields: Optional[Iterable[str]] = None,
+                            open_id: Optional[str] = None) -> Optional[ProfileRecord]:
+    """
+    期限切れを含むキャッシュ済みプロフィールを取得（API停止中のフォールバック用）
+
+    Args:
+        open_id: ユーザーのopen_id（キャッシュキーに使い、キャッシュになければ永続ストアから取得する）
+    """
+    fields = normalize_fields(fields, PROFILE_FIELDS, required=("open_id",))
+    profile = profile_projection.get(profile_key(account_scope(open_id, access_token)), fields, stale=True)
+    if profile is None and open_id:
+        stored = store.get_profile(open_id)
+        profile = ProfileRecord.from_api(stored) if stored is not None else None
+    return profile
+
+def get_user_profile(access_token: str, fields: Optional[Iterable[str]] = None,
+                     open_id: Optional[str] = None) -> ProfileRecord:
+    """
+    ユーザープロフィール情報と統計情報を取得
+
+    Args:
+        access_token: アクセストークン
+        fields: 必要なフィールド（省略時はすべて）。キャッシュ済みのエントリがこれを包含していれば再利用する
+        open_id: ユーザーのopen_id（キャッシュキーに使う。分からない場合はアクセストークンで区別する）
+    """
+    # open_idは永続ストアのキーとして常に取得する
+    fields = normalize_fields(fields, PROFILE_FIELDS, required=("open_id",))
     # キャッシュキーを生成
-    cache_key = f"profile_{access_token[:20]}"
+    account = account_scope(open_id, access_token)
+    cache_key = profile_key(account)
     
-    # キャッシュから取得を試行
-    cached_data = profile_cache.get(cache_key)
-    if cached_data:
-        logger.info("プロフィールデータをキャッシュから取得")
-        return cached_data
+    flight_key = profile_projection.key(cache_key, fields)
     
-    # user.info.basic, user.info.profile, user.info.stats スコープで取得可能な情報
-    fields = "open_id,display_name,username,avatar_url,bio_description,profile_web_link,profile_deep_link,is_verified,follower_count,following_count,video_count,likes_count"
+    # 同じアカウント・フィールドへの同時リクエストは1回のAPI呼び出しにまとめる
+    def load() -> ProfileRecord:
+        return profile_flight.do(flight_key, lambda: _fetch_user_profile(access_token, account, fields))
     
+    # キャッシュから取得を試行（期限切れ直後は古い値を返してバックグラウンドで更新）
+    return profile_revalidate.get("profile", flight_key, lambda: profile_projection.get_entry(cache_key, fields), load)
+
+def _fetch_user_profile(access_token: str, account: str, fields: tuple) -> ProfileRecord:
+    """APIからプロフィール情報を取得してキャッシュに保存"""
+    # user.info.basic, user.info.profile, user.info.stats スコープで取得可能な情報のうち要求されたもの
     response = make_tiktok_api_request(
         method="GET",
-        url="https://open.tiktokapis.com/v2/user/info/",
+        url=f"{Config.TIKTOK_API_BASE_URL}/v2/user/info/",
         access_token=access_token,
-        params={"fields": fields}
+        params={"fields": ",".join(fields)}
     )
     
     logger.debug(f"プロフィールAPIレスポンス: {response}")
@@ -33,7 +68,9 @@ def get_user_profile(access_token: str) -> Dict[str, Any]:
     user_data = extract_user_data(response)
     logger.debug(f"抽出されたユーザーデータ: {user_data}")
     
-    # キャッシュに保存
-    profile_cache.set(cache_key, user_data)
+    # キャッシュにはレコード、永続ストアにはAPIの形で保存
+    profile = ProfileRecord.from_api(user_data)
+    profile_projection.set(profile_key(account), fields, profile, tags=profile_tags(account, fields))
+    store.upsert_profile(user_data)
     
-    return user_data
+    return profile
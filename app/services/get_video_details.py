@@ -1,25 +1,88 @@
 """動画詳細情報取得サービス"""
 
 import logging
-from typing import Dict, Any
-from app.services.utils import make_tiktok_api_request, extract_videos_data, get_best_image_url
-from app.services.cache import video_cache
+from typing import Dict, Any, Optional, Iterable, Tuple
+from app.config import Config
+from app.services.utils import make_tiktok_api_request, extract_videos_data
+from app.services.projection import VIDEO_DETAIL_FIELDS, normalize_fields, video_detail_projection
+from app.services.singleflight import video_details_flight
+from app.services.store import store
+from app.services.stats_history import stats_history
+from app.services.records import VideoRecord
+from app.services.revalidate import video_revalidate
+from app.services.cache_keys import account_scope, video_detail_key, video_detail_tags
 
 logger = logging.getLogger(__name__)
 
-def get_video_details(access_token: str, video_id: str) -> Dict[str, Any]:
-    """単一動画の詳細情報を取得"""
+def get_cached_video_details(video_id: str, fields: Optional[Iterable[str]] = None, open_id: Optional[str] = None,
+                             access_token: Optional[str] = None) -> Optional[VideoRecord]:
+    """
+    期限切れを含むキャッシュ済み動画詳細を取得（API停止中のフォールバック用）
+
+    Args:
+        open_id: 動画を所有するユーザーのopen_id（キャッシュキーと永続ストアの投稿者の照合に使う。
+                 分からない場合はaccess_tokenでキャッシュを区別し、永続ストアは使わない）
+    """
+    fields = normalize_fields(fields, VIDEO_DETAIL_FIELDS, required=("id",))
+    cache_key = video_detail_key(account_scope(open_id, access_token), video_id)
+    cached_data = video_detail_projection.get(cache_key, fields, stale=True)
+    if cached_data is None:
+        cached_data = _get_stored_video_details(video_id, fields, open_id)
+    return cached_data
+
+def _get_stored_video_details(video_id: str, fields: tuple, open_id: Optional[str],
+                              max_age: Optional[float] = None) -> Optional[VideoRecord]:
+    """要求フィールドをすべて含む保存済みの動画詳細を永続ストアから取得（open_idが投稿者の動画のみ）"""
+    if not open_id:
+        return None
+    video_data = store.get_video(video_id, open_id, max_age=max_age)
+    if video_data is None or any(field not in video_data for field in fields):
+        return None
+    return VideoRecord.from_api(video_data)
+
+def get_video_details(access_token: str, video_id: str, fields: Optional[Iterable[str]] = None,
+                      open_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    単一動画の詳細情報を取得
+
+    Args:
+        access_token: アクセストークン
+        video_id: 動画ID
+        fields: 必要なフィールド（省略時はすべて、idは常に含む）
+        open_id: 動画を所有するユーザーのopen_id（キャッシュキーと永続ストアの投稿者の照合に使う。
+                 分からない場合はアクセストークンでキャッシュを区別し、永続ストアは使わない）
+    """
+    fields = normalize_fields(fields, VIDEO_DETAIL_FIELDS, required=("id",))
     # キャッシュキーを生成
-    cache_key = f"video_detail_{video_id}"
+    account = account_scope(open_id, access_token)
+    cache_key = video_detail_key(account, video_id)
+    flight_key = video_detail_projection.key(cache_key, fields)
+    tags = video_detail_tags(account)
+    
+    # 同じ動画・フィールドへの同時リクエストは1回のAPI呼び出しにまとめる
+    def refresh() -> Dict[str, Any]:
+        return video_details_flight.do(flight_key,
+                                       lambda: _fetch_video_details(access_token, video_id, open_id, cache_key,
+                                                                    fields, tags))
     
-    # キャッシュから取得を試行
-    cached_data = video_cache.get(cache_key)
-    if cached_data:
-        logger.info(f"動画詳細データをキャッシュから取得: {video_id}")
-        return cached_data
+    def load() -> Dict[str, Any]:
+        # 永続ストアに最近保存されたこのアカウントの動画があれば利用する
+        stored_data = _get_stored_video_details(video_id, fields, open_id, max_age=Config.STORE_FRESH_SECONDS)
+        if stored_data:
+            logger.info(f"動画詳細データを永続ストアから取得: {video_id}")
+            video_detail_projection.set(cache_key, tuple(field for field in VIDEO_DETAIL_FIELDS if field in stored_data),
+                                        stored_data, tags=tags)
+            return stored_data
+        return refresh()
     
-    fields = "id,title,duration,view_count,like_count,comment_count,share_count,embed_link,cover_image_url,height,width,create_time"
-    url = f"https://open.tiktokapis.com/v2/video/query/?fields={fields}"
+    # キャッシュから取得を試行（期限切れ直後は古い値を返してバックグラウンドでAPIから更新）
+    return video_revalidate.get("video_detail", flight_key,
+                                lambda: video_detail_projection.get_entry(cache_key, fields), load, refresh)
+
+def _fetch_video_details(access_token: str, video_id: str, open_id: Optional[str], cache_key: str, fields: tuple,
+                         tags: Tuple[str, ...]) -> Dict[str, Any]:
+    """APIから動画詳細を取得してキャッシュに保存"""
+    url = f"{Config.TIKTOK_API_BASE_URL}/v2/video/query/?fields={','.join(fields)}"
     
     response = make_tiktok_api_request(
         method="POST",
@@ -33,12 +96,14 @@ def get_video_details(access_token: str, video_id: str) -> Dict[str, Any]:
     videos = extract_videos_data(response)
     if videos:
         video_data = videos[0]  # 最初の動画を取得
-        # 最適な画像URLを設定
-        video_data["best_image_url"] = get_best_image_url(video_data)
         
-        # キャッシュに保存
-        video_cache.set(cache_key, video_data)
+        # キャッシュにはレコード（画像URLは参照時に計算）、永続ストアにはAPIの形で投稿者とともに保存
+        # （video/queryはトークンのアカウントの動画のみ返す）
+        record = VideoRecord.from_api(video_data)
+        video_detail_projection.set(cache_key, fields, record, tags=tags)
+        store.upsert_videos([video_data], open_id)
+        stats_history.record([video_data])
         
-        return video_data
+        return record
     
     return {}
@@ -1,27 +1,66 @@
 """動画一覧取得サービス"""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from app.services.utils import make_tiktok_api_request, extract_videos_data, get_best_image_url
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Union
+from app.config import Config
+from app.services.utils import make_tiktok_api_request, extract_videos_data
+from app.services.cache import video_cache
+from app.services.projection import VIDEO_BATCH_FIELDS, normalize_fields, video_detail_projection
+from app.services.batch_planner import BatchReport, run_batches
+from app.services.store import store
+from app.services.stats_history import stats_history
+from app.services.records import VideoRecord, to_video_records
+from app.services.revalidate import video_revalidate
+from app.services.singleflight import video_list_flight
+from app.services.cache_keys import video_detail_key, video_detail_tags, video_list_key, video_list_tags
 
 logger = logging.getLogger(__name__)
 
-def format_create_time(create_time: Optional[int]) -> str:
-    """投稿日時を読みやすい形式に変換"""
-    if not create_time:
-        return "不明"
-    try:
-        # UTC Unix epoch (seconds) を datetime に変換
-        dt = datetime.fromtimestamp(create_time)
-        return dt.strftime("%Y年%m月%d日 %H:%M")
-    except:
-        return "不明"
-
-def get_video_details_batch(access_token: str, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
-    """複数の動画の詳細情報を一括取得"""
-    fields = "id,title,duration,view_count,like_count,comment_count,share_count,embed_link,cover_image_url,create_time"
-    url = f"https://open.tiktokapis.com/v2/video/query/?fields={fields}"
+# video/list の1リクエストあたりの上限件数
+VIDEO_LIST_PAGE_SIZE = 20
+
+# 次ページの先読みを実行するスレッドプール（すべての iter_videos で共有）
+_prefetch_executor = ThreadPoolExecutor(max_workers=Config.VIDEO_LIST_PREFETCH_WORKERS,
+                                        thread_name_prefix="video-list-prefetch")
+
+def get_video_details_batch(access_token: str, video_ids: List[str],
+                            fields: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    複数の動画の詳細情報を一括取得（20件を超える場合は分割して同時に取得）
+
+    Args:
+        access_token: アクセストークン
+        video_ids: 動画IDのリスト
+        fields: 必要なフィールド（省略時は一覧表示用のすべて、idは常に含む）
+
+    Returns:
+        動画IDをキーとした詳細情報（一部のバッチが失敗した場合は取得できた分のみ）
+    """
+    return query_video_details(access_token, video_ids, fields=fields).results
+
+def query_video_details(access_token: str, video_ids: List[str],
+                        fields: Optional[Iterable[str]] = None, persist: bool = True) -> BatchReport:
+    """
+    複数の動画の詳細情報をバッチに分割して取得し、バッチ数と各バッチのレイテンシも返す
+
+    Args:
+        persist: 取得結果を永続ストアに保存するかどうか
+
+    Raises:
+        すべてのバッチが失敗した場合は最初のバッチの例外
+    """
+    fields = normalize_fields(fields, VIDEO_BATCH_FIELDS, required=("id",))
+    report = run_batches(video_ids, lambda batch: _query_video_batch(access_token, batch, fields), label="video/query")
+    if persist:
+        store.upsert_videos(report.results.values())
+        stats_history.record(report.results.values())
+    return report
+
+def _query_video_batch(access_token: str, video_ids: List[str], fields: tuple) -> Dict[str, Dict[str, Any]]:
+    """1バッチ分（最大20件）の動画詳細を取得"""
+    url = f"{Config.TIKTOK_API_BASE_URL}/v2/video/query/?fields={','.join(fields)}"
     
     response = make_tiktok_api_request(
         method="POST",
@@ -44,18 +83,139 @@ def get_video_details_batch(access_token: str, video_ids: List[str]) -> Dict[str
     logger.debug(f"抽出された詳細動画: {result}")
     return result
 
-def get_video_list(access_token: str, open_id: str, max_count: int = 10) -> List[Dict[str, Any]]:
-    """動画一覧を取得。video.listスコープが必要"""
-    # バッチサイズを制限してAPI負荷を軽減
-    batch_size = min(max_count, 20)
+def get_cached_video_list(open_id: str) -> Optional[List[VideoRecord]]:
+    """最後に取得できた動画一覧を取得（API停止中のフォールバック用、なければ永続ストアから）"""
+    videos = video_cache.get_stale(video_list_key(open_id))
+    if videos is None:
+        videos = to_video_records(store.get_videos(open_id, limit=Config.MAX_VIDEO_COUNT)) or None
+    return videos[:Config.MAX_VIDEO_COUNT] if videos is not None else None
+
+def get_video_list(access_token: str, open_id: str, max_count: int = 10,
+                   incremental: bool = False) -> List[VideoRecord]:
+    """
+    動画一覧を取得。video.listスコープが必要
+
+    Args:
+        access_token: アクセストークン
+        open_id: ユーザーのopen_id
+        max_count: 最大件数
+        incremental: Trueの場合、前回の同期以降の新しい動画のみ取得する（video_sync）。
+                     いずれの場合も結果はアカウント（と件数）ごとに動画キャッシュのTTLの間再利用する
+    """
+    if incremental:
+        cache_key = video_list_key(open_id)
+        # 同期結果をキャッシュし、期限切れ直後は古い一覧を返してバックグラウンドで同期する
+        videos = video_revalidate.get("video_list", cache_key, lambda: video_cache.get_entry(cache_key),
+                                      lambda: _sync_video_list(access_token, open_id))
+        return videos[:max_count]
+    
+    # 同じアカウントへの同時リクエストは1回のAPI呼び出しにまとめる
+    cache_key = video_list_key(open_id, max_count)
+    return video_revalidate.get("video_list", cache_key, lambda: video_cache.get_entry(cache_key),
+                                lambda: video_list_flight.do(f"{open_id}:{max_count}",
+                                                             lambda: _fetch_video_list(access_token, open_id, max_count)))
+
+def _sync_video_list(access_token: str, open_id: str) -> List[VideoRecord]:
+    """差分同期した動画一覧をキャッシュに保存（API停止時のフォールバックにも使う）"""
+    from app.services.video_sync import video_sync
+    videos = video_sync.sync(access_token, open_id)
+    video_cache.set(video_list_key(open_id), videos, tags=video_list_tags(open_id))
+    return videos
+
+def _fetch_video_list(access_token: str, open_id: str, max_count: int) -> List[VideoRecord]:
+    """APIから動画一覧と詳細情報を取得してキャッシュに保存"""
+    videos = list(iter_videos(access_token, open_id, limit=max_count))
+    
+    # 差分同期した一覧（API停止時のフォールバックにも使う）を件数を絞った結果で上書きしないよう件数ごとに保存
+    video_cache.set(video_list_key(open_id, max_count), videos, tags=video_list_tags(open_id))
+    
+    return videos
+
+def iter_videos(access_token: str, open_id: str, limit: Optional[int] = None,
+                since: Optional[Union[datetime, int]] = None) -> Iterator[VideoRecord]:
+    """
+    動画一覧をページ単位で取得しながら1件ずつ返す（新しい順）
+
+    cursor/has_more に従ってすべてのページを辿る。現在のページの詳細取得中に
+    次のページを先読みし、保持するのは高々2ページ分のため大量の動画でもメモリは一定。
+    呼び出し元がループを抜ける（ジェネレーターを閉じる）と以降のページは取得しない。
+
+    Args:
+        access_token: アクセストークン
+        open_id: ユーザーのopen_id（ログ用）
+        limit: 最大件数（省略時はすべて）
+        since: この日時（datetimeまたはUnix秒）より前に投稿された動画に達したら終了
+
+    Yields:
+        詳細情報をマージした動画（VideoRecord）
+    """
+    if isinstance(since, datetime):
+        since = int(since.timestamp())
+    remaining = limit
+    if remaining is not None and remaining <= 0:
+        return
+    
+    pending: Optional[Future] = None
+    pages = 0
+    try:
+        # 先頭ページは呼び出し元のスレッドで取得し、2ページ目以降を共有のスレッドプールで先読みする
+        page = fetch_video_page(access_token, None, _page_size(remaining))
+        while page is not None:
+            videos, cursor, has_more = page
+            page = None
+            pages += 1
+            
+            # 次のページを先読みしてから、現在のページの詳細を取得する
+            fetched = len(videos)
+            needs_more = remaining is None or remaining > fetched
+            if since is not None and videos and (videos[-1].get("create_time") or 0) < since:
+                needs_more = False
+            if has_more and cursor and fetched and needs_more:
+                next_remaining = remaining - fetched if remaining is not None else None
+                pending = _prefetch_executor.submit(fetch_video_page, access_token, cursor, _page_size(next_remaining))
+            
+            enrich_videos(access_token, videos, open_id)
+            for video in videos:
+                if since is not None and (video.get("create_time") or 0) < since:
+                    return
+                yield video
+                if remaining is not None:
+                    remaining -= 1
+                    if remaining <= 0:
+                        return
+            
+            if pending is not None:
+                page = pending.result()
+                pending = None
+    finally:
+        if pending is not None:
+            pending.cancel()
+        logger.debug(f"動画一覧の取得を終了: {open_id} {pages}ページ")
+
+def _page_size(remaining: Optional[int]) -> int:
+    """1リクエストで取得する件数（APIの上限は20件）"""
+    if remaining is None:
+        return VIDEO_LIST_PAGE_SIZE
+    return max(1, min(remaining, VIDEO_LIST_PAGE_SIZE))
+
+def fetch_video_page(access_token: str, cursor: Optional[int], page_size: int) -> Tuple[List[Dict[str, Any]], Optional[int], bool]:
+    """
+    動画一覧の1ページを取得
+
+    Returns:
+        (動画のリスト, 次ページのカーソル, 次ページがあるかどうか)
+    """
     fields = "id,title,cover_image_url,create_time"
-    url = f"https://open.tiktokapis.com/v2/video/list/?fields={fields}"
+    url = f"{Config.TIKTOK_API_BASE_URL}/v2/video/list/?fields={fields}"
+    json_data = {"max_count": page_size}
+    if cursor:
+        json_data["cursor"] = cursor
     
     response = make_tiktok_api_request(
         method="POST",
         url=url,
         access_token=access_token,
-        json_data={"max_count": batch_size}
+        json_data=json_data
     )
     
     logger.debug(f"動画リストAPIレスポンス: {response}")
@@ -63,24 +223,37 @@ def get_video_list(access_token: str, open_id: str, max_count: int = 10) -> List
     videos = extract_videos_data(response)
     logger.debug(f"抽出された動画: {videos}")
     
+    data = response.get("data") or {}
+    return videos, data.get("cursor"), bool(data.get("has_more"))
+
+def enrich_videos(access_token: str, videos: List[Dict[str, Any]], open_id: Optional[str] = None) -> None:
+    """動画一覧に詳細情報をマージして永続ストアに保存し、リストの中身をVideoRecordに置き換える
+
+    画像URLと投稿日時の表示形式はVideoRecordが参照時に計算する。
+    open_idを指定した場合、詳細を取得できた動画は動画詳細のキャッシュにも保存し、
+    一覧から動画詳細ページを開いたときにAPIを呼ばずに済むようにする。
+    """
     # 動画IDのリストを取得して、詳細情報を一括取得
+    detailed_videos: Dict[str, Dict[str, Any]] = {}
     if videos:
         video_ids = [video.get("id") for video in videos if video.get("id")]
         if video_ids:
-            detailed_videos = get_video_details_batch(access_token, video_ids)
+            detailed_videos = query_video_details(access_token, video_ids, persist=False).results
             # 基本情報と詳細情報をマージ
             for video in videos:
                 video_id = video.get("id")
                 if video_id and video_id in detailed_videos:
                     video.update(detailed_videos[video_id])
-                
-                # 最適な画像URLを設定
-                video["best_image_url"] = get_best_image_url(video)
-                
-                # 投稿日時をフォーマット
-                if video.get("create_time"):
-                    video["formatted_create_time"] = format_create_time(video["create_time"])
-                else:
-                    video["formatted_create_time"] = "不明"
-    
-    return videos
+        
+        # 一覧の情報とマージした動画を投稿者とともにまとめて保存
+        store.upsert_videos(videos, open_id)
+        stats_history.record(videos)
+        
+        # キャッシュや同期状態には辞書より小さいレコードとして保持する
+        videos[:] = [VideoRecord.from_api(video) for video in videos]
+        
+        if open_id and detailed_videos:
+            video_detail_projection.set_many(
+                ((video_detail_key(open_id, video["id"]), video) for video in videos if video.get("id") in detailed_videos),
+                VIDEO_BATCH_FIELDS, tags=video_detail_tags(open_id)
+            )
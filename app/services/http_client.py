@@ -0,0 +1,220 @@
+"""TikTok API用HTTPトランスポート（接続プール・キープアライブ）"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# URLパス → エンドポイント名
+ENDPOINT_PATHS = (
+    ("/v2/oauth/token/", "oauth/token"),
+    ("/v2/user/info/", "user/info"),
+    ("/v2/video/list/", "video/list"),
+    ("/v2/video/query/", "video/query"),
+    ("/v2/post/publish/creator_info/query/", "creator_info"),
+    ("/v2/post/publish/video/init/", "publish/init"),
+    ("/v2/post/publish/inbox/video/init/", "publish/init"),
+    ("/v2/post/publish/status/fetch/", "status/fetch"),
+)
+
+# エンドポイントごとの読み込みタイムアウト（秒）
+ENDPOINT_READ_TIMEOUTS = {
+    "oauth/token": 15,
+    "user/info": 10,
+    "video/list": 15,
+    "video/query": 15,
+    "creator_info": 10,
+    "publish/init": 20,
+    "status/fetch": 10,
+    "upload": 60,
+}
+
+def resolve_endpoint(url: str) -> str:
+    """URLからエンドポイント名を判定（不明な場合は "other"）"""
+    path = urlsplit(url).path
+    if not path.endswith("/"):
+        path += "/"
+    for suffix, name in ENDPOINT_PATHS:
+        if path.endswith(suffix):
+            return name
+    return "other"
+
+class TikTokHttpClient:
+    """ホストごとの接続プールを共有するスレッドセーフなHTTPクライアント
+
+    接続プール（HTTPAdapter）はホスト単位で全スレッドが共有し、
+    Cookie等の状態を持つ requests.Session はスレッドごとに分離する。
+    """
+
+    def __init__(self, pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None,
+                 pool_block: Optional[bool] = None, keep_alive: Optional[bool] = None,
+                 connect_timeout: Optional[float] = None):
+        """
+        HTTPクライアントを初期化
+
+        Args:
+            pool_connections: 保持するホストプール数
+            pool_maxsize: ホストごとの最大接続数
+            pool_block: プールが満杯の場合に空きを待つかどうか
+            keep_alive: 接続を再利用するかどうか
+            connect_timeout: 接続タイムアウト（秒）
+        """
+        config = Config()
+        self.pool_connections = pool_connections or config.HTTP_POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or config.HTTP_POOL_MAXSIZE
+        self.pool_block = config.HTTP_POOL_BLOCK if pool_block is None else pool_block
+        self.keep_alive = config.HTTP_KEEP_ALIVE if keep_alive is None else keep_alive
+        self.connect_timeout = connect_timeout or config.HTTP_CONNECT_TIMEOUT
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _get_adapter(self, base_url: str) -> HTTPAdapter:
+        """ホスト用の共有アダプター（接続プール）を取得"""
+        adapter = self._adapters.get(base_url)
+        if adapter is None:
+            with self._lock:
+                adapter = self._adapters.get(base_url)
+                if adapter is None:
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        pool_block=self.pool_block
+                    )
+                    self._adapters[base_url] = adapter
+                    self._stats[base_url] = {
+                        "requests": 0,
+                        "errors": 0,
+                        "total_time": 0.0,
+                        "endpoints": {}
+                    }
+                    logger.debug(f"接続プールを作成: {base_url} (maxsize: {self.pool_maxsize})")
+        return adapter
+
+    def _get_session(self, base_url: str) -> requests.Session:
+        """現在のスレッド用のセッションを取得"""
+        sessions = getattr(self._local, "sessions", None)
+        if sessions is None:
+            sessions = self._local.sessions = {}
+
+        session = sessions.get(base_url)
+        if session is None:
+            session = requests.Session()
+            session.mount(base_url, self._get_adapter(base_url))
+            if not self.keep_alive:
+                session.headers["Connection"] = "close"
+            sessions[base_url] = session
+        return session
+
+    def get_timeout(self, endpoint: str) -> Tuple[float, float]:
+        """エンドポイントの（接続, 読み込み）タイムアウトを取得"""
+        read_timeout = ENDPOINT_READ_TIMEOUTS.get(endpoint, Config.HTTP_READ_TIMEOUT)
+        return (self.connect_timeout, read_timeout)
+
+    def request(self, method: str, url: str, endpoint: Optional[str] = None,
+                timeout: Optional[Any] = None, **kwargs) -> requests.Response:
+        """
+        プール済み接続でHTTPリクエストを実行
+
+        Args:
+            method: HTTPメソッド
+            url: リクエストURL
+            endpoint: エンドポイント名（省略時はURLから判定）
+            timeout: タイムアウト（省略時はエンドポイント別の設定値）
+            **kwargs: requests.Session.request に渡す引数
+
+        Returns:
+            レスポンス
+        """
+        parts = urlsplit(url)
+        base_url = f"{parts.scheme}://{parts.netloc}"
+        endpoint = endpoint or resolve_endpoint(url)
+        if timeout is None:
+            timeout = self.get_timeout(endpoint)
+
+        session = self._get_session(base_url)
+        started = time.monotonic()
+        failed = False
+        try:
+            return session.request(method.upper(), url, timeout=timeout, **kwargs)
+        except requests.exceptions.RequestException:
+            failed = True
+            raise
+        finally:
+            self._record(base_url, endpoint, time.monotonic() - started, failed)
+
+    def _record(self, base_url: str, endpoint: str, elapsed: float, failed: bool) -> None:
+        """リクエスト統計を記録"""
+        with self._lock:
+            stats = self._stats[base_url]
+            stats["requests"] += 1
+            stats["total_time"] += elapsed
+            if failed:
+                stats["errors"] += 1
+            stats["endpoints"][endpoint] = stats["endpoints"].get(endpoint, 0) + 1
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        接続プールの統計情報を取得
+
+        Returns:
+            ホストごとのリクエスト数・新規接続数・待機中接続数などを含む辞書
+        """
+        with self._lock:
+            adapters = dict(self._adapters)
+            stats = {base_url: dict(s, endpoints=dict(s["endpoints"])) for base_url, s in self._stats.items()}
+
+        hosts = {}
+        for base_url, adapter in adapters.items():
+            host_stats = stats[base_url]
+            connections_created = 0
+            idle_connections = 0
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                connections_created += pool.num_connections
+                if pool.pool is not None:
+                    idle_connections += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+
+            requests_count = host_stats["requests"]
+            hosts[base_url] = {
+                "requests": requests_count,
+                "errors": host_stats["errors"],
+                "connections_created": connections_created,
+                "connections_reused": max(requests_count - connections_created, 0),
+                "idle_connections": idle_connections,
+                "avg_latency_ms": round(host_stats["total_time"] / requests_count * 1000, 1) if requests_count else 0.0,
+                "endpoints": host_stats["endpoints"]
+            }
+
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "pool_block": self.pool_block,
+            "keep_alive": self.keep_alive,
+            "hosts": hosts
+        }
+
+    def close(self) -> None:
+        """すべての接続プールを閉じる"""
+        with self._lock:
+            for adapter in self._adapters.values():
+                adapter.close()
+            self._adapters.clear()
+            self._stats.clear()
+        self._local = threading.local()
+        logger.debug("すべての接続プールを閉じました")
+
+# グローバルHTTPクライアントインスタンス
+http_client = TikTokHttpClient()
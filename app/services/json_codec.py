@@ -0,0 +1,87 @@
+"""JSONエンコード/デコード（orjsonがインストールされていれば使用し、なければ標準ライブラリ）"""
+
+import json
+import logging
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjsonは任意の依存
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def _default(obj: Any) -> Any:
+    """標準でエンコードできない値を変換（動画・プロフィールのレコードは辞書に変換）"""
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+class JsonCodec:
+    """JSONバックエンドの切り替えを吸収するコーデック
+
+    どちらのバックエンドでも非ASCII文字はエスケープせず、
+    区切り文字は空白なし（indent指定時は2スペース）で出力する。
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        """
+        コーデックを初期化
+
+        Args:
+            backend: "orjson" または "json"（省略時はorjsonが利用可能ならorjson）
+        """
+        if backend is None:
+            backend = "orjson" if orjson is not None else "json"
+        if backend == "orjson" and orjson is None:
+            raise ValueError("orjsonがインストールされていません")
+        if backend not in ("orjson", "json"):
+            raise ValueError(f"Unsupported JSON backend: {backend}")
+        self.backend = backend
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        """JSONをデコード
+
+        Raises:
+            ValueError: JSONとして不正な場合（json.JSONDecodeError）
+        """
+        if self.backend == "orjson":
+            return orjson.loads(data)
+        return json.loads(data)
+
+    def dumps_bytes(self, obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        """JSONをUTF-8のバイト列にエンコード
+
+        Args:
+            default: 標準でエンコードできない値の変換（省略時はレコードをto_dictで辞書に変換）
+        """
+        default = default or _default
+        if self.backend == "orjson":
+            option = orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=default, option=option)
+        if indent:
+            return json.dumps(obj, ensure_ascii=False, indent=2, default=default).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default).encode("utf-8")
+
+    def dumps(self, obj: Any, indent: bool = False) -> str:
+        """JSONを文字列にエンコード"""
+        return self.dumps_bytes(obj, indent=indent).decode("utf-8")
+
+# グローバルコーデックインスタンス
+codec = JsonCodec()
+logger.debug(f"JSONバックエンド: {codec.backend}")
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """JSONをデコード"""
+    return codec.loads(data)
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """JSONを文字列にエンコード"""
+    return codec.dumps(obj, indent=indent)
+
+def dumps_bytes(obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """JSONをUTF-8のバイト列にエンコード"""
+    return codec.dumps_bytes(obj, indent=indent, default=default)
@@ -0,0 +1,169 @@
+"""動画の統計の列指向表現とベクトル化した集計（NumPy）
+
+動画リスト（辞書またはVideoRecordのリスト）を再生数・いいね数・コメント数・シェア数・投稿日時の配列に変換し、
+エンゲージメント率・合計・平均・パーセンタイルをアカウント単位（または複数アカウント同時）に計算する。
+エンゲージメント率は utils.calculate_engagement_rate と同じ演算順序・上限・四捨五入で求めるため結果は一致する。
+"""
+
+import logging
+from operator import attrgetter
+from typing import Dict, Any, Iterable, List, Optional, Sequence
+import numpy as np
+from app.services.utils import engagement_tier_factor, MAX_ENGAGEMENT_RATE
+
+logger = logging.getLogger(__name__)
+
+# 列として保持するフィールド
+METRIC_FIELDS = ("view_count", "like_count", "comment_count", "share_count", "create_time")
+
+def _round1(values: np.ndarray) -> np.ndarray:
+    """小数第一位で四捨五入（Pythonのround()と同じ結果）
+
+    np.roundは10倍してから偶数丸めするため、10倍した値が x.x5 付近になる場合は
+    10倍の誤差でround()と結果が異なることがある（0.15など）。それ以外の値はnp.roundの結果が
+    round()と一致するため、境界付近の値のみround()で丸め直す。
+    """
+    scaled = values * 10
+    rounded = np.round(scaled) / 10
+    # 10倍の誤差（相対2**-52程度）より十分広い幅で境界付近を判定する
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-9 * np.maximum(np.abs(scaled), 1.0)
+    if near_half.any():
+        rounded[near_half] = [round(value, 1) for value in values[near_half].tolist()]
+    return rounded
+
+def _tier_factors(follower_counts: np.ndarray) -> np.ndarray:
+    """フォロワー数の配列に対する調整係数（engagement_tier_factorと同じ区分）"""
+    boundaries = np.array([1000, 10000, 100000])
+    factors = np.array([engagement_tier_factor(int(boundary)) for boundary in boundaries]
+                       + [engagement_tier_factor(int(boundaries[-1]) + 1)])
+    return factors[np.searchsorted(boundaries, follower_counts, side="left")]
+
+def _engagement(total_engagement: np.ndarray, follower_counts: np.ndarray) -> np.ndarray:
+    """エンゲージメント数とフォロワー数からエンゲージメント率を計算（丸め前）"""
+    follower_counts = np.asarray(follower_counts, dtype=np.int64)
+    valid = follower_counts > 0
+    safe_followers = np.where(valid, follower_counts, 1)
+    base = total_engagement / safe_followers * 100
+    rates = np.minimum(base * _tier_factors(safe_followers), MAX_ENGAGEMENT_RATE)
+    return np.where(valid, rates, 0.0)
+
+def _column(videos: List[Dict[str, Any]], field: str) -> List[int]:
+    """動画のリストから1フィールド分の値を取り出す（欠損とNoneは0）"""
+    try:
+        # VideoRecordはスロットをattrgetterでまとめて参照する（1件ずつgetを呼ぶより速い）
+        values = list(map(attrgetter(field), videos))
+    except AttributeError:
+        return [video.get(field, 0) or 0 for video in videos]
+    if None in values:
+        values = [value or 0 for value in values]
+    return values
+
+class VideoMetrics:
+    """動画の統計の列（1アカウント分、または複数アカウントをまとめたもの）"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], owners: Optional[np.ndarray] = None,
+                 accounts: Sequence[str] = ()):
+        """
+        列から作成（通常は from_videos / from_accounts を使う）
+
+        Args:
+            columns: フィールドごとのint64配列
+            owners: 動画ごとのアカウント番号（accountsの添字）
+            accounts: アカウントのopen_id
+        """
+        self.columns = columns
+        self.owners = owners if owners is not None else np.zeros(len(columns["view_count"]), dtype=np.int64)
+        self.accounts = list(accounts)
+
+    @classmethod
+    def from_videos(cls, videos: Iterable[Dict[str, Any]], open_id: str = "") -> "VideoMetrics":
+        """1アカウントの動画リストから作成"""
+        return cls.from_accounts({open_id: videos})
+
+    @classmethod
+    def from_accounts(cls, videos_by_account: Dict[str, Iterable[Dict[str, Any]]]) -> "VideoMetrics":
+        """アカウントごとの動画リストから作成"""
+        accounts = list(videos_by_account)
+        video_lists = [list(videos_by_account[open_id]) for open_id in accounts]
+        owners = np.repeat(np.arange(len(accounts), dtype=np.int64), [len(videos) for videos in video_lists])
+        rows = [video for videos in video_lists for video in videos]
+        columns = {field: np.array(_column(rows, field), dtype=np.int64) for field in METRIC_FIELDS}
+        return cls(columns, owners, accounts)
+
+    def __len__(self) -> int:
+        return len(self.owners)
+
+    @property
+    def engagement_counts(self) -> np.ndarray:
+        """動画ごとのエンゲージメント数（いいね + コメント + シェア）"""
+        return self.columns["like_count"] + self.columns["comment_count"] + self.columns["share_count"]
+
+    def engagement_rates(self, follower_counts: Any) -> np.ndarray:
+        """
+        動画ごとのエンゲージメント率（calculate_engagement_rateと同じ結果）
+
+        Args:
+            follower_counts: フォロワー数（全動画共通の値、またはaccountsと同じ順序の配列）
+        """
+        followers = np.asarray(follower_counts, dtype=np.int64)
+        if followers.ndim:
+            followers = followers[self.owners]
+        else:
+            followers = np.full(len(self), int(followers), dtype=np.int64)
+        return _round1(_engagement(self.engagement_counts, followers))
+
+    def totals(self) -> List[Dict[str, int]]:
+        """アカウントごとの合計（accountsと同じ順序）"""
+        size = max(len(self.accounts), 1)
+        counts = np.bincount(self.owners, minlength=size)
+        result = [{"video_count": count} for count in counts.tolist()]
+        for field in ("view_count", "like_count", "comment_count", "share_count"):
+            # bincountのweightsはfloat64になるため、int64のまま集計する
+            totals = np.zeros(size, dtype=np.int64)
+            np.add.at(totals, self.owners, self.columns[field])
+            for index, total in enumerate(totals.tolist()):
+                result[index][f"total_{field}"] = total
+        return result
+
+    def average_engagement_rates(self, follower_counts: Sequence[int]) -> List[float]:
+        """アカウントごとの合計エンゲージメント率（calculate_average_engagement_rateと同じ結果）"""
+        size = max(len(self.accounts), 1)
+        engagement = np.zeros(size, dtype=np.int64)
+        np.add.at(engagement, self.owners, self.engagement_counts)
+        counts = np.bincount(self.owners, minlength=size)
+        rates = _engagement(engagement, np.asarray(follower_counts, dtype=np.int64))
+        rates = np.where(counts > 0, rates, 0.0)
+        return _round1(rates).tolist()
+
+    def percentiles(self, field: str, percents: Sequence[float] = (50, 90, 99)) -> List[Dict[str, float]]:
+        """アカウントごとのフィールドのパーセンタイル（動画のないアカウントは空）"""
+        size = max(len(self.accounts), 1)
+        column = self.columns[field]
+        result = []
+        for index in range(size):
+            values = column[self.owners == index]
+            if len(values) == 0:
+                result.append({})
+                continue
+            points = np.percentile(values, percents)
+            result.append({f"p{percent:g}": float(point) for percent, point in zip(percents, points)})
+        return result
+
+    def summary(self, follower_count: int) -> Dict[str, Any]:
+        """1アカウント分のダッシュボード用の集計"""
+        totals = self.totals()[0]
+        totals["avg_engagement_rate"] = self.average_engagement_rates([follower_count])[0]
+        totals["view_percentiles"] = self.percentiles("view_count")[0]
+        return totals
+
+    def summaries(self, follower_counts: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+        """複数アカウント分の集計（open_idごと）"""
+        followers = [follower_counts.get(open_id, 0) or 0 for open_id in self.accounts]
+        totals = self.totals()
+        rates = self.average_engagement_rates(followers)
+        view_percentiles = self.percentiles("view_count")
+        result = {}
+        for index, open_id in enumerate(self.accounts):
+            result[open_id] = dict(totals[index], avg_engagement_rate=rates[index],
+                                   view_percentiles=view_percentiles[index])
+        return result
@@ -1,7 +1,9 @@
 """ページネーション機能モジュール"""
 
+import base64
+import binascii
 import math
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 def paginate_videos(videos: List[Dict[str, Any]], page: int = 1, per_page: int = 10) -> Dict[str, Any]:
     """
@@ -94,4 +96,75 @@ def get_pagination_summary(pagination_info: Dict[str, Any]) -> str:
     if total == 0:
         return "動画が見つかりません"
     
-    return f"{total}件中 {start_index}-{end_index}件を表示 (ページ {page}/{total_pages})" 
+    return f"{total}件中 {start_index}-{end_index}件を表示 (ページ {page}/{total_pages})"
+
+def encode_cursor(video: Dict[str, Any]) -> str:
+    """
+    動画の位置を表す不透明なカーソルを生成
+    
+    Args:
+        video: ページの最後の動画
+        
+    Returns:
+        カーソル文字列（投稿日時と動画IDをURLセーフなBase64で符号化）
+    """
+    raw = f"{video.get('create_time') or 0}:{video.get('id') or ''}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    """
+    カーソルを（投稿日時, 動画ID）に復号
+    
+    Raises:
+        ValueError: 不正なカーソルの場合
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        create_time, video_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split(":", 1)
+        return int(create_time), video_id
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"不正なカーソルです: {cursor}") from e
+
+def paginate_videos_by_cursor(videos: List[Dict[str, Any]], cursor: Optional[str] = None, per_page: int = 10) -> Dict[str, Any]:
+    """
+    新しい順に並んだ動画リストをカーソルでページネーション処理
+    
+    ページ番号と異なり、ページ間に新しい動画が追加されても重複や欠落が起きない。
+    
+    Args:
+        videos: 動画リスト（投稿日時・動画IDの新しい順）
+        cursor: 前のページのnext_cursor（省略時は先頭から）
+        per_page: 1ページあたりの表示件数
+        
+    Returns:
+        ページネーション情報を含む辞書
+        
+    Raises:
+        ValueError: 不正なカーソルの場合
+    """
+    start = 0
+    if cursor:
+        position = decode_cursor(cursor)
+        # カーソルより古い最初の動画を二分探索
+        low, high = 0, len(videos)
+        while low < high:
+            middle = (low + high) // 2
+            video = videos[middle]
+            if ((video.get('create_time') or 0), (video.get('id') or '')) < position:
+                high = middle
+            else:
+                low = middle + 1
+        start = low
+    
+    current_videos = videos[start:start + per_page]
+    has_next = start + per_page < len(videos)
+    
+    return {
+        'videos': current_videos,
+        'total': len(videos),
+        'per_page': per_page,
+        'has_next': has_next,
+        'next_cursor': encode_cursor(current_videos[-1]) if has_next and current_videos else None,
+        'start_index': start + 1 if current_videos else 0,
+        'end_index': start + len(current_videos)
+    }
@@ -0,0 +1,177 @@
+"""APIリクエストのフィールド射影と、射影済みエントリを再利用するキャッシュ"""
+
+import logging
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple, FrozenSet
+from app.services.cache import Cache, profile_cache, video_cache
+
+logger = logging.getLogger(__name__)
+
+# user/info で取得できるフィールド（user.info.basic, user.info.profile, user.info.stats スコープ）
+PROFILE_FIELDS = (
+    "open_id", "display_name", "username", "avatar_url", "bio_description", "profile_web_link",
+    "profile_deep_link", "is_verified", "follower_count", "following_count", "video_count", "likes_count",
+)
+
+# プロフィールのうち投稿やフォローによって変わる統計のフィールド
+PROFILE_COUNTER_FIELDS = frozenset(("follower_count", "following_count", "video_count", "likes_count"))
+
+# video/query で取得する動画詳細フィールド
+VIDEO_DETAIL_FIELDS = (
+    "id", "title", "duration", "view_count", "like_count", "comment_count", "share_count",
+    "embed_link", "cover_image_url", "height", "width", "create_time",
+)
+
+# 動画一覧の詳細一括取得で使うフィールド（結果を動画詳細のキャッシュにも使えるよう詳細と同じフィールドにする）
+VIDEO_BATCH_FIELDS = VIDEO_DETAIL_FIELDS
+
+def normalize_fields(fields: Optional[Iterable[str]], default: Tuple[str, ...],
+                     required: Tuple[str, ...] = ()) -> Tuple[str, ...]:
+    """
+    要求フィールドを正規化
+
+    Args:
+        fields: 呼び出し元が必要とするフィールド（省略時はdefault）
+        default: 取得可能なフィールド（この順序で返す）
+        required: 常に含めるフィールド
+
+    Returns:
+        defaultの順序に並べた重複のないフィールド
+
+    Raises:
+        ValueError: 取得できないフィールドが含まれる場合
+    """
+    if fields is None:
+        return default
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    requested = {field.strip() for field in fields if field.strip()} | set(required)
+    unknown = requested - set(default)
+    if unknown:
+        raise ValueError(f"取得できないフィールドです: {', '.join(sorted(unknown))}")
+    return tuple(field for field in default if field in requested)
+
+class ProjectedCache:
+    """フィールドセットごとにエントリを保存し、要求フィールドを包含するエントリで応答するキャッシュ
+
+    例えばプロフィール全体がキャッシュ済みなら、follower_count のみの要求にもそのエントリを返す。
+    リソースごとのフィールドセットの索引もキャッシュに保存するため、共有バックエンドでは
+    他のワーカーが保存したエントリも利用できる。
+    """
+
+    def __init__(self, cache: Cache):
+        self.cache = cache
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(base_key: str, fields: Tuple[str, ...]) -> str:
+        """フィールドセットを含むキャッシュキーを生成"""
+        return f"{base_key}:{','.join(sorted(fields))}"
+
+    @staticmethod
+    def index_key(base_key: str) -> str:
+        """リソースのフィールドセットの索引のキャッシュキー"""
+        return f"{base_key}:__fields__"
+
+    def _field_sets(self, base_key: str) -> List[FrozenSet[str]]:
+        """リソースのキャッシュ済みフィールドセット"""
+        return [frozenset(fields) for fields in self.cache.get_stale(self.index_key(base_key)) or ()]
+
+    def _candidates(self, base_key: str, fields: Tuple[str, ...]) -> List[FrozenSet[str]]:
+        """要求フィールドを包含するフィールドセット"""
+        wanted = frozenset(fields)
+        return [field_set for field_set in self._field_sets(base_key) if wanted <= field_set]
+
+    def get(self, base_key: str, fields: Tuple[str, ...], stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        要求フィールドを包含するキャッシュ済みエントリを取得
+
+        Args:
+            base_key: リソースのキー
+            fields: 要求フィールド
+            stale: 期限切れのエントリも対象にするかどうか
+
+        Returns:
+            要求フィールドを包含するエントリ（なければNone）
+        """
+        # 狭いフィールドセットから順に確認する
+        for field_set in sorted(self._candidates(base_key, fields), key=len):
+            entry = self.cache.get_entry(self.key(base_key, tuple(field_set)))
+            if entry is None:
+                self._forget(base_key, field_set)
+                continue
+            value, age, ttl = entry
+            if stale or age < ttl:
+                return value
+        return None
+
+    def get_entry(self, base_key: str, fields: Tuple[str, ...]) -> Optional[Tuple[Dict[str, Any], float, int]]:
+        """
+        要求フィールドを包含するエントリのうち最も新しいものを期限切れを含めて取得
+
+        Returns:
+            (エントリ, 保存からの経過秒数, TTL)、またはNone
+        """
+        newest = None
+        for field_set in self._candidates(base_key, fields):
+            entry = self.cache.get_entry(self.key(base_key, tuple(field_set)))
+            if entry is None:
+                self._forget(base_key, field_set)
+            elif newest is None or entry[1] < newest[1]:
+                newest = entry
+        return newest
+
+    def set(self, base_key: str, fields: Tuple[str, ...], value: Dict[str, Any], tags: Iterable[str] = ()) -> None:
+        """
+        フィールドセットとともにエントリを保存
+
+        Args:
+            tags: エントリに付けるタグ（Cache.invalidate_tagで削除する）
+        """
+        field_set = frozenset(fields)
+        self.cache.set(self.key(base_key, fields), value, tags=tags)
+        with self._lock:
+            field_sets = self._field_sets(base_key)
+            if field_set not in field_sets:
+                field_sets.append(field_set)
+            # エントリより先に索引が削除されないよう、保存のたびに索引も保存し直す
+            self._save_index(base_key, field_sets)
+
+    def set_many(self, items: Iterable[Tuple[str, Dict[str, Any]]], fields: Tuple[str, ...],
+                 tags: Iterable[str] = ()) -> None:
+        """
+        同じフィールドセットの複数のリソースのエントリをまとめて保存
+
+        Args:
+            items: (リソースのキー, エントリ) のリスト
+        """
+        items = list(items)
+        field_set = frozenset(fields)
+        self.cache.set_many(((self.key(base_key, fields), value) for base_key, value in items), tags=tags)
+        with self._lock:
+            indexes = []
+            for base_key, _ in items:
+                field_sets = self._field_sets(base_key)
+                if field_set not in field_sets:
+                    field_sets.append(field_set)
+                indexes.append((self.index_key(base_key), [tuple(sorted(fields)) for fields in field_sets]))
+            self.cache.set_many(indexes)
+
+    def _forget(self, base_key: str, field_set: FrozenSet[str]) -> None:
+        """保持期間を過ぎたフィールドセットを索引から削除"""
+        with self._lock:
+            field_sets = self._field_sets(base_key)
+            if field_set in field_sets:
+                field_sets.remove(field_set)
+                self._save_index(base_key, field_sets)
+
+    def _save_index(self, base_key: str, field_sets: List[FrozenSet[str]]) -> None:
+        """索引を保存（空の場合は削除、ロック内で呼ぶ）"""
+        if field_sets:
+            self.cache.set(self.index_key(base_key), [tuple(sorted(field_set)) for field_set in field_sets])
+        else:
+            self.cache.delete(self.index_key(base_key))
+
+# グローバル射影キャッシュインスタンス
+profile_projection = ProjectedCache(profile_cache)
+video_detail_projection = ProjectedCache(video_cache)
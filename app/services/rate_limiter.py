@@ -0,0 +1,210 @@
+"""TikTok APIのクライアント側レート制限（アクセストークン × エンドポイント単位のトークンバケット）"""
+
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# エンドポイントごとのレート制限（リクエスト数, 期間秒）
+ENDPOINT_RATE_LIMITS: Dict[str, Tuple[int, float]] = {
+    "user/info": (600, 60),
+    "video/list": (600, 60),
+    "video/query": (600, 60),
+    "creator_info": (20, 60),
+    "publish/init": (6, 60),
+    "status/fetch": (30, 60),
+}
+
+# 待機モード
+MODE_WAIT = "wait"
+MODE_FAIL = "fail"
+
+class RateLimitExceeded(Exception):
+    """クライアント側のレート制限に達した場合の例外"""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super().__init__(f"レート制限に達しました: {endpoint}（{retry_after:.1f}秒後に再試行可能）")
+
+def token_fingerprint(access_token: str) -> str:
+    """アクセストークンを識別用の短いハッシュに変換（トークン自体は保持しない）"""
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:16]
+
+class TokenBucket:
+    """予約方式のトークンバケット
+
+    トークンが不足している場合も予約としてマイナスに消費し、
+    各呼び出し元は自分の順番が来るまでの時間だけ待機する（到着順に処理される）。
+    """
+
+    def __init__(self, capacity: int, period: float):
+        """
+        トークンバケットを初期化
+
+        Args:
+            capacity: 期間あたりのリクエスト数
+            period: 期間（秒）
+        """
+        self.capacity = capacity
+        self.period = period
+        self.refill_rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """経過時間分のトークンを補充"""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self.updated_at = now
+
+    def reserve(self, max_wait: Optional[float]) -> Optional[float]:
+        """
+        トークンを1つ予約
+
+        Args:
+            max_wait: 許容する最大待機時間（秒）。0の場合は即時に取得できる場合のみ予約
+
+        Returns:
+            予約できた場合は待機すべき秒数、予約できなかった場合はNone
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, (1 - self.tokens) / self.refill_rate)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self.tokens -= 1
+            return wait
+
+    def time_until_available(self) -> float:
+        """次のトークンが利用可能になるまでの秒数"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (1 - self.tokens) / self.refill_rate)
+
+    def drain(self, penalty: float = 0.0) -> None:
+        """
+        バケットを空にする（サーバー側で429を受けた場合など）
+
+        Args:
+            penalty: 次のトークンが利用可能になるまでの秒数（0の場合は空にするのみ）
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            # 次のトークンがちょうどpenalty秒後に補充されるようにする
+            self.tokens = min(self.tokens, 0.0 if penalty <= 0 else 1.0 - penalty * self.refill_rate)
+
+    def remaining(self) -> float:
+        """現在利用可能なトークン数"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(self.tokens, 0.0)
+
+class RateLimiter:
+    """アクセストークン × エンドポイント単位のレート制限"""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, float]]] = None):
+        """
+        レート制限を初期化
+
+        Args:
+            limits: エンドポイントごとの（リクエスト数, 期間秒）
+        """
+        self.limits = dict(ENDPOINT_RATE_LIMITS if limits is None else limits)
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, access_token: str, endpoint: str) -> Optional[TokenBucket]:
+        """トークンバケットを取得（制限対象外のエンドポイントはNone）"""
+        limit = self.limits.get(endpoint)
+        if limit is None:
+            return None
+
+        key = (token_fingerprint(access_token), endpoint)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = TokenBucket(*limit)
+                    self._buckets[key] = bucket
+        return bucket
+
+    def acquire(self, access_token: str, endpoint: str, mode: Optional[str] = None,
+                max_wait: Optional[float] = None) -> float:
+        """
+        リクエストの実行枠を取得
+
+        Args:
+            access_token: アクセストークン
+            endpoint: エンドポイント名
+            mode: "wait"（枠が空くまで待機）または "fail"（即時に失敗）
+            max_wait: waitモードでの最大待機時間（秒）
+
+        Returns:
+            待機した秒数
+
+        Raises:
+            RateLimitExceeded: 枠を取得できなかった場合
+        """
+        bucket = self._get_bucket(access_token, endpoint)
+        if bucket is None:
+            return 0.0
+
+        mode = mode or Config.RATE_LIMIT_MODE
+        if max_wait is None:
+            max_wait = Config.RATE_LIMIT_MAX_WAIT
+
+        wait = bucket.reserve(0.0 if mode == MODE_FAIL else max_wait)
+        if wait is None:
+            retry_after = bucket.time_until_available()
+            logger.warning(f"クライアント側レート制限: {endpoint}（{retry_after:.1f}秒後に再試行可能）")
+            raise RateLimitExceeded(endpoint, retry_after)
+
+        if wait > 0:
+            logger.info(f"レート制限のため待機: {endpoint} {wait:.2f}秒")
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, access_token: str, endpoint: str, retry_after: float = 0.0) -> None:
+        """サーバー側でレート制限（429）を受けた場合にバケットを空にし、Retry-Afterの間は枠を出さない"""
+        bucket = self._get_bucket(access_token, endpoint)
+        if bucket is not None:
+            bucket.drain(retry_after)
+            logger.warning(f"サーバー側レート制限を検知: {endpoint}")
+
+    def time_until_available(self, access_token: str, endpoint: str) -> Optional[float]:
+        """次の実行枠までの秒数（制限対象外のエンドポイントはNone）"""
+        bucket = self._get_bucket(access_token, endpoint)
+        return bucket.time_until_available() if bucket is not None else None
+
+    def remaining(self, access_token: str, endpoint: str) -> Optional[Dict[str, Any]]:
+        """
+        エンドポイントの残り実行枠を取得
+
+        Returns:
+            上限・残り回数・次の枠までの秒数を含む辞書（制限対象外の場合はNone）
+        """
+        bucket = self._get_bucket(access_token, endpoint)
+        if bucket is None:
+            return None
+        return {
+            "limit": bucket.capacity,
+            "period": bucket.period,
+            "remaining": int(bucket.remaining()),
+            "retry_after": round(bucket.time_until_available(), 2)
+        }
+
+    def get_budget(self, access_token: str) -> Dict[str, Dict[str, Any]]:
+        """すべての制限対象エンドポイントの残り実行枠を取得"""
+        return {endpoint: self.remaining(access_token, endpoint) for endpoint in self.limits}
+
+# グローバルレート制限インスタンス
+rate_limiter = RateLimiter()
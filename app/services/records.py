@@ -0,0 +1,187 @@
+"""動画・プロフィールのレコード（辞書の代わりに __slots__ で保持する）
+
+キャッシュや同期済みの動画は件数が多く、1件ごとの辞書のオーバーヘッドがメモリの大半を占めるため、
+APIのJSON（辞書）を __slots__ のレコードに変換して保持する。レコードは読み出し専用の辞書と同じように
+扱え（get、[]、in、dict()）、テンプレートからは属性として参照できる。
+表示用の派生フィールド（best_image_url、formatted_create_time、engagement_rate_formatted）は保持せず、
+参照されたときに計算する。JSONレスポンスには to_dict、永続ストアには to_api の辞書を使う。
+
+メモリ使用量（benchmarks/records.py、動画10,000件）: 辞書 約13.5MB → レコード 約7.8MB
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from app.services.projection import PROFILE_FIELDS
+from app.services.utils import (
+    get_best_image_url, format_create_time, calculate_engagement_rate, format_engagement_rate
+)
+
+# 未設定のスロットを表す値
+_MISSING = object()
+
+class Record(Mapping):
+    """__slots__ のフィールドを辞書のように扱うレコードの基底クラス
+
+    FIELDS にないフィールドは _extra の辞書に保持する（通常はNoneのまま）。
+    """
+
+    # APIのフィールド（サブクラスで定義し、__slots__ にも使う）
+    FIELDS: Tuple[str, ...] = ()
+    # 参照時に計算する表示用フィールド（プロパティとして定義）
+    DERIVED: Tuple[str, ...] = ()
+
+    __slots__ = ("_extra",)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+        cls._derived_set = frozenset(cls.DERIVED)
+
+    def __init__(self, **fields):
+        self._extra: Optional[Dict[str, Any]] = None
+        self.update(fields)
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "Record":
+        """
+        APIのJSON（辞書）から作成
+
+        派生フィールドは参照時に計算するため、dataに含まれていても保持しない。
+        """
+        record = cls.__new__(cls)
+        fields = cls._field_set
+        derived = cls._derived_set
+        extra = None
+        for key, value in data.items():
+            if key in fields:
+                setattr(record, key, value)
+            elif key not in derived:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        record._extra = extra
+        return record
+
+    @classmethod
+    def coerce(cls, value: Dict[str, Any]) -> "Record":
+        """レコードはそのまま、辞書はレコードに変換して返す"""
+        return value if isinstance(value, cls) else cls.from_api(value)
+
+    def to_api(self) -> Dict[str, Any]:
+        """APIのJSONと同じ形の辞書（派生フィールドを含まない）"""
+        # 未設定のスロットはtry/exceptを使わずに除く（キャッシュのシリアライズで件数分呼ばれるため）
+        data = {}
+        for key in self.FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                data[key] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSONレスポンスやテンプレート用の辞書（派生フィールドを含む）"""
+        data = self.to_api()
+        for key in self.DERIVED:
+            try:
+                data[key] = getattr(self, key)
+            except AttributeError:
+                pass
+        return data
+
+    def copy(self) -> "Record":
+        return type(self).from_api(self.to_api())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # 最も多いスロットの参照はgetattrのみで済ませる
+        if key in self._field_set:
+            return getattr(self, key, default)
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set or key in self._derived_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._field_set:
+            setattr(self, key, value)
+        elif key in self._derived_set:
+            raise KeyError(f"派生フィールドは設定できません: {key}")
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def update(self, other: Any = (), **kwargs) -> None:
+        """辞書と同じく複数のフィールドを更新"""
+        items = other.items() if isinstance(other, Mapping) else other
+        for key, value in items:
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_api()!r})"
+
+class VideoRecord(Record):
+    """動画のレコード（video/list と video/query のフィールド）"""
+
+    FIELDS = (
+        "id", "title", "video_description", "create_time", "duration", "height", "width",
+        "cover_image_url", "share_url", "embed_link", "embed_html",
+        "view_count", "like_count", "comment_count", "share_count", "engagement_rate",
+    )
+    DERIVED = ("best_image_url", "formatted_create_time", "engagement_rate_formatted")
+
+    __slots__ = FIELDS
+
+    @property
+    def best_image_url(self) -> Optional[str]:
+        """最適な画像URL"""
+        return get_best_image_url(self)
+
+    @property
+    def formatted_create_time(self) -> str:
+        """表示用の投稿日時"""
+        return format_create_time(self.get("create_time"))
+
+    @property
+    def engagement_rate_formatted(self) -> str:
+        """表示用のエンゲージメント率（engagement_rateが未設定の場合はAttributeError）"""
+        return format_engagement_rate(self.engagement_rate)
+
+    def set_engagement(self, follower_count: int) -> "VideoRecord":
+        """フォロワー数からエンゲージメント率を計算して設定"""
+        self.engagement_rate = calculate_engagement_rate(
+            self.get("like_count", 0) or 0,
+            self.get("comment_count", 0) or 0,
+            self.get("share_count", 0) or 0,
+            follower_count
+        )
+        return self
+
+class ProfileRecord(Record):
+    """プロフィールのレコード（user/info のフィールド）"""
+
+    FIELDS = PROFILE_FIELDS
+
+    __slots__ = FIELDS
+
+def to_video_records(videos: Iterable[Dict[str, Any]]) -> List[VideoRecord]:
+    """動画のリストをレコードのリストに変換"""
+    return [VideoRecord.coerce(video) for video in videos]
@@ -0,0 +1,141 @@
+"""TikTok API呼び出しの再試行（指数バックオフ・フルジッター・Retry-After対応）"""
+
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+import requests
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 再試行対象のHTTPステータス
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# 再試行しても副作用が重複しないエンドポイント
+# publish/init（投稿の重複作成）と oauth/token（認可コードは1回限り）は再試行しない
+IDEMPOTENT_ENDPOINTS = frozenset({
+    "user/info",
+    "video/list",
+    "video/query",
+    "creator_info",
+    "status/fetch",
+    "upload",  # 同じContent-Rangeの再送は上書きになる
+})
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-Afterヘッダーを秒数に変換
+
+    Args:
+        value: ヘッダー値（秒数またはHTTP日付）
+
+    Returns:
+        待機秒数（解釈できない場合はNone）
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class RetryPolicy:
+    """再試行ポリシー"""
+
+    def __init__(self, max_attempts: Optional[int] = None, base_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None, budget: Optional[float] = None):
+        """
+        再試行ポリシーを初期化
+
+        Args:
+            max_attempts: 最大試行回数（初回を含む）
+            base_delay: バックオフの基準秒数
+            max_delay: 1回あたりの最大待機秒数
+            budget: 1リクエストあたりの再試行待機時間の合計上限（秒）
+        """
+        self.max_attempts = max_attempts or Config.RETRY_MAX_ATTEMPTS
+        self.base_delay = Config.RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = Config.RETRY_MAX_DELAY if max_delay is None else max_delay
+        self.budget = Config.RETRY_BUDGET_SECONDS if budget is None else budget
+
+    def is_retryable_endpoint(self, endpoint: str) -> bool:
+        """エンドポイントが再試行可能かどうか"""
+        return endpoint in IDEMPOTENT_ENDPOINTS
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        次の試行までの待機秒数を計算（フルジッター）
+
+        Args:
+            attempt: 失敗した試行の回数（1から開始）
+            retry_after: サーバーが指定した待機秒数
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+def retry_request(send: Callable[[], requests.Response], endpoint: str,
+                  policy: Optional[RetryPolicy] = None,
+                  ready_in: Optional[Callable[[], Optional[float]]] = None) -> requests.Response:
+    """
+    リクエストを再試行ポリシーに従って実行
+
+    Args:
+        send: 1回分のリクエストを実行してレスポンスを返す関数
+        endpoint: エンドポイント名（冪等性の判定に使用）
+        policy: 再試行ポリシー（省略時は設定値）
+        ready_in: 429の後に次の試行が可能になるまでの秒数を返す関数（sendがRetry-Afterをレート制限に
+                  反映する場合に指定し、Retry-Afterを二重に適用しない。Noneを返す場合はRetry-Afterに従う）
+
+    Returns:
+        最後に受け取ったレスポンス（ステータスの検証は呼び出し元で行う）
+
+    Raises:
+        requests.exceptions.RequestException: 再試行できない通信エラー
+    """
+    policy = policy or RetryPolicy()
+    max_attempts = policy.max_attempts if policy.is_retryable_endpoint(endpoint) else 1
+    spent = 0.0
+    attempt = 0
+
+    while True:
+        attempt += 1
+        retry_after = None
+        try:
+            response = send()
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt >= max_attempts:
+                raise
+            reason = f"{type(e).__name__}"
+            error = e
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_attempts:
+                return response
+            reason = f"HTTP {response.status_code}"
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status_code == 429 and ready_in is not None:
+                available_in = ready_in()
+                if available_in is not None:
+                    retry_after = available_in
+            error = None
+
+        delay = policy.backoff(attempt, retry_after)
+        if spent + delay > policy.budget:
+            logger.warning(f"再試行の予算を超えるため中止: {endpoint} ({reason}, 待機予定{delay:.1f}秒)")
+            if error is not None:
+                raise error
+            return response
+
+        logger.warning(f"再試行します: {endpoint} ({reason}) {attempt}/{max_attempts - 1}回目, {delay:.2f}秒後")
+        time.sleep(delay)
+        spent += delay
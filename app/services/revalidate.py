@@ -0,0 +1,142 @@
+"""キャッシュのstale-while-revalidate（期限切れ直後は古い値を返し、裏で1回だけ更新する）"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# バックグラウンド更新を実行するスレッドプール（すべてのキャッシュで共有）
+_refresh_executor = ThreadPoolExecutor(max_workers=Config.SWR_REFRESH_WORKERS, thread_name_prefix="cache-revalidate")
+
+class RevalidatePolicy:
+    """キーファミリーごとのstale-while-revalidateの設定"""
+
+    def __init__(self, grace: float, max_age: float):
+        """
+        Args:
+            grace: TTLを過ぎてから古い値を返す猶予（秒、0の場合は無効）
+            max_age: 古い値を返す上限の経過時間（秒、これを過ぎると呼び出し元が更新を待つ）
+        """
+        self.grace = grace
+        self.max_age = max_age
+
+    def serves_stale(self, age: float, ttl: float) -> bool:
+        """期限切れのエントリを古い値として返せるかどうか"""
+        return self.grace > 0 and age < min(ttl + self.grace, self.max_age)
+
+class StaleWhileRevalidate:
+    """1つのキャッシュに対するstale-while-revalidate
+
+    TTL内のエントリはそのまま返す（fresh）。TTLを過ぎても猶予内かつ上限の経過時間より新しければ
+    古い値をすぐに返し（stale）、同じキーのバックグラウンド更新が実行中でなければ1回だけ開始する。
+    猶予を過ぎた場合（expired）やエントリがない場合（miss）は呼び出し元が取得を待つ。
+    """
+
+    def __init__(self, name: str, policies: Dict[str, RevalidatePolicy]):
+        """
+        Args:
+            name: 統計表示用の名前（キャッシュ名）
+            policies: キーファミリーごとの設定
+        """
+        self.name = name
+        self.policies = policies
+        self._refreshing = set()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, family: str, key: str, lookup: Callable[[], Optional[Tuple[Any, float, float]]],
+            load: Callable[[], Any], refresh: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        キャッシュから値を取得し、必要に応じて更新
+
+        Args:
+            family: キーファミリー（設定と統計の単位）
+            key: バックグラウンド更新の重複判定のキー
+            lookup: キャッシュのエントリ (値, 経過秒数, TTL) を返す関数（なければNone）
+            load: 呼び出し元が待つ場合の取得関数
+            refresh: バックグラウンド更新の関数（省略時はload）
+
+        Returns:
+            キャッシュの値、または取得した値
+        """
+        entry = lookup()
+        if entry is not None:
+            value, age, ttl = entry
+            if age < ttl:
+                self._count(family, "fresh")
+                return value
+            policy = self.policies.get(family)
+            if policy is not None and policy.serves_stale(age, ttl):
+                self._count(family, "stale")
+                logger.debug(f"期限切れのキャッシュを返して更新: {self.name} {key} ({age:.0f}秒経過)")
+                self._refresh_in_background(family, key, refresh or load)
+                return value
+            self._count(family, "expired")
+        else:
+            self._count(family, "miss")
+        return load()
+
+    def refresh(self, family: str, key: str, refresh: Callable[[], Any]) -> None:
+        """キャッシュを無効化した直後などに、キーの更新をバックグラウンドで開始（実行中なら何もしない）"""
+        self._refresh_in_background(family, key, refresh)
+
+    def _refresh_in_background(self, family: str, key: str, refresh: Callable[[], Any]) -> None:
+        """同じキーの更新が実行中でなければバックグラウンドで更新"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                refresh()
+                self._count(family, "refreshed")
+            except Exception as e:
+                self._count(family, "refresh_failed")
+                logger.warning(f"キャッシュのバックグラウンド更新に失敗: {self.name} {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        try:
+            _refresh_executor.submit(run)
+        except RuntimeError:
+            # 終了処理中はバックグラウンド更新を行わない
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _count(self, family: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(family, {})
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """キーファミリーごとの応答の内訳（fresh/stale/expired/miss）と更新の回数"""
+        with self._lock:
+            return {
+                "families": {
+                    family: {
+                        "grace": self.policies[family].grace if family in self.policies else 0,
+                        "max_age": self.policies[family].max_age if family in self.policies else 0,
+                        **counts
+                    }
+                    for family, counts in self._counts.items()
+                },
+                "refreshing": len(self._refreshing)
+            }
+
+# キャッシュごとのインスタンス（プロフィール、動画の詳細・一覧）
+profile_revalidate = StaleWhileRevalidate("profile_cache", {
+    "profile": RevalidatePolicy(Config.SWR_PROFILE_GRACE, Config.SWR_PROFILE_MAX_AGE),
+})
+video_revalidate = StaleWhileRevalidate("video_cache", {
+    "video_detail": RevalidatePolicy(Config.SWR_VIDEO_DETAIL_GRACE, Config.SWR_VIDEO_DETAIL_MAX_AGE),
+    "video_list": RevalidatePolicy(Config.SWR_VIDEO_LIST_GRACE, Config.SWR_VIDEO_LIST_MAX_AGE),
+})
+
+def get_revalidate_stats() -> Dict[str, Dict[str, Any]]:
+    """すべてのキャッシュのstale-while-revalidateの統計を取得"""
+    return {revalidate.name: revalidate.stats() for revalidate in (profile_revalidate, video_revalidate)}
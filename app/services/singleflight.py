@@ -0,0 +1,96 @@
+"""同一キーの同時実行中リクエストを1つにまとめる（シングルフライト）"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    """実行中の呼び出し"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+class SingleFlight:
+    """同じキーの呼び出しが実行中であれば、その結果（または例外）を共有する"""
+
+    def __init__(self, name: str):
+        """
+        シングルフライトを初期化
+
+        Args:
+            name: 統計表示用の名前
+        """
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._collapsed = 0
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        キー単位で関数を1回だけ実行
+
+        Args:
+            key: 重複判定のキー
+            func: 実行する関数
+
+        Returns:
+            関数の戻り値（同時に待機した呼び出し元すべてに同じ値を返す）
+
+        Raises:
+            関数が送出した例外（待機した呼び出し元すべてに同じ例外を送出）
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._collapsed += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            logger.debug(f"実行中のリクエストに合流: {self.name} {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            if call.waiters:
+                logger.info(f"同時リクエストを集約: {self.name} {call.waiters}件")
+
+    def stats(self) -> Dict[str, int]:
+        """実行回数と集約された呼び出し数を取得"""
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "collapsed": self._collapsed,
+                "in_flight": len(self._calls)
+            }
+
+# サービスごとのシングルフライトインスタンス
+profile_flight = SingleFlight("user_profile")
+video_list_flight = SingleFlight("video_list")
+video_details_flight = SingleFlight("video_details")
+
+def get_singleflight_stats() -> Dict[str, Dict[str, int]]:
+    """すべてのシングルフライトの統計を取得"""
+    return {flight.name: flight.stats() for flight in (profile_flight, video_list_flight, video_details_flight)}
@@ -0,0 +1,205 @@
+"""動画の統計の時系列（スナップショットの記録・ダウンサンプリング・伸びの集計）
+
+スナップショットは永続ストアの細長いテーブル（動画ID, 解像度, 時刻, 統計）に保存する。
+記録時に生データ・1時間・1日の各解像度のバケットへ同時に書き込み（同じバケットでは
+最新の値で上書き）、解像度ごとの保持期間を過ぎた行は定期的に削除する。
+伸びの集計では期間に応じて点数が上限以下になる解像度を選ぶため、長い期間でも生データは走査しない。
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional
+from app.config import Config
+from app.services.store import store, Store, VIDEO_STAT_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+HOURLY = 3600
+DAILY = 86400
+
+# 1回の集計で返す点数の上限（グラフ描画用）
+MAX_POINTS = 500
+
+# 古い行を削除する間隔（秒）
+PRUNE_INTERVAL = 3600
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS video_stats (
+    video_id TEXT NOT NULL,
+    resolution INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    {', '.join(f'{column} INTEGER' for column in VIDEO_STAT_COLUMNS)},
+    PRIMARY KEY (video_id, resolution, bucket)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_video_stats_resolution_bucket ON video_stats (resolution, bucket);
+"""
+
+_UPSERT_SNAPSHOT = f"""
+INSERT OR REPLACE INTO video_stats (video_id, resolution, bucket, {', '.join(VIDEO_STAT_COLUMNS)})
+VALUES (?, ?, ?, {', '.join('?' for _ in VIDEO_STAT_COLUMNS)})
+"""
+
+class StatsHistory:
+    """動画の統計スナップショットの記録と集計"""
+
+    def __init__(self, target_store: Store = store):
+        """
+        時系列を初期化
+
+        Args:
+            target_store: 保存先の永続ストア
+        """
+        self.store = target_store
+        # (解像度, 保持期間) の一覧（細かい順）
+        self.resolutions = [
+            (Config.STATS_RAW_INTERVAL, Config.STATS_RAW_RETENTION),
+            (HOURLY, Config.STATS_HOURLY_RETENTION),
+            (DAILY, Config.STATS_DAILY_RETENTION)
+        ]
+        self._schema_ready = False
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+    def _ensure_schema(self) -> bool:
+        if not self._schema_ready:
+            self._schema_ready = self.store.ensure_schema(_SCHEMA)
+        return self._schema_ready
+
+    def record(self, videos: Iterable[Dict[str, Any]], timestamp: Optional[float] = None) -> int:
+        """
+        取得した動画の統計をスナップショットとして記録
+
+        Args:
+            videos: 統計（view_count等）を含む動画のリスト
+            timestamp: 記録時刻（省略時は現在時刻）
+
+        Returns:
+            記録した動画数
+        """
+        if not self.store.enabled or not self._ensure_schema():
+            return 0
+        now = int(timestamp if timestamp is not None else time.time())
+        rows = []
+        recorded = 0
+        for video in videos:
+            if not video.get("id") or video.get("view_count") is None:
+                continue
+            values = tuple(video.get(column) or 0 for column in VIDEO_STAT_COLUMNS)
+            for resolution, _ in self.resolutions:
+                rows.append((video["id"], resolution, now - now % resolution, *values))
+            recorded += 1
+        if not rows or not self.store.execute_many([(_UPSERT_SNAPSHOT, rows)]):
+            return 0
+
+        with self._lock:
+            prune_due = now - self._last_prune >= PRUNE_INTERVAL
+            if prune_due:
+                self._last_prune = now
+        if prune_due:
+            self.prune(now)
+        return recorded
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """保持期間を過ぎたスナップショットを削除"""
+        now = int(now if now is not None else time.time())
+        statements = [("DELETE FROM video_stats WHERE resolution = ? AND bucket < ?", [(resolution, now - retention)])
+                      for resolution, retention in self.resolutions]
+        if self.store.execute_many(statements):
+            logger.debug("保持期間を過ぎた統計スナップショットを削除")
+
+    def choose_resolution(self, window: int) -> int:
+        """期間を保持していて、点数が上限以下になる最も細かい解像度を選ぶ"""
+        for resolution, retention in self.resolutions:
+            if window <= retention and window / resolution <= MAX_POINTS:
+                return resolution
+        return DAILY
+
+    def get_video_growth(self, video_id: str, window: int = 7 * DAILY, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        動画の期間内の伸び（差分と1時間あたりの増加量）と時系列を取得
+
+        Args:
+            video_id: 動画ID
+            window: 期間（秒）
+            now: 期間の終端（省略時は現在時刻）
+        """
+        resolution = self.choose_resolution(window)
+        since = int(now if now is not None else time.time()) - window
+        rows = self.store.fetch_all(
+            f"SELECT bucket, {', '.join(VIDEO_STAT_COLUMNS)} FROM video_stats "
+            "WHERE video_id = ? AND resolution = ? AND bucket >= ? ORDER BY bucket",
+            (video_id, resolution, since - since % resolution)
+        ) if self._ensure_schema() else []
+        points = [self._point(row) for row in rows]
+        growth = self._growth(points)
+        growth.update({"video_id": video_id, "window": window, "resolution": resolution, "points": points})
+        return growth
+
+    def get_account_growth(self, open_id: str, window: int = 7 * DAILY, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        アカウント（保存済みの全動画の合計）の期間内の伸びと時系列を取得
+
+        差分は動画ごとの期間内の最初と最後の値の差を合計する。時系列はバケットごとの合計で、
+        そのバケットにスナップショットのない動画は含まれない。
+        """
+        resolution = self.choose_resolution(window)
+        since = int(now if now is not None else time.time()) - window
+        params = (open_id, resolution, since - since % resolution)
+        if not self._ensure_schema():
+            return {"open_id": open_id, "window": window, "resolution": resolution, "points": [],
+                    **self._growth([])}
+
+        sums = ", ".join(f"SUM(s.{column}) AS {column}" for column in VIDEO_STAT_COLUMNS)
+        rows = self.store.fetch_all(
+            f"SELECT s.bucket AS bucket, {sums} FROM video_stats s JOIN videos v ON v.id = s.video_id "
+            "WHERE v.open_id = ? AND s.resolution = ? AND s.bucket >= ? GROUP BY s.bucket ORDER BY s.bucket",
+            params
+        )
+        points = [self._point(row) for row in rows]
+
+        # 動画ごとの最初と最後のスナップショットの差を合計する
+        deltas = {column: 0 for column in VIDEO_STAT_COLUMNS}
+        ends = self.store.fetch_all(
+            f"SELECT s.video_id AS video_id, s.bucket AS bucket, {', '.join(f's.{column} AS {column}' for column in VIDEO_STAT_COLUMNS)} "
+            "FROM video_stats s JOIN videos v ON v.id = s.video_id "
+            "WHERE v.open_id = ? AND s.resolution = ? AND s.bucket >= ? ORDER BY s.video_id, s.bucket",
+            params
+        )
+        first: Dict[str, Any] = {}
+        last: Dict[str, Any] = {}
+        for row in ends:
+            first.setdefault(row["video_id"], row)
+            last[row["video_id"]] = row
+        for video_id, start_row in first.items():
+            for column in VIDEO_STAT_COLUMNS:
+                deltas[column] += (last[video_id][column] or 0) - (start_row[column] or 0)
+
+        growth = self._growth(points, deltas)
+        growth.update({"open_id": open_id, "window": window, "resolution": resolution,
+                       "videos": len(first), "points": points})
+        return growth
+
+    @staticmethod
+    def _point(row) -> Dict[str, Any]:
+        point = {"ts": row["bucket"]}
+        for column in VIDEO_STAT_COLUMNS:
+            point[column] = row[column] or 0
+        return point
+
+    @staticmethod
+    def _growth(points: List[Dict[str, Any]], deltas: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """最初と最後の点から差分と1時間あたりの増加量を計算"""
+        if len(points) < 2:
+            return {"start": None, "end": None,
+                    "deltas": deltas or {column: 0 for column in VIDEO_STAT_COLUMNS},
+                    "rates_per_hour": {column: 0.0 for column in VIDEO_STAT_COLUMNS}}
+        start, end = points[0], points[-1]
+        if deltas is None:
+            deltas = {column: end[column] - start[column] for column in VIDEO_STAT_COLUMNS}
+        hours = (end["ts"] - start["ts"]) / HOURLY
+        rates = {column: round(deltas[column] / hours, 2) if hours > 0 else 0.0 for column in VIDEO_STAT_COLUMNS}
+        return {"start": start["ts"], "end": end["ts"], "deltas": deltas, "rates_per_hour": rates}
+
+# グローバル時系列インスタンス
+stats_history = StatsHistory()
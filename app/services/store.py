@@ -0,0 +1,303 @@
+"""プロフィールと動画の永続ストア（SQLite）
+
+プロセス内キャッシュ（cache.py）と異なり再起動後も残るため、起動直後の表示や
+メモリに収まらない大量の動画の保持に使う。STORE_PATH が空の場合は無効。
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional
+from app.config import Config
+from app.services import json_codec
+
+logger = logging.getLogger(__name__)
+
+# 動画の統計カラム（インデックスを作成し、部分的な更新では値のあるものだけ上書きする）
+VIDEO_STAT_COLUMNS = ("view_count", "like_count", "comment_count", "share_count")
+
+# プロフィールの検索用カラム
+PROFILE_COLUMNS = ("display_name", "username", "avatar_url", "follower_count", "following_count",
+                   "video_count", "likes_count")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    open_id TEXT PRIMARY KEY,
+    display_name TEXT,
+    username TEXT,
+    avatar_url TEXT,
+    follower_count INTEGER,
+    following_count INTEGER,
+    video_count INTEGER,
+    likes_count INTEGER,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS videos (
+    id TEXT PRIMARY KEY,
+    open_id TEXT,
+    create_time INTEGER,
+    view_count INTEGER,
+    like_count INTEGER,
+    comment_count INTEGER,
+    share_count INTEGER,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_open_id_create_time ON videos (open_id, create_time DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_videos_open_id_view_count ON videos (open_id, view_count);
+CREATE INDEX IF NOT EXISTS idx_videos_open_id_like_count ON videos (open_id, like_count);
+CREATE INDEX IF NOT EXISTS idx_videos_open_id_share_count ON videos (open_id, share_count);
+CREATE TABLE IF NOT EXISTS video_sync_state (
+    open_id TEXT PRIMARY KEY,
+    backfill_cursor INTEGER,
+    complete INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+_UPSERT_VIDEO = f"""
+INSERT INTO videos (id, open_id, create_time, {', '.join(VIDEO_STAT_COLUMNS)}, data, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    open_id = COALESCE(excluded.open_id, videos.open_id),
+    create_time = COALESCE(excluded.create_time, videos.create_time),
+    {', '.join(f'{column} = COALESCE(excluded.{column}, videos.{column})' for column in VIDEO_STAT_COLUMNS)},
+    data = json_patch(videos.data, excluded.data),
+    updated_at = excluded.updated_at
+"""
+
+_UPSERT_PROFILE = f"""
+INSERT INTO profiles (open_id, {', '.join(PROFILE_COLUMNS)}, data, updated_at)
+VALUES (?, {', '.join('?' for _ in PROFILE_COLUMNS)}, ?, ?)
+ON CONFLICT(open_id) DO UPDATE SET
+    {', '.join(f'{column} = COALESCE(excluded.{column}, profiles.{column})' for column in PROFILE_COLUMNS)},
+    data = json_patch(profiles.data, excluded.data),
+    updated_at = excluded.updated_at
+"""
+
+class Store:
+    """プロフィールと動画のSQLiteストア
+
+    接続はスレッドごとに作成し、WALモードで読み込みと書き込みを並行させる。
+    書き込みは複数行をまとめて1トランザクションで行う。ストアの障害は
+    API呼び出しを妨げないよう、ログに記録して無視する。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        ストアを初期化
+
+        Args:
+            path: データベースファイルのパス（省略時はConfig.STORE_PATH、空の場合は無効）
+        """
+        self.path = Config.STORE_PATH if path is None else path
+        self.enabled = bool(self.path)
+        self._local = threading.local()
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """スレッドごとの接続を取得（初回はスキーマを作成）"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with self._init_lock:
+            if not self._initialized:
+                connection.executescript(_SCHEMA)
+                self._initialized = True
+        self._local.connection = connection
+        return connection
+
+    def upsert_videos(self, videos: Iterable[Dict[str, Any]], open_id: Optional[str] = None) -> int:
+        """
+        動画をまとめて保存（既存の動画は取得できたフィールドのみ更新）
+
+        Args:
+            videos: 動画のリスト
+            open_id: 投稿者のopen_id（不明な場合はNone、既存の値を保持）
+
+        Returns:
+            保存した件数
+        """
+        if not self.enabled:
+            return 0
+        now = time.time()
+        rows = [
+            (video["id"], open_id, video.get("create_time"),
+             *(video.get(column) for column in VIDEO_STAT_COLUMNS),
+             json_codec.dumps(video), now)
+            for video in videos if video.get("id")
+        ]
+        if not rows:
+            return 0
+        try:
+            connection = self._connect()
+            with connection:
+                connection.executemany(_UPSERT_VIDEO, rows)
+            return len(rows)
+        except sqlite3.Error as e:
+            logger.warning(f"動画の保存に失敗: {e}")
+            return 0
+
+    def upsert_profile(self, profile: Dict[str, Any]) -> bool:
+        """プロフィールを保存（open_idを含まない場合は保存しない）"""
+        if not self.enabled or not profile.get("open_id"):
+            return False
+        row = (profile["open_id"], *(profile.get(column) for column in PROFILE_COLUMNS),
+               json_codec.dumps(profile), time.time())
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute(_UPSERT_PROFILE, row)
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"プロフィールの保存に失敗: {e}")
+            return False
+
+    def get_video(self, video_id: str, open_id: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        アカウントの保存済みの動画を取得
+
+        他のアカウントの動画や投稿者が不明な動画は返さない。
+
+        Args:
+            video_id: 動画ID
+            open_id: 投稿者のopen_id
+            max_age: 許容する経過秒数（省略時は制限なし）
+        """
+        if not open_id:
+            return None
+        row = self._fetch_one("SELECT data, updated_at FROM videos WHERE id = ? AND open_id = ?", (video_id, open_id))
+        return self._decode(row, max_age)
+
+    def get_video_owner(self, video_id: str) -> Optional[str]:
+        """保存済みの動画の投稿者のopen_id（未保存または投稿者が不明な場合はNone）"""
+        row = self._fetch_one("SELECT open_id FROM videos WHERE id = ?", (video_id,))
+        return row["open_id"] if row else None
+
+    def get_videos(self, open_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """アカウントの保存済み動画を新しい順に取得"""
+        if not self.enabled:
+            return []
+        try:
+            rows = self._connect().execute(
+                "SELECT data FROM videos WHERE open_id = ? ORDER BY create_time DESC, id DESC LIMIT ?",
+                (open_id, -1 if limit is None else limit)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"動画の読み込みに失敗: {e}")
+            return []
+        return [json_codec.loads(row["data"]) for row in rows]
+
+    def get_videos_updated_at(self, open_id: str) -> Optional[float]:
+        """アカウントの保存済み動画のうち最も古い更新日時（統計の鮮度の判定用）"""
+        row = self._fetch_one("SELECT MIN(updated_at) AS updated_at FROM videos WHERE open_id = ?", (open_id,))
+        return row["updated_at"] if row else None
+
+    def get_video_sync_state(self, open_id: str) -> Optional[Dict[str, Any]]:
+        """アカウントの動画の初回同期の進捗（未保存の場合はNone）"""
+        row = self._fetch_one("SELECT backfill_cursor, complete FROM video_sync_state WHERE open_id = ?", (open_id,))
+        if row is None:
+            return None
+        return {"backfill_cursor": row["backfill_cursor"], "complete": bool(row["complete"])}
+
+    def set_video_sync_state(self, open_id: str, backfill_cursor: Optional[int], complete: bool) -> bool:
+        """
+        アカウントの動画の初回同期の進捗を保存
+
+        Args:
+            open_id: ユーザーのopen_id
+            backfill_cursor: 残りのページを取得するカーソル（取得済みの場合はNone）
+            complete: 最大件数までの動画をすべて保存済みかどうか
+        """
+        return self.execute_many([(
+            "INSERT OR REPLACE INTO video_sync_state (open_id, backfill_cursor, complete, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            [(open_id, backfill_cursor, int(complete), time.time())]
+        )])
+
+    def get_profile(self, open_id: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """保存済みのプロフィールを取得"""
+        row = self._fetch_one("SELECT data, updated_at FROM profiles WHERE open_id = ?", (open_id,))
+        return self._decode(row, max_age)
+
+    def ensure_schema(self, script: str) -> bool:
+        """追加のテーブルを作成（他のサービスが同じデータベースを使う場合）"""
+        if not self.enabled:
+            return False
+        try:
+            self._connect().executescript(script)
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"テーブルの作成に失敗: {e}")
+            return False
+
+    def execute_many(self, statements: Iterable[tuple]) -> bool:
+        """
+        複数のSQLを1トランザクションで実行
+
+        Args:
+            statements: (SQL, パラメータのリスト) のリスト
+
+        Returns:
+            成功したかどうか
+        """
+        if not self.enabled:
+            return False
+        try:
+            connection = self._connect()
+            with connection:
+                for sql, rows in statements:
+                    connection.executemany(sql, rows)
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"ストアへの書き込みに失敗: {e}")
+            return False
+
+    def fetch_all(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """SQLを実行してすべての行を取得（失敗した場合は空のリスト）"""
+        if not self.enabled:
+            return []
+        try:
+            return self._connect().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"ストアの読み込みに失敗: {e}")
+            return []
+
+    def _fetch_one(self, sql: str, params: tuple) -> Optional[sqlite3.Row]:
+        if not self.enabled:
+            return None
+        try:
+            return self._connect().execute(sql, params).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"ストアの読み込みに失敗: {e}")
+            return None
+
+    @staticmethod
+    def _decode(row: Optional[sqlite3.Row], max_age: Optional[float]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        if max_age is not None and time.time() - row["updated_at"] > max_age:
+            return None
+        return json_codec.loads(row["data"])
+
+    def close(self) -> None:
+        """現在のスレッドの接続を閉じる"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+# グローバルストアインスタンス
+store = Store()
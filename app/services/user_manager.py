@@ -33,7 +33,7 @@ class UserManager:
                 return False
             
             # ユーザープロフィールを取得
-            profile = get_user_profile(access_token)
+            profile = get_user_profile(access_token, open_id=open_id)
             
             # 現在時刻を取得
             current_time = datetime.now()
@@ -123,7 +123,7 @@ class UserManager:
         
         try:
             # プロフィールを再取得
-            profile = get_user_profile(user['access_token'])
+            profile = get_user_profile(user['access_token'], open_id=open_id)
             
             # ユーザー情報を更新
             user.update({
@@ -1,36 +1,109 @@
 """アプリケーション共通ユーティリティ"""
 
 import logging
+import time
 import requests
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 from app.config import Config
+from app.services.http_client import http_client, resolve_endpoint
+from app.services.rate_limiter import rate_limiter, RateLimitExceeded
+from app.services.retry import retry_request, parse_retry_after
+from app.services.circuit_breaker import circuit_breakers
+from app.services import json_codec
 
 logger = logging.getLogger(__name__)
 
+def send_api_request(method: str, url: str, access_token: str, endpoint: Optional[str] = None,
+                     rate_limit_mode: Optional[str] = None, **kwargs) -> requests.Response:
+    """レート制限・サーキットブレーカー・再試行を適用してTikTok APIへリクエストを送信
+    
+    Args:
+        endpoint: エンドポイント名（省略時はURLから判定）
+        rate_limit_mode: レート制限時の動作（"wait" または "fail"、省略時は設定値）
+        **kwargs: http_client.request に渡す引数
+    
+    Returns:
+        最後に受け取ったレスポンス（ステータスの検証は呼び出し元で行う）
+    
+    Raises:
+        RateLimitExceeded: クライアント側のレート制限に達した場合
+        CircuitOpenError: エンドポイント系統のサーキットブレーカーが開いている場合
+    """
+    endpoint = endpoint or resolve_endpoint(url)
+    breaker = circuit_breakers.get(endpoint)
+    
+    def send() -> requests.Response:
+        # OPEN中のブレーカーで拒否される呼び出しにはレート制限の枠を使わない
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            rate_limiter.acquire(access_token, endpoint, mode=rate_limit_mode)
+        except RateLimitExceeded:
+            if breaker is not None:
+                breaker.cancel()
+            raise
+        
+        started = time.monotonic()
+        failed = True
+        try:
+            response = http_client.request(method, url, endpoint=endpoint, **kwargs)
+            failed = response.status_code >= 500
+        finally:
+            if breaker is not None:
+                breaker.record(time.monotonic() - started, failed)
+        
+        if response.status_code == 429:
+            rate_limiter.penalize(access_token, endpoint, parse_retry_after(response.headers.get("Retry-After")) or 0.0)
+        return response
+    
+    # 冪等なエンドポイントのみ一時的なエラー（5xx・429・タイムアウト）を再試行
+    # 429のRetry-Afterはレート制限のバケットに反映するため、再試行はバケットの次の枠まで待つ
+    return retry_request(send, endpoint, ready_in=lambda: rate_limiter.time_until_available(access_token, endpoint))
+
 def make_tiktok_api_request(method: str, url: str, access_token: str, 
                            params: Optional[Dict[str, Any]] = None, 
-                           json_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """TikTok APIリクエストを実行"""
+                           json_data: Optional[Dict[str, Any]] = None,
+                           rate_limit_mode: Optional[str] = None) -> Dict[str, Any]:
+    """TikTok APIリクエストを実行
+    
+    Args:
+        rate_limit_mode: レート制限時の動作（"wait" または "fail"、省略時は設定値）
+    
+    Raises:
+        RateLimitExceeded: クライアント側のレート制限に達した場合
+        CircuitOpenError: エンドポイント系統のサーキットブレーカーが開いている場合
+    """
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json"
     }
     
+    if method.upper() not in ("GET", "POST"):
+        raise ValueError(f"Unsupported HTTP method: {method}")
+    
     try:
-        if method.upper() == "GET":
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-        elif method.upper() == "POST":
-            response = requests.post(url, headers=headers, params=params, json=json_data, timeout=30)
-        else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
-        
+        response = send_api_request(method, url, access_token, rate_limit_mode=rate_limit_mode,
+                                    headers=headers, params=params, json=json_data)
         response.raise_for_status()
-        return response.json()
+        return decode_json_response(response)
         
     except requests.exceptions.RequestException as e:
         logger.error(f"TikTok API リクエストエラー: {e}")
         raise
 
+def decode_json_response(response: requests.Response) -> Any:
+    """レスポンス本文をJSONとしてデコード（高速なJSONバックエンドを使用）
+    
+    Raises:
+        requests.exceptions.JSONDecodeError: JSONとして不正な場合（response.json()と同じ例外）
+    """
+    try:
+        return json_codec.loads(response.content)
+    except ValueError:
+        # 例外の型をrequestsと揃えるため、標準のデコードで再度エラーを発生させる
+        return response.json()
+
 def extract_user_data(response: Dict[str, Any]) -> Dict[str, Any]:
     """APIレスポンスからユーザーデータを抽出"""
     if "data" in response and "user" in response["data"]:
@@ -62,6 +135,44 @@ def get_best_image_url(video: Dict[str, Any]) -> Optional[str]:
     
     return None
 
+def format_create_time(create_time: Optional[int]) -> str:
+    """投稿日時を読みやすい形式に変換"""
+    if not create_time:
+        return "不明"
+    try:
+        # UTC Unix epoch (seconds) を datetime に変換
+        dt = datetime.fromtimestamp(create_time)
+        return dt.strftime("%Y年%m月%d日 %H:%M")
+    except:
+        return "不明"
+
+def engagement_tier_factor(follower_count: int) -> float:
+    """フォロワー数に基づくエンゲージメント率の調整係数
+    
+    フォロワー数が多いほど、エンゲージメント率は下がる傾向があるため小さくする。
+    
+    Args:
+        follower_count: フォロワー数
+    
+    Returns:
+        基本のエンゲージメント率に掛ける係数
+    """
+    if follower_count <= 1000:
+        # 小規模アカウント（1000人以下）：調整なし
+        return 1.0
+    elif follower_count <= 10000:
+        # 中規模アカウント（1000-10000人）：軽微な調整
+        return 0.5
+    elif follower_count <= 100000:
+        # 大規模アカウント（10000-100000人）：中程度の調整
+        return 0.3
+    else:
+        # 超大規模アカウント（100000人以上）：大幅な調整
+        return 0.1
+
+# 現実的なエンゲージメント率の上限（TikTokの一般的なエンゲージメント率は1-10%程度）
+MAX_ENGAGEMENT_RATE = 10.0
+
 def calculate_engagement_rate(like_count: int, comment_count: int, share_count: int, follower_count: int) -> float:
     """平均エンゲージメント率を計算
     
@@ -84,23 +195,10 @@ def calculate_engagement_rate(like_count: int, comment_count: int, share_count:
     base_engagement_rate = total_engagement / follower_count * 100
     
     # フォロワー数に基づく現実的な調整
-    # フォロワー数が多いほど、エンゲージメント率は下がる傾向
-    if follower_count <= 1000:
-        # 小規模アカウント（1000人以下）：調整なし
-        engagement_rate = base_engagement_rate
-    elif follower_count <= 10000:
-        # 中規模アカウント（1000-10000人）：軽微な調整
-        engagement_rate = base_engagement_rate * 0.5
-    elif follower_count <= 100000:
-        # 大規模アカウント（10000-100000人）：中程度の調整
-        engagement_rate = base_engagement_rate * 0.3
-    else:
-        # 超大規模アカウント（100000人以上）：大幅な調整
-        engagement_rate = base_engagement_rate * 0.1
+    engagement_rate = base_engagement_rate * engagement_tier_factor(follower_count)
     
     # 現実的な上限を設定（10%を超えないように）
-    # TikTokの一般的なエンゲージメント率は1-10%程度
-    engagement_rate = min(engagement_rate, 10.0)
+    engagement_rate = min(engagement_rate, MAX_ENGAGEMENT_RATE)
     
     # 少数第一位で四捨五入
     return round(engagement_rate, 1)
@@ -140,13 +238,6 @@ def calculate_average_engagement_rate(videos: List[Dict[str, Any]], follower_cou
     total_engagement = total_likes + total_comments + total_shares
     base_engagement_rate = total_engagement / follower_count * 100
     # calculate_engagement_rateと同じ現実的な調整
-    if follower_count <= 1000:
-        engagement_rate = base_engagement_rate
-    elif follower_count <= 10000:
-        engagement_rate = base_engagement_rate * 0.5
-    elif follower_count <= 100000:
-        engagement_rate = base_engagement_rate * 0.3
-    else:
-        engagement_rate = base_engagement_rate * 0.1
-    engagement_rate = min(engagement_rate, 10.0)
+    engagement_rate = base_engagement_rate * engagement_tier_factor(follower_count)
+    engagement_rate = min(engagement_rate, MAX_ENGAGEMENT_RATE)
     return round(engagement_rate, 1) 
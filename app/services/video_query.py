@@ -0,0 +1,213 @@
+"""アカウントの動画に対する並べ替え・絞り込み・上位N件の検索（ソート済みインデックス）"""
+
+import heapq
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from app.services.metrics import VideoMetrics
+
+logger = logging.getLogger(__name__)
+
+# インデックスを作成するフィールド
+INDEXED_FIELDS = ("view_count", "like_count", "share_count", "engagement_rate", "create_time")
+
+def _parse_time(value: Any, end_of_day: bool = False) -> Optional[int]:
+    """日時（Unix秒、YYYY-MM-DD、ISO 8601形式）をUnix秒に変換
+
+    end_of_dayを指定すると、日付のみの値はその日の終わり（翌日0時の1秒前）にする（上限に使う）
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value)
+    if text.isdigit():
+        return int(text)
+    if end_of_day:
+        try:
+            day = date.fromisoformat(text)
+        except ValueError:
+            pass
+        else:
+            return int(datetime.combine(day + timedelta(days=1), time()).timestamp()) - 1
+    try:
+        return int(datetime.fromisoformat(text).timestamp())
+    except ValueError as e:
+        raise ValueError(f"不正な日時です: {text}") from e
+
+class VideoIndex:
+    """動画リストのフィールドごとのソート済みインデックス
+
+    各フィールドについて (値, 位置) を昇順に保持し、範囲の絞り込みは二分探索、
+    絞り込みのない上位N件はインデックスの末尾から取り出すだけで求める。
+    """
+
+    def __init__(self, videos: List[Dict[str, Any]], follower_count: int = 0):
+        """
+        インデックスを作成
+
+        Args:
+            videos: 動画リスト
+            follower_count: エンゲージメント率の計算に使うフォロワー数
+        """
+        self.videos = videos
+        self.follower_count = follower_count
+        # 列をまとめて作成し、エンゲージメント率と並べ替えはベクトル化して計算する
+        metrics = VideoMetrics.from_videos(videos)
+        columns = {field: metrics.columns[field] for field in INDEXED_FIELDS if field != "engagement_rate"}
+        columns["engagement_rate"] = metrics.engagement_rates(follower_count)
+
+        self.values: Dict[str, List[float]] = {}
+        self._keys: Dict[str, List[float]] = {}
+        self._positions: Dict[str, List[int]] = {}
+        for field in INDEXED_FIELDS:
+            column = columns[field]
+            order = np.argsort(column, kind="stable")
+            self.values[field] = column.tolist()
+            self._positions[field] = order.tolist()
+            self._keys[field] = column[order].tolist()
+
+    def __len__(self) -> int:
+        return len(self.videos)
+
+    def range(self, field: str, minimum: Optional[float] = None, maximum: Optional[float] = None) -> List[int]:
+        """
+        値が範囲内（両端を含む）の動画の位置を昇順で取得
+
+        Args:
+            field: インデックスのフィールド
+            minimum: 下限（省略時は制限なし）
+            maximum: 上限（省略時は制限なし）
+        """
+        keys = self._keys[field]
+        low = bisect_left(keys, minimum) if minimum is not None else 0
+        high = bisect_right(keys, maximum) if maximum is not None else len(keys)
+        return self._positions[field][low:high]
+
+    def query(self, filters: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+              sort_by: str = "create_time", descending: bool = True,
+              limit: Optional[int] = None, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        範囲で絞り込み、並べ替えて取得
+
+        Args:
+            filters: フィールドごとの (下限, 上限)
+            sort_by: 並べ替えるフィールド
+            descending: 降順かどうか
+            limit: 最大件数（省略時はすべて）
+            offset: 先頭から読み飛ばす件数
+
+        Returns:
+            (該当する動画, 該当件数)
+        """
+        if sort_by not in INDEXED_FIELDS:
+            raise ValueError(f"並べ替えできないフィールドです: {sort_by}")
+        filters = {field: bounds for field, bounds in (filters or {}).items()
+                   if bounds[0] is not None or bounds[1] is not None}
+        for field in filters:
+            if field not in INDEXED_FIELDS:
+                raise ValueError(f"絞り込みできないフィールドです: {field}")
+
+        if not filters:
+            # 絞り込みがなければ並べ替え用インデックスをそのまま辿る
+            order = self._positions[sort_by]
+            total = len(order)
+            end = total if limit is None else min(total, offset + limit)
+            if descending:
+                selected = [order[total - 1 - i] for i in range(offset, end)]
+            else:
+                selected = order[offset:end]
+            return [self.videos[position] for position in selected], total
+
+        # 候補が最も少ない条件で絞り込み、残りの条件は値を直接比較する
+        candidates = min((self.range(field, *bounds) for field, bounds in filters.items()), key=len)
+        matched = [position for position in candidates if self._matches(position, filters)]
+        total = len(matched)
+
+        column = self.values[sort_by]
+        if limit is None:
+            matched.sort(key=column.__getitem__, reverse=descending)
+            selected = matched[offset:]
+        else:
+            # 上位N件のみ必要な場合は全体を並べ替えない
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            selected = pick(offset + limit, matched, key=column.__getitem__)[offset:]
+        return [self.videos[position] for position in selected], total
+
+    def _matches(self, position: int, filters: Dict[str, Tuple[Optional[float], Optional[float]]]) -> bool:
+        for field, (minimum, maximum) in filters.items():
+            value = self.values[field][position]
+            if minimum is not None and value < minimum:
+                return False
+            if maximum is not None and value > maximum:
+                return False
+        return True
+
+    def top(self, field: str, count: int = 10) -> List[Dict[str, Any]]:
+        """フィールドの値が大きい順に上位N件を取得"""
+        return self.query(sort_by=field, limit=count)[0]
+
+class VideoQueryService:
+    """アカウントごとのインデックスを保持し、動画が更新された場合のみ作り直す"""
+
+    def __init__(self):
+        self._indexes: Dict[str, Tuple[Any, VideoIndex]] = {}
+        self._lock = threading.Lock()
+
+    def get_index(self, open_id: str, version: Any, videos: List[Dict[str, Any]], follower_count: int = 0) -> VideoIndex:
+        """
+        アカウントのインデックスを取得
+
+        Args:
+            open_id: ユーザーのopen_id
+            version: 動画リストの版（変わった場合にインデックスを作り直す）
+            videos: 動画リスト
+            follower_count: フォロワー数
+        """
+        key = (version, follower_count)
+        with self._lock:
+            cached = self._indexes.get(open_id)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+        index = VideoIndex(videos, follower_count)
+        logger.debug(f"動画インデックスを作成: {open_id} {len(index)}件")
+        with self._lock:
+            self._indexes[open_id] = (key, index)
+        return index
+
+    def search(self, open_id: str, version: Any, videos: List[Dict[str, Any]], follower_count: int = 0,
+               ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+               since: Any = None, until: Any = None, sort_by: str = "create_time", descending: bool = True,
+               limit: Optional[int] = None, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        アカウントの動画を検索
+
+        Args:
+            ranges: フィールドごとの (下限, 上限)
+            since: 投稿日時の下限（Unix秒、YYYY-MM-DD、ISO 8601形式）
+            until: 投稿日時の上限（日付のみの場合はその日を含む）
+            その他はVideoIndex.queryと同じ
+
+        Returns:
+            (該当する動画, 該当件数)
+        """
+        filters = dict(ranges or {})
+        window = (_parse_time(since), _parse_time(until, end_of_day=True))
+        if window != (None, None):
+            filters["create_time"] = window
+        index = self.get_index(open_id, version, videos, follower_count)
+        return index.query(filters, sort_by=sort_by, descending=descending, limit=limit, offset=offset)
+
+    def forget(self, open_id: str) -> None:
+        """アカウントのインデックスを破棄"""
+        with self._lock:
+            self._indexes.pop(open_id, None)
+
+# グローバル検索サービスインスタンス
+video_query_service = VideoQueryService()
@@ -0,0 +1,259 @@
+"""動画一覧の差分同期（アカウントごとに最新の動画を記録し、新しい動画のみ取得する）"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from app.config import Config
+from app.services.get_video_list import fetch_video_page, enrich_videos, query_video_details, VIDEO_LIST_PAGE_SIZE
+from app.services.revalidate import video_revalidate
+from app.services.singleflight import video_list_flight
+from app.services.store import store
+from app.services.records import VideoRecord, to_video_records
+
+logger = logging.getLogger(__name__)
+
+# 既存動画の統計更新で取得するフィールド（投稿後に変化するのはこれらのみ）
+COUNTER_FIELDS = ("id", "view_count", "like_count", "comment_count", "share_count")
+
+def _sort_key(video: Dict[str, Any]) -> Tuple[int, str]:
+    """新しい順に並べるためのキー（投稿日時、動画ID）"""
+    return (video.get("create_time") or 0, video.get("id") or "")
+
+class AccountVideos:
+    """1アカウント分の同期済み動画
+
+    videos は他のスレッドやキャッシュが参照中のことがあるため変更せず、新しいリストに置き換える。
+    置き換えは VideoSync のロック内で行う。
+    """
+
+    def __init__(self):
+        self.videos: List[VideoRecord] = []
+        self.ids = set()
+        self.high_water: Optional[Tuple[int, str]] = None
+        self.counters_refreshed_at = 0.0
+        self.synced_at = 0.0
+        # 初回同期の残り（2ページ目以降）を取得するカーソル（取得済みまたは不要の場合はNone）
+        self.backfill_cursor: Optional[int] = None
+        # 動画の追加や統計の更新のたびに増える版（インデックスの再作成判定に使う）
+        self.version = 0
+
+    def add(self, new_videos: List[Dict[str, Any]]) -> int:
+        """新しい動画をVideoRecordとして追加して新しい順に並べ直す（ロック内で呼ぶ）"""
+        added = to_video_records(video for video in new_videos if video.get("id") and video["id"] not in self.ids)
+        if added:
+            self.videos = sorted(self.videos + added, key=_sort_key, reverse=True)
+            self.ids.update(video["id"] for video in added)
+            self.high_water = _sort_key(self.videos[0])
+            self.version += 1
+        return len(added)
+
+    def replace(self, updated: Dict[str, VideoRecord]) -> None:
+        """動画IDに対応するレコードを置き換える（ロック内で呼ぶ）"""
+        self.videos = [updated.get(video["id"], video) for video in self.videos]
+        self.version += 1
+
+class VideoSync:
+    """open_idごとの最新動画（投稿日時とID）を記録し、差分のみを取得する同期処理
+
+    初回は先頭ページのみ取得して返し、2ページ目以降（最大 VIDEO_SYNC_MAX_VIDEOS 件まで）は
+    バックグラウンドで取得して追加する。取得の進捗は永続ストアに保存し、再起動後は続きから再開する。以降は先頭ページから記録済みの最新動画に達するまでのみ取得し、
+    新しい動画だけ詳細を取得する。既存動画の再生数などの統計は VIDEO_SYNC_REFRESH_INTERVAL ごとに
+    バックグラウンドでまとめて更新する。バックグラウンドの処理はキャッシュの再検証と同じスレッドプールで行う。
+    """
+
+    def __init__(self, max_videos: Optional[int] = None, refresh_interval: Optional[int] = None):
+        """
+        差分同期を初期化
+
+        Args:
+            max_videos: 初回同期の最大件数
+            refresh_interval: 既存動画の統計を更新する間隔（秒）
+        """
+        self.max_videos = max_videos if max_videos is not None else Config.VIDEO_SYNC_MAX_VIDEOS
+        self.refresh_interval = refresh_interval if refresh_interval is not None else Config.VIDEO_SYNC_REFRESH_INTERVAL
+        self._accounts: Dict[str, AccountVideos] = {}
+        self._lock = threading.Lock()
+
+    def sync(self, access_token: str, open_id: str) -> List[VideoRecord]:
+        """
+        アカウントの動画を同期して新しい順に返す
+
+        Args:
+            access_token: アクセストークン
+            open_id: ユーザーのopen_id
+
+        Returns:
+            同期済みの動画（新しい順、初回は残りのページの取得前の先頭ページ分）
+        """
+        # 同じアカウントへの同時同期は1回にまとめる
+        return video_list_flight.do(f"{open_id}:sync", lambda: self._sync(access_token, open_id))
+
+    def get_videos(self, open_id: str) -> Optional[List[VideoRecord]]:
+        """APIを呼ばずに同期済みの動画を取得（未同期の場合はNone）"""
+        with self._lock:
+            account = self._accounts.get(open_id)
+            return list(account.videos) if account else None
+
+    def get_snapshot(self, open_id: str) -> Optional[Tuple[int, List[VideoRecord]]]:
+        """APIを呼ばずに同期済みの動画とその版を取得（未同期の場合はNone）"""
+        with self._lock:
+            account = self._accounts.get(open_id)
+            return (account.version, list(account.videos)) if account else None
+
+    def forget(self, open_id: str) -> None:
+        """アカウントの同期状態を破棄（次回は全件を取得する）"""
+        with self._lock:
+            self._accounts.pop(open_id, None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """アカウントごとの同期状態を取得"""
+        with self._lock:
+            return {
+                open_id: {
+                    "videos": len(account.videos),
+                    "version": account.version,
+                    "high_water": account.high_water,
+                    "synced_at": account.synced_at,
+                    "counters_refreshed_at": account.counters_refreshed_at,
+                    "backfilling": account.backfill_cursor is not None
+                }
+                for open_id, account in self._accounts.items()
+            }
+
+    def _sync(self, access_token: str, open_id: str) -> List[VideoRecord]:
+        with self._lock:
+            account = self._accounts.get(open_id)
+
+        if account is None:
+            account = self._load_stored(open_id)
+
+        if account is None:
+            account = self._fetch_first_page(access_token, open_id)
+        else:
+            new_videos = self._fetch_new_videos(access_token, open_id, account.high_water)
+            with self._lock:
+                added = account.add(new_videos)
+            if added:
+                logger.info(f"新しい動画を同期: {open_id} {added}件")
+
+        now = time.time()
+        with self._lock:
+            self._accounts[open_id] = account
+            account.synced_at = now
+            backfill = account.backfill_cursor is not None
+            # 統計の更新は1回だけ予約する（失敗した場合も次回の更新は間隔を空ける）
+            refresh = not backfill and now - account.counters_refreshed_at >= self.refresh_interval
+            if refresh:
+                account.counters_refreshed_at = now
+            videos = list(account.videos)
+
+        # 同じアカウントの処理が実行中の場合は予約しない
+        if backfill:
+            video_revalidate.refresh("video_sync", f"{open_id}:backfill",
+                                     lambda: self._backfill(access_token, open_id, account))
+        if refresh:
+            video_revalidate.refresh("video_sync", f"{open_id}:counters",
+                                     lambda: self._refresh_counters(access_token, open_id, account))
+        return videos
+
+    def _load_stored(self, open_id: str) -> Optional[AccountVideos]:
+        """永続ストアに保存済みの動画から同期状態を復元（再起動後の全件取得を避ける）
+
+        初回同期の進捗が保存されていない場合（動画詳細ページなどで個別に保存された動画のみの場合）は
+        一覧が欠けている可能性があるため復元しない。残りのページの取得中に停止した場合は
+        保存済みのカーソルから再開する（先頭ページからの新しい動画は差分同期で取得する）。
+        """
+        state = store.get_video_sync_state(open_id)
+        if state is None or not (state["complete"] or state["backfill_cursor"]):
+            return None
+        stored = store.get_videos(open_id, limit=self.max_videos)
+        if not stored:
+            return None
+        account = AccountVideos()
+        account.add(stored)
+        account.counters_refreshed_at = store.get_videos_updated_at(open_id) or 0.0
+        if not state["complete"] and len(account.videos) < self.max_videos:
+            account.backfill_cursor = state["backfill_cursor"]
+        logger.info(f"保存済みの動画から同期状態を復元: {open_id} {len(account.videos)}件"
+                    f"{'' if account.backfill_cursor is None else '（残りのページを再開）'}")
+        return account
+
+    def _fetch_first_page(self, access_token: str, open_id: str) -> AccountVideos:
+        """初回同期の先頭ページを取得（残りのページはバックグラウンドで取得する）"""
+        videos, cursor, has_more = fetch_video_page(access_token, None, min(self.max_videos, VIDEO_LIST_PAGE_SIZE))
+        enrich_videos(access_token, videos, open_id)
+        account = AccountVideos()
+        account.add(videos)
+        account.counters_refreshed_at = time.time()
+        if has_more and cursor and videos and len(account.videos) < self.max_videos:
+            account.backfill_cursor = cursor
+        store.set_video_sync_state(open_id, account.backfill_cursor, account.backfill_cursor is None)
+        logger.info(f"動画を初回同期: {open_id} 先頭ページ{len(account.videos)}件")
+        return account
+
+    def _backfill(self, access_token: str, open_id: str, account: AccountVideos) -> None:
+        """初回同期の2ページ目以降をページごとに取得して追加（バックグラウンド）
+
+        失敗した場合はカーソルを残し、次回の同期で続きから再開する。
+        """
+        while True:
+            with self._lock:
+                cursor = account.backfill_cursor
+                # 同期状態が破棄された場合は中止する
+                if cursor is None or self._accounts.get(open_id) is not account:
+                    return
+                remaining = self.max_videos - len(account.videos)
+            if remaining <= 0:
+                break
+            videos, cursor, has_more = fetch_video_page(access_token, cursor, min(remaining, VIDEO_LIST_PAGE_SIZE))
+            enrich_videos(access_token, videos, open_id)
+            with self._lock:
+                account.add(videos)
+                if not (has_more and cursor and videos):
+                    break
+                account.backfill_cursor = cursor
+            # 再起動後に続きから再開できるよう、ページごとにカーソルを保存する
+            store.set_video_sync_state(open_id, cursor, False)
+
+        with self._lock:
+            account.backfill_cursor = None
+            total = len(account.videos)
+        store.set_video_sync_state(open_id, None, True)
+        logger.info(f"動画の初回同期を完了: {open_id} {total}件")
+
+    def _fetch_new_videos(self, access_token: str, open_id: str,
+                          high_water: Optional[Tuple[int, str]]) -> List[VideoRecord]:
+        """記録済みの最新動画より新しい動画を取得"""
+        new_videos: List[Dict[str, Any]] = []
+        cursor = None
+        while True:
+            videos, cursor, has_more = fetch_video_page(access_token, cursor, VIDEO_LIST_PAGE_SIZE)
+            fresh = [video for video in videos if high_water is None or _sort_key(video) > high_water]
+            new_videos.extend(fresh)
+            # 記録済みの動画に達したページで終了する
+            if len(fresh) < len(videos) or not has_more or not cursor:
+                break
+        enrich_videos(access_token, new_videos, open_id)
+        return new_videos
+
+    def _refresh_counters(self, access_token: str, open_id: str, account: AccountVideos) -> None:
+        """既存動画の統計（再生数・いいね数・コメント数・シェア数）を更新（バックグラウンド）"""
+        with self._lock:
+            videos = list(account.videos)
+        report = query_video_details(access_token, [video["id"] for video in videos], fields=COUNTER_FIELDS)
+
+        # 参照中のレコードは変更せず、統計を更新したコピーに置き換える
+        updated: Dict[str, VideoRecord] = {}
+        for video in videos:
+            counters = report.results.get(video["id"])
+            if counters:
+                record = video.copy()
+                record.update(counters)
+                updated[video["id"]] = record
+        with self._lock:
+            account.replace(updated)
+        logger.info(f"動画の統計を更新: {open_id} {len(updated)}/{len(videos)}件")
+
+# グローバル差分同期インスタンス
+video_sync = VideoSync()
@@ -4,13 +4,34 @@ import logging
 import requests
 import os
 from typing import Dict, Any, Optional, Tuple
-from app.services.utils import make_tiktok_api_request
+from app.config import Config
+from app.services.utils import make_tiktok_api_request, send_api_request, decode_json_response
+from app.services.http_client import http_client
+from app.services.rate_limiter import RateLimitExceeded
+from app.services.retry import retry_request
+from app.services.cache import invalidate_tag
+from app.services.cache_keys import counters_tag, profile_key, video_list_key
+from app.services.revalidate import profile_revalidate, video_revalidate
+from app.services.get_profile import get_user_profile
+from app.services.get_video_list import get_video_list
 
 logger = logging.getLogger(__name__)
 
+def refresh_account_after_publish(access_token: str, open_id: str) -> None:
+    """
+    投稿したアカウントの動画一覧とプロフィールの統計のキャッシュを無効化し、バックグラウンドで再取得
+
+    他のアカウントのエントリや、このアカウントの既存動画の詳細はそのまま残す。
+    """
+    invalidate_tag(counters_tag(open_id))
+    video_revalidate.refresh("video_list", video_list_key(open_id),
+                             lambda: get_video_list(access_token, open_id, max_count=Config.MAX_VIDEO_COUNT, incremental=True))
+    profile_revalidate.refresh("profile", profile_key(open_id),
+                               lambda: get_user_profile(access_token, open_id=open_id))
+
 def get_creator_info(access_token: str) -> Dict[str, Any]:
     """投稿先クリエイター情報を取得（最新情報を常に取得）"""
-    url = "https://open.tiktokapis.com/v2/post/publish/creator_info/query/"
+    url = f"{Config.TIKTOK_API_BASE_URL}/v2/post/publish/creator_info/query/"
     
     try:
         # 最新情報を常に取得するため、キャッシュヘッダーを追加
@@ -22,15 +43,17 @@ def get_creator_info(access_token: str) -> Dict[str, Any]:
             "Expires": "0"
         }
         
-        response = requests.post(
+        response = send_api_request(
+            "POST",
             url,
+            access_token,
+            endpoint="creator_info",
             headers=headers,
-            json={},
-            timeout=30
+            json={}
         )
         
         response.raise_for_status()
-        response_data = response.json()
+        response_data = decode_json_response(response)
         
         # レスポンスの妥当性を検証
         if 'data' not in response_data:
@@ -59,6 +82,9 @@ def get_creator_info(access_token: str) -> Dict[str, Any]:
         else:
             logger.error(f"クリエイター情報取得エラー: HTTP {e.response.status_code} - {e.response.text}")
             raise
+    except RateLimitExceeded:
+        logger.error("クリエイター情報取得エラー: クライアント側レート制限に達しました（20リクエスト/分）")
+        raise
     except requests.exceptions.Timeout as e:
         logger.error(f"クリエイター情報取得エラー: タイムアウト - {e}")
         raise Exception("クリエイター情報の取得がタイムアウトしました。しばらく時間をおいてから再試行してください。")
@@ -78,10 +104,10 @@ def initialize_video_upload(
 ) -> Dict[str, Any]:
     """動画投稿リクエストを初期化"""
     if is_draft:
-        url = "https://open.tiktokapis.com/v2/post/publish/inbox/video/init/"
+        url = f"{Config.TIKTOK_API_BASE_URL}/v2/post/publish/inbox/video/init/"
         logger.info("下書き投稿モードで動画アップロードを初期化")
     else:
-        url = "https://open.tiktokapis.com/v2/post/publish/video/init/"
+        url = f"{Config.TIKTOK_API_BASE_URL}/v2/post/publish/video/init/"
         logger.info("直接投稿モードで動画アップロードを初期化")
     
     # TikTok APIの推奨チャンクサイズ（10MB = 10,000,000 bytes）
@@ -160,15 +186,20 @@ def upload_video_chunk(upload_url: str, video_data: bytes, content_range: str) -
     }
     
     try:
-        response = requests.put(
-            upload_url,
-            headers=headers,
-            data=video_data,
-            timeout=60
+        # 失敗した場合は同じContent-Rangeのチャンクのみを再送する
+        response = retry_request(
+            lambda: http_client.request(
+                "PUT",
+                upload_url,
+                endpoint="upload",
+                headers=headers,
+                data=video_data
+            ),
+            "upload"
         )
         
-        # TikTok APIでは201 Createdが成功を示す
-        if response.status_code in [200, 201]:
+        # TikTok APIでは201 Created（全チャンク完了）または206 Partial Content（途中のチャンク）が成功を示す
+        if response.status_code in [200, 201, 206]:
             logger.info(f"動画チャンクアップロード成功: {response.status_code} - {content_range}")
             return True
         else:
@@ -241,7 +272,7 @@ def upload_video_file(upload_url: str, video_file_path: str) -> bool:
 
 def get_post_status(access_token: str, publish_id: str) -> Dict[str, Any]:
     """投稿ステータスを取得"""
-    url = "https://open.tiktokapis.com/v2/post/publish/status/fetch/"
+    url = f"{Config.TIKTOK_API_BASE_URL}/v2/post/publish/status/fetch/"
     
     request_data = {
         "publish_id": publish_id
@@ -270,7 +301,8 @@ def upload_video_complete(
     disable_comment: bool = False,
     disable_duet: bool = False,
     disable_stitch: bool = False,
-    is_draft: bool = False  # 下書き投稿かどうか
+    is_draft: bool = False,  # 下書き投稿かどうか
+    open_id: Optional[str] = None  # 投稿後にキャッシュを無効化するアカウント
 ) -> Tuple[bool, str, Optional[str]]:
     """動画アップロードの完全なプロセスを実行"""
     upload_type = "下書き投稿" if is_draft else "直接投稿"
@@ -368,6 +400,10 @@ def upload_video_complete(
         
         profile_link = f"https://www.tiktok.com/@{username}"
         
+        # 直接投稿した場合はこのアカウントの動画一覧と統計を更新（下書きは一覧に表示されない）
+        if not is_draft and open_id:
+            refresh_account_after_publish(access_token, open_id)
+        
         if is_draft:
             success_message = f"動画をTikTokの下書きに保存しました。\nTikTokアプリの通知を確認して、動画を編集・投稿してください。\nプロフィール: {profile_link}"
         else:
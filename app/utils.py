@@ -2,7 +2,9 @@
 
 import logging
 import os
-from typing import Optional
+from typing import Any, Optional
+from flask import Response
+from app.services import json_codec
 
 def setup_logging() -> None:
     """ログ設定を初期化"""
@@ -38,6 +40,10 @@ def get_logger(name: str) -> logging.Logger:
     """指定された名前のロガーを取得"""
     return logging.getLogger(name)
 
+def json_response(payload: Any, status: int = 200) -> Response:
+    """高速なJSONバックエンドでエンコードしたJSONレスポンスを作成"""
+    return Response(json_codec.dumps_bytes(payload), status=status, mimetype='application/json')
+
 def validate_token(access_token: str) -> bool:
     """アクセストークンの基本的な検証"""
     if not access_token:
@@ -48,21 +54,4 @@ def validate_token(access_token: str) -> bool:
     if not access_token.startswith("act."):
         return False
     
-    return True
-
-def cleanup_caches() -> None:
-    """キャッシュのクリーンアップを実行"""
-    try:
-        from app.services.cache import video_cache, profile_cache
-        
-        # 期限切れエントリを削除
-        video_cleaned = video_cache.cleanup()
-        profile_cleaned = profile_cache.cleanup()
-        
-        logger = get_logger(__name__)
-        if video_cleaned > 0 or profile_cleaned > 0:
-            logger.info(f"キャッシュクリーンアップ完了: 動画キャッシュ{video_cleaned}件, プロフィールキャッシュ{profile_cleaned}件を削除")
-        
-    except ImportError:
-        # キャッシュモジュールが利用できない場合は何もしない
-        pass 
+    return True 
@@ -1,15 +1,29 @@
+import hmac
 import requests
-from flask import render_template, redirect, url_for, session, request, jsonify
+from flask import render_template, redirect, url_for, session, request, jsonify, Response
 from app.auth_service import AuthService
-from app.services.get_profile import get_user_profile
-from app.services.get_video_list import get_video_list, format_create_time
-from app.services.get_video_details import get_video_details
+from app.services.get_profile import get_cached_user_profile, get_user_profile
+from app.services.get_video_list import get_cached_video_list
+from app.services.get_video_details import get_cached_video_details
+from app.services.async_client import fetch_dashboard_data, fetch_video_detail_data, VIDEO_DETAIL_PROFILE_FIELDS
 
 from app.services.user_manager import UserManager
-from app.utils import get_logger, validate_token
+from app.utils import get_logger, validate_token, json_response
 from app.config import Config
-from app.services.utils import calculate_engagement_rate, format_engagement_rate, calculate_average_engagement_rate
+from app.services.metrics import VideoMetrics
 from app.services.video_upload import upload_video_complete, get_post_status
+from app.services.http_client import http_client
+from app.services.rate_limiter import rate_limiter, RateLimitExceeded
+from app.services.circuit_breaker import circuit_breakers, CircuitOpenError
+from app.services.singleflight import get_singleflight_stats
+from app.services.revalidate import get_revalidate_stats
+from app.services.cache import get_cache_stats
+from app.services.cache_stats import render_prometheus
+from app.services.video_sync import video_sync
+from app.services.video_query import video_query_service, INDEXED_FIELDS
+from app.services.stats_history import stats_history
+from app.services.store import store
+from app.services.pagination import paginate_videos, paginate_videos_by_cursor, encode_cursor
 
 class Views:
     """ビューコントローラー"""
@@ -90,9 +104,20 @@ class Views:
         
                     # トークン検証成功
 
+        stale_data = False
         try:
-            # プロフィール情報と統計情報を一度に取得
-            profile = get_user_profile(token)
+            try:
+                # プロフィール情報と動画リスト（前回からの差分のみ取得）を同時に取得
+                profile, all_videos = fetch_dashboard_data(token, open_id, max_count=self.config.MAX_VIDEO_COUNT,
+                                                           incremental=True)
+            except CircuitOpenError as e:
+                # API停止中はキャッシュ済みのデータ（期限切れを含む）で表示
+                profile = get_cached_user_profile(token, open_id=open_id)
+                all_videos = get_cached_video_list(open_id)
+                if profile is None or all_videos is None:
+                    raise
+                self.logger.warning(f"キャッシュ済みデータでダッシュボードを表示: {e}")
+                stale_data = True
             # プロフィールと統計データの取得に成功
             
             # 統計情報が含まれているかチェック
@@ -104,16 +129,13 @@ class Views:
                 for field in missing_stats:
                     profile[field] = 0
             
-            # 動画リストを取得
-            all_videos = get_video_list(token, open_id, max_count=self.config.MAX_VIDEO_COUNT)
             # 動画を取得
 
-            # 総シェア数
-            total_share_count = sum(v.get('share_count', 0) or 0 for v in all_videos)
-            # 総再生数
-            total_view_count = sum(v.get('view_count', 0) or 0 for v in all_videos)
-            # 平均エンゲージメント率
-            avg_engagement_rate = calculate_average_engagement_rate(all_videos, profile.get('follower_count', 0))
+            # 総シェア数・総再生数・平均エンゲージメント率を列単位でまとめて計算
+            summary = VideoMetrics.from_videos(all_videos).summary(profile.get('follower_count', 0) or 0)
+            total_share_count = summary['total_share_count']
+            total_view_count = summary['total_view_count']
+            avg_engagement_rate = summary['avg_engagement_rate']
             
             # 全ユーザー情報を取得
             all_users = self.user_manager.get_users()
@@ -124,13 +146,20 @@ class Views:
             
             return render_template('dashboard.html', 
                                  profile=profile, 
-                                 videos=all_videos,  # 全動画を渡す（フロントエンドでページネーション処理）
+                                 videos=all_videos,  # 先頭のMAX_VIDEO_COUNT件（以降のページはフロントエンドが/api/videosから取得）
                                  users=all_users,
                                  current_user=current_user,
                                  total_share_count=total_share_count,
                                  total_view_count=total_view_count,
-                                 avg_engagement_rate=avg_engagement_rate)
+                                 avg_engagement_rate=avg_engagement_rate,
+                                 stale_data=stale_data)
             
+        except CircuitOpenError as e:
+            self.logger.warning(f"API停止中でキャッシュもありません: {e}")
+            return "TikTok APIが一時的に不安定なため、データを取得できません。しばらく時間をおいて再度お試しください。", 503
+        except RateLimitExceeded as e:
+            self.logger.warning(f"API呼び出し制限: {e}")
+            return f"APIの呼び出し回数の上限に達しました。{int(e.retry_after) + 1}秒ほど待ってから再度お試しください。", 429
         except requests.exceptions.RequestException as e:
             self.logger.error(f"API通信エラー: {e}")
             return "API通信でエラーが発生しました。しばらく時間をおいて再度お試しください。", 503
@@ -162,33 +191,26 @@ class Views:
             self.user_manager.remove_user(current_user["open_id"])
             return redirect(url_for("index"))
         
+        stale_data = False
         try:
-            details = get_video_details(token, video_id)
-            # 動画詳細を取得
-            
-            # プロフィール情報を取得してフォロワー数を取得
-            profile = get_user_profile(token)
+            try:
+                # 動画詳細とプロフィール情報（フォロワー数）を同時に取得
+                details, profile = fetch_video_detail_data(token, video_id, open_id=current_user["open_id"])
+            except CircuitOpenError as e:
+                # API停止中はキャッシュ済みのデータ（期限切れを含む）で表示
+                details = get_cached_video_details(video_id, open_id=current_user["open_id"])
+                profile = get_cached_user_profile(token, fields=VIDEO_DETAIL_PROFILE_FIELDS, open_id=current_user["open_id"])
+                if details is None:
+                    raise
+                self.logger.warning(f"キャッシュ済みデータで動画詳細を表示 video_id {video_id}: {e}")
+                profile = profile or {}
+                stale_data = True
             follower_count = profile.get("follower_count", 0)
             
-            # エンゲージメント率を計算
-            if details and follower_count > 0:
-                engagement_rate = calculate_engagement_rate(
-                    details.get("like_count", 0),
-                    details.get("comment_count", 0),
-                    details.get("share_count", 0),
-                    follower_count
-                )
-                details["engagement_rate"] = engagement_rate
-                details["engagement_rate_formatted"] = format_engagement_rate(engagement_rate)
-            else:
-                details["engagement_rate"] = 0.0
-                details["engagement_rate_formatted"] = "0.0%"
-            
-            # 投稿日時をフォーマット
-            if details.get("create_time"):
-                details["formatted_create_time"] = format_create_time(details["create_time"])
-            else:
-                details["formatted_create_time"] = "不明"
+            # エンゲージメント率を計算（表示形式と投稿日時の表示形式はVideoRecordが参照時に計算）
+            # キャッシュのレコードは動画一覧とも共有しているため、コピーに設定する
+            if details:
+                details = details.copy().set_engagement(follower_count)
             
             # 全ユーザー情報を取得
             all_users = self.user_manager.get_users()
@@ -200,8 +222,15 @@ class Views:
             return render_template('video_detail.html', 
                                  d=details,
                                  users=all_users,
-                                 current_user=current_user)
+                                 current_user=current_user,
+                                 stale_data=stale_data)
             
+        except CircuitOpenError as e:
+            self.logger.warning(f"動画詳細API停止中でキャッシュもありません video_id {video_id}: {e}")
+            return "TikTok APIが一時的に不安定なため、動画情報を取得できません。しばらく時間をおいて再度お試しください。", 503
+        except RateLimitExceeded as e:
+            self.logger.warning(f"動画詳細API呼び出し制限 video_id {video_id}: {e}")
+            return f"APIの呼び出し回数の上限に達しました。{int(e.retry_after) + 1}秒ほど待ってから再度お試しください。", 429
         except requests.exceptions.RequestException as e:
             self.logger.error(f"動画詳細API通信エラー video_id {video_id}: {e}")
             return "動画情報の取得で通信エラーが発生しました。しばらく時間をおいて再度お試しください。", 503
@@ -239,28 +268,37 @@ class Views:
         """ユーザーデータ取得API（SPA用）"""
         open_id = request.args.get('open_id')
         if not open_id:
-            return jsonify({'error': 'open_id is required'}), 400
+            return json_response({'error': 'open_id is required'}, 400)
         
         user = self.user_manager.get_user_by_open_id(open_id)
         if not user:
-            return jsonify({'error': 'ユーザーが見つかりません'}), 404
+            return json_response({'error': 'ユーザーが見つかりません'}, 404)
         
+        stale_data = False
         try:
-            # プロフィール情報を取得
-            profile = get_user_profile(user['access_token'])
-            
-            # 動画リストを取得
-            videos = get_video_list(user['access_token'], open_id, max_count=self.config.MAX_VIDEO_COUNT)
+            try:
+                # プロフィール情報と動画リスト（前回からの差分のみ取得）を同時に取得
+                profile, videos = fetch_dashboard_data(user['access_token'], open_id,
+                                                       max_count=self.config.MAX_VIDEO_COUNT, incremental=True)
+            except CircuitOpenError as e:
+                # API停止中はキャッシュ済みのデータ（期限切れを含む）を返す
+                profile = get_cached_user_profile(user['access_token'], open_id=open_id)
+                videos = get_cached_video_list(open_id)
+                if profile is None or videos is None:
+                    raise
+                self.logger.warning(f"キャッシュ済みのユーザーデータを返します: {e}")
+                stale_data = True
             
-            # 統計情報を計算
-            total_share_count = sum(v.get('share_count', 0) or 0 for v in videos)
-            total_view_count = sum(v.get('view_count', 0) or 0 for v in videos)
-            avg_engagement_rate = calculate_average_engagement_rate(videos, profile.get('follower_count', 0))
+            # 統計情報を計算（動画一覧はフロントエンドが/api/videosからページ単位で取得する）
+            summary = VideoMetrics.from_videos(videos).summary(profile.get('follower_count', 0) or 0)
+            total_share_count = summary['total_share_count']
+            total_view_count = summary['total_view_count']
+            avg_engagement_rate = summary['avg_engagement_rate']
             
-            return jsonify({
+            return json_response({
                 'success': True,
+                'stale': stale_data,
                 'profile': profile,
-                'videos': videos,
                 'user_info': {
                     'open_id': user['open_id'],
                     'display_name': user['display_name'],
@@ -271,9 +309,180 @@ class Views:
                 }
             })
             
+        except CircuitOpenError as e:
+            self.logger.warning(f"ユーザーデータ取得のAPI停止中でキャッシュもありません: {e}")
+            return json_response({'error': 'TikTok APIが一時的に不安定です', 'retry_after': round(e.retry_after, 1)}, 503)
+        except RateLimitExceeded as e:
+            self.logger.warning(f"ユーザーデータ取得の呼び出し制限: {e}")
+            return json_response({'error': 'APIの呼び出し回数の上限に達しました', 'retry_after': round(e.retry_after, 1)}, 429)
         except Exception as e:
             self.logger.error(f"ユーザーデータ取得エラー: {e}")
-            return jsonify({'error': 'データの取得に失敗しました'}), 500
+            return json_response({'error': 'データの取得に失敗しました'}, 500)
+    
+    def api_get_videos(self):
+        """動画一覧のページ取得API（page/per_page または cursor で指定）"""
+        open_id = request.args.get('open_id')
+        if not open_id:
+            return json_response({'error': 'open_id is required'}, 400)
+        
+        user = self.user_manager.get_user_by_open_id(open_id)
+        if not user:
+            return json_response({'error': 'ユーザーが見つかりません'}, 404)
+        
+        try:
+            per_page = min(max(int(request.args.get('per_page', self.config.DEFAULT_VIDEO_COUNT)), 1), self.config.MAX_VIDEO_COUNT)
+            cursor = request.args.get('cursor')
+            page = int(request.args.get('page', 1))
+            
+            # 同期済みの動画から切り出す（未同期の場合のみAPIから取得）
+            videos = video_sync.get_videos(open_id)
+            if videos is None:
+                videos = video_sync.sync(user['access_token'], open_id)
+            
+            if cursor is not None:
+                pagination = paginate_videos_by_cursor(videos, cursor, per_page)
+            else:
+                pagination = paginate_videos(videos, page, per_page)
+                page_videos = pagination['videos']
+                pagination['next_cursor'] = encode_cursor(page_videos[-1]) if pagination['has_next'] and page_videos else None
+            
+            page_videos = pagination.pop('videos')
+            return json_response({
+                'success': True,
+                'videos': page_videos,
+                'pagination': pagination
+            })
+            
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+        except CircuitOpenError as e:
+            self.logger.warning(f"動画一覧取得のAPI停止中で同期済みデータもありません: {e}")
+            return json_response({'error': 'TikTok APIが一時的に不安定です', 'retry_after': round(e.retry_after, 1)}, 503)
+        except RateLimitExceeded as e:
+            self.logger.warning(f"動画一覧取得の呼び出し制限: {e}")
+            return json_response({'error': 'APIの呼び出し回数の上限に達しました', 'retry_after': round(e.retry_after, 1)}, 429)
+        except Exception as e:
+            self.logger.error(f"動画一覧取得エラー: {e}")
+            return json_response({'error': 'データの取得に失敗しました'}, 500)
+    
+    def api_query_videos(self):
+        """動画の検索API（範囲での絞り込み・期間指定・並べ替え・上位N件）
+
+        クエリパラメータ:
+            open_id: ユーザーのopen_id（必須）
+            sort: 並べ替えるフィールド（view_count, like_count, share_count, engagement_rate, create_time）
+            order: desc（既定）または asc
+            limit: 最大件数（既定10、最大100）
+            offset: 読み飛ばす件数
+            min_<field>, max_<field>: 範囲での絞り込み（例: min_engagement_rate=5）
+            since, until: 投稿日時の期間（Unix秒、YYYY-MM-DD、ISO 8601形式）
+        """
+        open_id = request.args.get('open_id')
+        if not open_id:
+            return json_response({'error': 'open_id is required'}, 400)
+        
+        user = self.user_manager.get_user_by_open_id(open_id)
+        if not user:
+            return json_response({'error': 'ユーザーが見つかりません'}, 404)
+        
+        try:
+            sort_by = request.args.get('sort', 'create_time')
+            descending = request.args.get('order', 'desc') != 'asc'
+            limit = min(max(int(request.args.get('limit', 10)), 1), 100)
+            offset = max(int(request.args.get('offset', 0)), 0)
+            ranges = {}
+            for field in INDEXED_FIELDS:
+                if field == 'create_time':
+                    continue
+                minimum = request.args.get(f'min_{field}')
+                maximum = request.args.get(f'max_{field}')
+                ranges[field] = (float(minimum) if minimum else None, float(maximum) if maximum else None)
+            
+            # 同期済みの動画を検索する（未同期の場合のみAPIから取得）
+            snapshot = video_sync.get_snapshot(open_id)
+            if snapshot is None:
+                video_sync.sync(user['access_token'], open_id)
+                snapshot = video_sync.get_snapshot(open_id)
+            version, videos = snapshot
+            
+            # エンゲージメント率はフォロワー数から計算する
+            try:
+                profile = get_user_profile(user['access_token'], fields=VIDEO_DETAIL_PROFILE_FIELDS, open_id=open_id)
+            except CircuitOpenError:
+                profile = get_cached_user_profile(user['access_token'], fields=VIDEO_DETAIL_PROFILE_FIELDS, open_id=open_id) or {}
+            follower_count = profile.get('follower_count', 0) or 0
+            
+            results, total = video_query_service.search(
+                open_id, version, videos, follower_count,
+                ranges=ranges, since=request.args.get('since'), until=request.args.get('until'),
+                sort_by=sort_by, descending=descending, limit=limit, offset=offset
+            )
+            
+            # 同期済みのレコードは共有されているため、コピーにエンゲージメント率を設定する
+            page_videos = [video.copy().set_engagement(follower_count) for video in results]
+            
+            return json_response({
+                'success': True,
+                'videos': page_videos,
+                'total': total,
+                'limit': limit,
+                'offset': offset
+            })
+            
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+        except CircuitOpenError as e:
+            self.logger.warning(f"動画検索のAPI停止中で同期済みデータもありません: {e}")
+            return json_response({'error': 'TikTok APIが一時的に不安定です', 'retry_after': round(e.retry_after, 1)}, 503)
+        except RateLimitExceeded as e:
+            self.logger.warning(f"動画検索の呼び出し制限: {e}")
+            return json_response({'error': 'APIの呼び出し回数の上限に達しました', 'retry_after': round(e.retry_after, 1)}, 429)
+        except Exception as e:
+            self.logger.error(f"動画検索エラー: {e}")
+            return json_response({'error': 'データの取得に失敗しました'}, 500)
+    
+    def _growth_window(self) -> int:
+        """伸びの集計期間（秒）をクエリパラメータから取得（1時間〜日次データの保持期間）"""
+        window = int(request.args.get('window', 7 * 86400))
+        return min(max(window, 3600), self.config.STATS_DAILY_RETENTION)
+    
+    def _find_video_owner(self, video_id):
+        """セッションのアカウントのうち動画の投稿者（永続ストア、投稿者が不明な場合は同期済みの動画で確認）"""
+        owner = store.get_video_owner(video_id)
+        for user in self.user_manager.get_users():
+            open_id = user.get('open_id')
+            if owner is not None:
+                if owner == open_id:
+                    return user
+            elif any(video.get('id') == video_id for video in video_sync.get_videos(open_id) or ()):
+                return user
+        return None
+    
+    def api_video_growth(self, video_id):
+        """動画の統計の伸び（差分・1時間あたりの増加量・時系列）取得API（セッションのアカウントの動画のみ）"""
+        if not self._find_video_owner(video_id):
+            return json_response({'error': '動画が見つかりません'}, 404)
+        
+        try:
+            growth = stats_history.get_video_growth(video_id, self._growth_window())
+        except ValueError:
+            return json_response({'error': 'windowは秒数で指定してください'}, 400)
+        return json_response({'success': True, **growth})
+    
+    def api_account_growth(self):
+        """アカウントの統計の伸び（保存済みの全動画の合計）取得API"""
+        open_id = request.args.get('open_id')
+        if not open_id:
+            return json_response({'error': 'open_id is required'}, 400)
+        
+        if not self.user_manager.get_user_by_open_id(open_id):
+            return json_response({'error': 'ユーザーが見つかりません'}, 404)
+        
+        try:
+            growth = stats_history.get_account_growth(open_id, self._growth_window())
+        except ValueError:
+            return json_response({'error': 'windowは秒数で指定してください'}, 400)
+        return json_response({'success': True, **growth})
     
     def api_get_users(self):
         """ユーザーリスト取得API"""
@@ -286,7 +495,7 @@ class Views:
         for user in users:
             user['session_info'] = self.user_manager.get_session_expiry_info(user)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'users': users,
             'current_user_open_id': session.get('current_user_open_id')
@@ -334,6 +543,84 @@ class Views:
             'session_config': session_config
         })
     
+    def debug_http_pool(self):
+        """デバッグ用HTTP接続プール統計表示"""
+        if not self.auth_service.is_authenticated():
+            return jsonify({'error': '認証されていません'}), 401
+        
+        return jsonify({
+            'success': True,
+            'http_pool': http_client.get_pool_stats()
+        })
+    
+    def debug_rate_limits(self):
+        """デバッグ用レート制限の残り実行枠表示"""
+        if not self.auth_service.is_authenticated():
+            return jsonify({'error': '認証されていません'}), 401
+        
+        budgets = {}
+        for user in self.user_manager.get_users():
+            budgets[user.get('open_id')] = rate_limiter.get_budget(user['access_token'])
+        
+        return jsonify({
+            'success': True,
+            'mode': self.config.RATE_LIMIT_MODE,
+            'max_wait': self.config.RATE_LIMIT_MAX_WAIT,
+            'rate_limits': budgets
+        })
+    
+    def debug_circuit_breakers(self):
+        """デバッグ用サーキットブレーカー状態表示"""
+        if not self.auth_service.is_authenticated():
+            return jsonify({'error': '認証されていません'}), 401
+        
+        return jsonify({
+            'success': True,
+            'circuit_breakers': circuit_breakers.snapshot()
+        })
+    
+    def debug_singleflight(self):
+        """デバッグ用の同時リクエスト集約統計表示"""
+        if not self.auth_service.is_authenticated():
+            return jsonify({'error': '認証されていません'}), 401
+        
+        return jsonify({
+            'success': True,
+            'singleflight': get_singleflight_stats()
+        })
+    
+    def debug_revalidate(self):
+        """デバッグ用のstale-while-revalidate統計表示（古い値と最新の値で応答した回数）"""
+        if not self.auth_service.is_authenticated():
+            return jsonify({'error': '認証されていません'}), 401
+        
+        return jsonify({
+            'success': True,
+            'revalidate': get_revalidate_stats()
+        })
+    
+    def debug_cache(self):
+        """デバッグ用のキャッシュ統計表示（キーファミリーごとのヒット・ミス・削除の回数、件数とおおよそのバイト数）"""
+        if not self.auth_service.is_authenticated():
+            return jsonify({'error': '認証されていません'}), 401
+        
+        return jsonify({
+            'success': True,
+            'backend': self.config.CACHE_BACKEND,
+            'caches': get_cache_stats()
+        })
+    
+    def debug_cache_metrics(self):
+        """キャッシュ統計のPrometheus形式（METRICS_TOKENを設定した場合はBearerトークンでも取得可能）"""
+        token = self.config.METRICS_TOKEN
+        # トークンの比較は一致した文字数で時間が変わらないようにする
+        authorized_by_token = bool(token) and hmac.compare_digest(
+            request.headers.get('Authorization', '').encode('utf-8'), f"Bearer {token}".encode('utf-8'))
+        if not authorized_by_token and not self.auth_service.is_authenticated():
+            return Response('unauthorized\n', status=401, mimetype='text/plain')
+        
+        return Response(render_prometheus(get_cache_stats()), mimetype='text/plain; version=0.0.4')
+    
     def video_upload(self):
         """動画アップロードページ表示"""
         # 認証チェック
@@ -521,7 +808,8 @@ class Views:
                     disable_comment=disable_comment,
                     disable_duet=disable_duet,
                     disable_stitch=disable_stitch,
-                    is_draft=is_draft
+                    is_draft=is_draft,
+                    open_id=current_user["open_id"]
                 )
                 
                 if success:
@@ -0,0 +1,65 @@
+"""ダッシュボード相当のファンアウトにおける同期/非同期の実行時間比較
+
+ローカル代替サーバー（tools/fake_tiktok_api.py）に固定レイテンシを設定し、複数アカウント分の
+プロフィール取得と動画一覧取得（一覧 + 詳細一括取得）を
+逐次実行した場合と gather_api_calls で同時実行した場合の所要時間を比較する。
+
+使い方:
+    python -m benchmarks.async_fanout --accounts 3 --latency 0.1
+"""
+
+import argparse
+import os
+import time
+from tools.fake_tiktok_api import FakeTikTokServer, FakeApiOptions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=3, help="同時に表示するアカウント数")
+    parser.add_argument("--latency", type=float, default=0.1, help="代替サーバーのレスポンス遅延（秒）")
+    parser.add_argument("--rounds", type=int, default=5, help="計測回数")
+    args = parser.parse_args()
+
+    server = FakeTikTokServer(FakeApiOptions(videos=20, latency_ms=args.latency * 1000, rate_limit_scale=0)).start()
+
+    # サービスを読み込む前に接続先を代替サーバーに向ける
+    os.environ["TIKTOK_API_BASE_URL"] = server.base_url
+    from app.services.cache import clear_all_caches
+    from app.services.get_profile import get_user_profile
+    from app.services.get_video_list import get_video_list
+    from app.services.async_client import (
+        run_sync, gather_api_calls, async_get_user_profile, async_get_video_list
+    )
+
+    tokens = [f"act.fake.benchmark{i:04d}" for i in range(args.accounts)]
+
+    def sequential():
+        for token in tokens:
+            get_user_profile(token)
+            get_video_list(token, token, max_count=20)
+
+    def concurrent():
+        calls = []
+        for token in tokens:
+            calls.append(async_get_user_profile(token))
+            calls.append(async_get_video_list(token, token, max_count=20))
+        run_sync(gather_api_calls(*calls))
+
+    results = {}
+    for name, func in (("sequential", sequential), ("async gather", concurrent)):
+        timings = []
+        for _ in range(args.rounds):
+            clear_all_caches()
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        results[name] = timings
+
+    server.stop()
+
+    print(f"accounts={args.accounts} latency={args.latency * 1000:.0f}ms rounds={args.rounds}")
+    for name, timings in results.items():
+        print(f"{name:>14}: min {min(timings) * 1000:8.1f} ms  avg {sum(timings) / len(timings) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
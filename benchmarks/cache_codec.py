@@ -0,0 +1,114 @@
+"""キャッシュの値のコーデック（オブジェクトのまま / msgpack / JSON、圧縮なし / zlib / lz4）のベンチマーク
+
+1. キャッシュ単体: 動画一覧（VideoRecordのリスト）をキャッシュに保持したときのメモリ（tracemallocで計測）と、
+   保存時のエンコード、取得時のデコード（レコードへの復元を含む）の時間を比較する。
+   MBは保持しているメモリ（アロケータの余剰を含む）、payload MBはエンコード後のバイト列の長さ。
+2. プロセス全体: アプリと同じく同期済みの動画（VideoSync）と検索インデックス（VideoQueryService）が
+   同じレコードを保持している状態で、一覧をキャッシュに保存したときのプロセスのRSSの増加を
+   コーデックごとに別プロセスで計測する（Linuxのみ）。オブジェクトのまま保持する場合、キャッシュは
+   同期状態と同じレコードを参照するだけのため、エンコードしてもレコードは解放されずバイト列の分だけ増える。
+
+lz4とmsgpackはインストールされている場合のみ計測する。
+
+使い方:
+    python -m benchmarks.cache_codec --videos 1000 10000 100000
+"""
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+from benchmarks.records import make_api_response, load_records, retained_bytes, bench
+from app.services.cache import Cache
+from app.services.cache_backends import MemoryBackend
+from app.services.cache_codec import CacheCodec, msgpack, lz4_frame
+from app.services.video_query import VideoIndex
+
+def codecs():
+    """計測するコーデック（名前, コーデック）。Noneはオブジェクトのまま保持"""
+    result = [("objects", None)]
+    formats = (["msgpack"] if msgpack is not None else []) + ["json"]
+    compressions = ["none", "zlib"] + (["lz4"] if lz4_frame is not None else [])
+    for format in formats:
+        for compression in compressions:
+            result.append((f"{format}+{compression}", CacheCodec(format, compression)))
+    return result
+
+def _rss_bytes() -> int:
+    """現在のプロセスのRSS（バイト）"""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("VmRSSを取得できません")
+
+def measure_process(codec_name: str, count: int) -> dict:
+    """同期状態とインデックスを保持した上で一覧をキャッシュに保存したときのRSSの増加（子プロセスで実行）"""
+    codec = dict(codecs())[codec_name]
+    raw = make_api_response(count)
+    gc.collect()
+    baseline = _rss_bytes()
+
+    # 同期済みの動画と、それを参照する検索インデックス
+    synced = load_records(raw)
+    index = VideoIndex(synced, follower_count=10_000)
+    gc.collect()
+    with_sync = _rss_bytes()
+
+    # 差分同期の一覧（video:<open_id>:list）は同期済みの動画と同じリストを保存する
+    cache = Cache(ttl=300, name="bench", backend=MemoryBackend(), codec=codec)
+    cache.set("video:bench:list", list(synced))
+    gc.collect()
+    with_cache = _rss_bytes()
+    assert index is not None and cache.get("video:bench:list") is not None
+    return {"sync": with_sync - baseline, "cache": with_cache - with_sync}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="動画数")
+    parser.add_argument("--process-child", metavar="CODEC", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.process_child:
+        print(json.dumps(measure_process(args.process_child, args.videos[0])))
+        return
+
+    print("キャッシュ単体")
+    print(f"{'videos':>7} {'codec':<13} {'MB':>8} {'ratio':>6} {'payload MB':>10} {'encode ms':>10} {'decode ms':>10}")
+    for count in args.videos:
+        raw = make_api_response(count)
+        records = load_records(raw)
+        expected = [record.to_api() for record in records]
+        object_bytes = retained_bytes(load_records, raw)
+        repeat = max(3, 30_000 // count)
+
+        for name, codec in codecs():
+            if codec is None:
+                print(f"{count:>7} {name:<13} {object_bytes / 1e6:>8.2f} {1:>6.2f} {'-':>10} {'-':>10} {'-':>10}")
+                continue
+            encoded = codec.encode(records)
+            # 復元した値が元のレコードと一致することを確認してから計測する
+            assert [record.to_api() for record in codec.decode(encoded)] == expected
+            stored_bytes = retained_bytes(lambda raw: codec.encode(load_records(raw)), raw)
+            encode_ms = bench(lambda: codec.encode(records), repeat) * 1e3
+            decode_ms = bench(lambda: codec.decode(encoded), repeat) * 1e3
+            print(f"{count:>7} {name:<13} {stored_bytes / 1e6:>8.2f} {stored_bytes / object_bytes:>6.2f} "
+                  f"{len(encoded.data) / 1e6:>10.2f} {encode_ms:>10.2f} {decode_ms:>10.2f}")
+
+    if not sys.platform.startswith("linux"):
+        return
+    print()
+    print("プロセス全体（同期状態・検索インデックスを含むRSSの増加）")
+    print(f"{'videos':>7} {'codec':<13} {'sync MB':>8} {'+cache MB':>10}")
+    for count in args.videos:
+        for name, _ in codecs():
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.cache_codec", "--process-child", name, "--videos", str(count)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{count:>7} {name:<13} {result['sync'] / 1e6:>8.2f} {result['cache'] / 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""JSONバックエンド（標準ライブラリ / orjson）のマイクロベンチマーク
+
+動画一覧APIのレスポンス（video/list + video/query をマージした形）と
+/api/user-data のレスポンスに相当するペイロードで、デコードとエンコードの時間を比較する。
+
+使い方:
+    python -m benchmarks.json_codec --videos 20 200 1000
+"""
+
+import argparse
+import random
+import timeit
+from app.services.json_codec import JsonCodec, orjson
+
+def make_video_payload(count: int, seed: int = 0):
+    """動画一覧APIレスポンス相当のペイロードを作成"""
+    rng = random.Random(seed)
+    videos = []
+    create_time = 1735689600
+    for index in range(count):
+        create_time -= rng.randint(600, 86400)
+        video_id = str(7400000000000000000 + rng.randint(0, 10 ** 17))
+        views = rng.randint(100, 5_000_000)
+        videos.append({
+            "id": video_id,
+            "title": f"動画タイトル {index} #fyp #おすすめ",
+            "cover_image_url": f"https://p16-sign.tiktokcdn.com/obj/tos-maliva-p-0068/{video_id}~tplv-noop.image?x-expires=1735776000&x-signature=abcdef",
+            "create_time": create_time,
+            "duration": rng.randint(5, 180),
+            "view_count": views,
+            "like_count": views // rng.randint(8, 40),
+            "comment_count": views // rng.randint(200, 2000),
+            "share_count": views // rng.randint(100, 1000),
+            "embed_link": f"https://www.tiktok.com/player/v1/{video_id}",
+            "best_image_url": f"https://p16-sign.tiktokcdn.com/obj/tos-maliva-p-0068/{video_id}~tplv-noop.image",
+            "formatted_create_time": "2025年01月01日 12:00",
+        })
+    return {"data": {"videos": videos, "cursor": create_time * 1000, "has_more": True},
+            "error": {"code": "ok", "message": "", "log_id": "20250101000000"}}
+
+def bench(func, number: int) -> float:
+    """1回あたりの平均時間（マイクロ秒）"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, nargs="+", default=[20, 200, 1000], help="ペイロードの動画数")
+    args = parser.parse_args()
+
+    backends = [JsonCodec("json")]
+    if orjson is not None:
+        backends.append(JsonCodec("orjson"))
+    else:
+        print("orjsonがインストールされていないため、標準ライブラリのみ計測します")
+
+    print(f"{'videos':>7} {'bytes':>9} {'backend':>8} {'decode µs':>11} {'encode µs':>11}")
+    for count in args.videos:
+        payload = make_video_payload(count)
+        raw = JsonCodec("json").dumps_bytes(payload)
+        number = max(10, 20000 // count)
+        results = {}
+        for backend in backends:
+            decode = bench(lambda: backend.loads(raw), number)
+            encode = bench(lambda: backend.dumps_bytes(payload), number)
+            results[backend.backend] = (decode, encode)
+            print(f"{count:>7} {len(raw):>9} {backend.backend:>8} {decode:>11.1f} {encode:>11.1f}")
+        if len(results) == 2:
+            (jd, je), (od, oe) = results["json"], results["orjson"]
+            print(f"{'':>7} {'':>9} {'speedup':>8} {jd / od:>10.1f}x {je / oe:>10.1f}x")
+
+if __name__ == "__main__":
+    main()
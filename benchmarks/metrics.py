@@ -0,0 +1,74 @@
+"""動画の統計集計（辞書のリストのループ / NumPyの列）のマイクロベンチマーク
+
+ダッシュボードの合計・平均エンゲージメント率と、動画ごとのエンゲージメント率の計算時間を比較する。
+列への変換時間（from_videos）は別に計測し、ベクトル化した集計の時間には含めない。
+
+使い方:
+    python -m benchmarks.metrics --videos 1000 10000 100000
+"""
+
+import argparse
+import time
+import timeit
+from benchmarks.json_codec import make_video_payload
+from app.services.metrics import VideoMetrics
+from app.services.utils import calculate_engagement_rate, calculate_average_engagement_rate
+
+FOLLOWER_COUNT = 50_000
+
+def bench(func, number: int) -> float:
+    """1回あたりの平均時間（ミリ秒）"""
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e3
+
+def python_summary(videos):
+    """ビューで使っていた辞書のループによる集計"""
+    return (sum(v.get('share_count', 0) or 0 for v in videos),
+            sum(v.get('view_count', 0) or 0 for v in videos),
+            calculate_average_engagement_rate(videos, FOLLOWER_COUNT))
+
+def python_rates(videos):
+    return [calculate_engagement_rate(v.get("like_count", 0) or 0, v.get("comment_count", 0) or 0,
+                                      v.get("share_count", 0) or 0, FOLLOWER_COUNT) for v in videos]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="動画数")
+    args = parser.parse_args()
+
+    print(f"{'videos':>7} {'operation':<26} {'python ms':>10} {'numpy ms':>9} {'speedup':>8}")
+    for count in args.videos:
+        videos = make_video_payload(count)["data"]["videos"]
+        number = max(1, 100_000 // count)
+
+        start = time.perf_counter()
+        metrics = VideoMetrics.from_videos(videos)
+        convert_ms = (time.perf_counter() - start) * 1e3
+        print(f"{count:>7} {'from_videos (once)':<26} {'':>10} {convert_ms:>9.2f}")
+
+        # 結果が一致することを確認してから計測する
+        summary = metrics.summary(FOLLOWER_COUNT)
+        assert python_summary(videos) == (summary["total_share_count"], summary["total_view_count"],
+                                          summary["avg_engagement_rate"])
+        assert python_rates(videos) == metrics.engagement_rates(FOLLOWER_COUNT).tolist()
+
+        cases = [
+            ("totals + avg engagement", lambda: python_summary(videos),
+             lambda: (metrics.totals(), metrics.average_engagement_rates([FOLLOWER_COUNT]))),
+            ("per-video engagement", lambda: python_rates(videos),
+             lambda: metrics.engagement_rates(FOLLOWER_COUNT)),
+        ]
+        for name, python_func, numpy_func in cases:
+            python_ms = bench(python_func, number)
+            numpy_ms = bench(numpy_func, number)
+            print(f"{'':>7} {name:<26} {python_ms:>10.3f} {numpy_ms:>9.3f} {python_ms / numpy_ms:>7.1f}x")
+
+        # 複数アカウントをまとめて集計
+        accounts = {f"account_{index}": videos[index::10] for index in range(10)}
+        followers = {open_id: FOLLOWER_COUNT for open_id in accounts}
+        combined = VideoMetrics.from_accounts(accounts)
+        python_ms = bench(lambda: [python_summary(account_videos) for account_videos in accounts.values()], number)
+        numpy_ms = bench(lambda: combined.summaries(followers), number)
+        print(f"{'':>7} {'10 accounts summaries':<26} {python_ms:>10.3f} {numpy_ms:>9.3f} {python_ms / numpy_ms:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""動画の保持形式（辞書 / VideoRecord）のメモリ使用量と変換時間のベンチマーク
+
+APIレスポンスのJSONをデコードして、これまでキャッシュしていた辞書（best_image_url と
+formatted_create_time を追加したもの）と、VideoRecord のリストを作成したときに
+保持し続けるメモリをtracemallocで計測する。変換（from_api）と辞書への復元（to_dict）の時間も計測する。
+
+使い方:
+    python -m benchmarks.records --videos 1000 10000 100000
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+from benchmarks.json_codec import make_video_payload
+from app.services import json_codec
+from app.services.records import VideoRecord
+from app.services.utils import get_best_image_url, format_create_time
+
+DERIVED_FIELDS = ("best_image_url", "formatted_create_time")
+
+def make_api_response(count: int) -> bytes:
+    """派生フィールドを含まないAPIレスポンス相当のJSON"""
+    payload = make_video_payload(count)
+    for video in payload["data"]["videos"]:
+        for field in DERIVED_FIELDS:
+            del video[field]
+    return json_codec.dumps_bytes(payload)
+
+def load_dicts(raw: bytes):
+    """これまでの形式: デコードした辞書に表示用フィールドを追加"""
+    videos = json_codec.loads(raw)["data"]["videos"]
+    for video in videos:
+        video["best_image_url"] = get_best_image_url(video)
+        video["formatted_create_time"] = format_create_time(video.get("create_time"))
+    return videos
+
+def load_records(raw: bytes):
+    """VideoRecordに変換（デコードした辞書は破棄される）"""
+    return [VideoRecord.from_api(video) for video in json_codec.loads(raw)["data"]["videos"]]
+
+def retained_bytes(loader, raw: bytes) -> int:
+    """loaderが返したリストが保持するメモリ（バイト）"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        videos = loader(raw)
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del videos
+    return current
+
+def bench(func, number: int) -> float:
+    """number回実行したうちの最短時間（秒）"""
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="動画数")
+    args = parser.parse_args()
+
+    print(f"{'videos':>7} {'dict MB':>9} {'record MB':>10} {'saved':>6} {'from_api µs':>12} {'to_dict µs':>11}")
+    for count in args.videos:
+        raw = make_api_response(count)
+        dict_bytes = retained_bytes(load_dicts, raw)
+        record_bytes = retained_bytes(load_records, raw)
+
+        # 変換結果が元の辞書と一致することを確認してから計測する
+        videos = load_dicts(raw)
+        records = [VideoRecord.from_api(video) for video in videos]
+        assert [record.to_dict() for record in records] == videos
+
+        repeat = max(3, 100_000 // count)
+        from_api_us = bench(lambda: [VideoRecord.from_api(video) for video in videos], repeat) / count * 1e6
+        to_dict_us = bench(lambda: [record.to_dict() for record in records], repeat) / count * 1e6
+        print(f"{count:>7} {dict_bytes / 1e6:>9.2f} {record_bytes / 1e6:>10.2f} "
+              f"{1 - record_bytes / dict_bytes:>6.0%} {from_api_us:>12.2f} {to_dict_us:>11.2f}")
+
+if __name__ == "__main__":
+    main()
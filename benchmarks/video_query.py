@@ -0,0 +1,67 @@
+"""動画検索（ソート済みインデックス）のマイクロベンチマーク
+
+同期済みの動画リストに対して、インデックスを使う VideoIndex と、
+毎回リスト全体を絞り込んで並べ替える素朴な実装の検索時間を比較する。
+
+使い方:
+    python -m benchmarks.video_query --videos 10000 100000
+"""
+
+import argparse
+import time
+import timeit
+from benchmarks.json_codec import make_video_payload
+from app.services.utils import calculate_engagement_rate
+from app.services.video_query import VideoIndex
+
+FOLLOWER_COUNT = 50_000
+
+def bench(func, number: int) -> float:
+    """1回あたりの平均時間（ミリ秒）"""
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e3
+
+def naive_query(videos, predicate, key, limit):
+    """リスト全体を絞り込んで並べ替える"""
+    return sorted((video for video in videos if predicate(video)), key=key, reverse=True)[:limit]
+
+def engagement(video) -> float:
+    return calculate_engagement_rate(video["like_count"], video["comment_count"], video["share_count"], FOLLOWER_COUNT)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, nargs="+", default=[10_000, 100_000], help="動画数")
+    args = parser.parse_args()
+
+    print(f"{'videos':>7} {'query':<28} {'index ms':>9} {'naive ms':>9} {'speedup':>8}")
+    for count in args.videos:
+        videos = make_video_payload(count)["data"]["videos"]
+        start = time.perf_counter()
+        index = VideoIndex(videos, FOLLOWER_COUNT)
+        build_ms = (time.perf_counter() - start) * 1e3
+        print(f"{count:>7} {'build index':<28} {build_ms:>9.1f}")
+
+        newest = videos[0]["create_time"]
+        month_ago = newest - 30 * 86400
+        views_floor = sorted(video["view_count"] for video in videos)[count * 9 // 10]
+        cases = [
+            ("top 10 by views",
+             lambda: index.query(sort_by="view_count", limit=10),
+             lambda: naive_query(videos, lambda v: True, lambda v: v["view_count"], 10)),
+            ("top 10 by views, last 30d",
+             lambda: index.query({"create_time": (month_ago, None)}, sort_by="view_count", limit=10),
+             lambda: naive_query(videos, lambda v: v["create_time"] >= month_ago, lambda v: v["view_count"], 10)),
+            ("engagement >= 5%, top 20",
+             lambda: index.query({"engagement_rate": (5.0, None)}, sort_by="engagement_rate", limit=20),
+             lambda: naive_query(videos, lambda v: engagement(v) >= 5.0, engagement, 20)),
+            ("views >= p90, top 10 likes",
+             lambda: index.query({"view_count": (views_floor, None)}, sort_by="like_count", limit=10),
+             lambda: naive_query(videos, lambda v: v["view_count"] >= views_floor, lambda v: v["like_count"], 10)),
+        ]
+        number = max(1, 100_000 // count)
+        for name, indexed, naive in cases:
+            indexed_ms = bench(indexed, number * 10)
+            naive_ms = bench(naive, number)
+            print(f"{'':>7} {name:<28} {indexed_ms:>9.3f} {naive_ms:>9.3f} {naive_ms / indexed_ms:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
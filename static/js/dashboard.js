@@ -2,33 +2,50 @@
  * ダッシュボードページ用JavaScript
  */
 
-// ページネーション状態管理
+// ページネーション状態管理（動画はページ単位でサーバーから取得）
 const PaginationManager = {
+  openId: null,
   currentPage: 1,
   itemsPerPage: 6,
   totalItems: 0,
   totalPages: 0,
-  currentVideos: [],
 
   /**
-   * ページネーションを初期化
-   * @param {Array} videos - 全動画配列
+   * ページネーションを初期化して最初のページを表示
+   * @param {string} openId - 表示するユーザーのOpen ID
+   * @returns {Promise<void>}
    */
-  init(videos) {
-    this.currentVideos = videos || [];
-    this.totalItems = this.currentVideos.length;
-    this.totalPages = Math.ceil(this.totalItems / this.itemsPerPage);
+  async init(openId) {
+    this.openId = openId;
     this.currentPage = 1;
+    await this.loadPage(1);
   },
 
   /**
-   * 現在のページの動画を取得
-   * @returns {Array} 現在のページの動画配列
+   * 指定ページの動画をサーバーから取得して表示
+   * @param {number} page - ページ番号
+   * @returns {Promise<void>}
    */
-  getCurrentPageVideos() {
-    const startIndex = (this.currentPage - 1) * this.itemsPerPage;
-    const endIndex = startIndex + this.itemsPerPage;
-    return this.currentVideos.slice(startIndex, endIndex);
+  async loadPage(page) {
+    if (!this.openId) return;
+
+    const params = new URLSearchParams({
+      open_id: this.openId,
+      page: page,
+      per_page: this.itemsPerPage,
+    });
+    const response = await fetch(`/api/videos?${params}`);
+    if (!response.ok) {
+      console.error("動画一覧の取得に失敗しました:", response.status);
+      return;
+    }
+
+    const data = await response.json();
+    const { videos, pagination } = data;
+    this.currentPage = pagination.page;
+    this.totalItems = pagination.total;
+    this.totalPages = pagination.total_pages;
+    this.updateDisplay(videos);
   },
 
   /**
@@ -37,8 +54,7 @@ const PaginationManager = {
    */
   goToPage(page) {
     if (page >= 1 && page <= this.totalPages) {
-      this.currentPage = page;
-      this.updateDisplay();
+      this.loadPage(page);
     }
   },
 
@@ -62,10 +78,10 @@ const PaginationManager = {
 
   /**
    * 表示を更新
+   * @param {Array} videos - 現在のページの動画配列
    */
-  updateDisplay() {
-    const currentVideos = this.getCurrentPageVideos();
-    updateVideoGrid(currentVideos);
+  updateDisplay(videos) {
+    updateVideoGrid(videos);
     updatePaginationDisplay();
   },
 
@@ -214,11 +230,10 @@ async function switchUser(openId) {
  * ダッシュボードコンテンツを更新
  * @param {Object} userData - ユーザーデータオブジェクト
  * @param {Object} userData.profile - プロフィール情報
- * @param {Array} userData.videos - 動画リスト
  * @param {Object} userData.user_info - ユーザー統計情報
  */
 function updateDashboardContent(userData) {
-  const { profile, videos, user_info } = userData;
+  const { profile, user_info } = userData;
 
   // プロフィール情報を更新
   if (profile) {
@@ -317,10 +332,9 @@ function updateDashboardContent(userData) {
     }
   }
 
-  // 動画リストを更新（ページネーション機能付き）
-  if (videos) {
-    PaginationManager.init(videos);
-    PaginationManager.updateDisplay();
+  // 動画リストを更新（ページ単位でサーバーから取得）
+  if (user_info && user_info.open_id) {
+    PaginationManager.init(user_info.open_id);
   }
 
   // ヘッダーのアクティブ状態を更新
@@ -457,47 +471,10 @@ function hideLoading() {
  * ページ読み込み時の初期化処理
  */
 document.addEventListener("DOMContentLoaded", function () {
-  // 初期データでページネーションを設定
+  // 表示中のユーザーの動画をページ単位で取得
+  const openId = document.getElementById("profile-openid")?.textContent.trim();
   const videoGrid = document.getElementById("video-grid");
-  if (videoGrid && videoGrid.children.length > 0) {
-    // 既存の動画カードからデータを抽出
-    const videoCards = Array.from(videoGrid.querySelectorAll(".video-card"));
-    const videos = videoCards.map((card) => {
-      const title =
-        card.querySelector(".video-title")?.textContent || "タイトルなし";
-      const id = card.querySelector(".video-id code")?.textContent || "";
-      const date =
-        card
-          .querySelector(".video-date")
-          ?.textContent.replace("投稿日:", "")
-          .trim() || "";
-      const viewCount = parseInt(
-        card.querySelector(".video-stats .video-stat-number")?.textContent ||
-          "0"
-      );
-      const likeCount = parseInt(
-        card.querySelectorAll(".video-stats .video-stat-number")[1]
-          ?.textContent || "0"
-      );
-      const commentCount = parseInt(
-        card.querySelectorAll(".video-stats .video-stat-number")[2]
-          ?.textContent || "0"
-      );
-      const imageUrl = card.querySelector(".video-cover")?.src || "";
-
-      return {
-        id: id,
-        title: title,
-        formatted_create_time: date,
-        view_count: viewCount,
-        like_count: likeCount,
-        comment_count: commentCount,
-        best_image_url: imageUrl,
-      };
-    });
-
-    // ページネーションを初期化
-    PaginationManager.init(videos);
-    PaginationManager.updateDisplay();
+  if (videoGrid && videoGrid.children.length > 0 && openId) {
+    PaginationManager.init(openId);
   }
 });
@@ -1,17 +1,80 @@
 /**
  * 動画詳細ページ用JavaScript
- * 現在は基本的な機能のみ実装
  */
 
+// 伸びを表示する統計と表示名
+const GROWTH_LABELS = {
+  view_count: "再生数",
+  like_count: "いいね",
+  comment_count: "コメント",
+  share_count: "シェア",
+};
+
+/**
+ * 再生数の推移を折れ線で描画
+ * @param {SVGElement} svg - 描画先のSVG要素
+ * @param {Array} points - 時系列の点（ts, view_countを含む）
+ */
+function drawGrowthChart(svg, points) {
+  const width = 300;
+  const height = 60;
+  const values = points.map((point) => point.view_count);
+  const minValue = Math.min(...values);
+  const range = Math.max(...values) - minValue || 1;
+  const startTs = points[0].ts;
+  const span = points[points.length - 1].ts - startTs || 1;
+
+  const coordinates = points
+    .map((point) => {
+      const x = ((point.ts - startTs) / span) * width;
+      const y = height - ((point.view_count - minValue) / range) * (height - 4) - 2;
+      return `${x.toFixed(1)},${y.toFixed(1)}`;
+    })
+    .join(" ");
+
+  svg.innerHTML = `<polyline points="${coordinates}" fill="none" stroke="#ff0050" stroke-width="2" />`;
+}
+
+/**
+ * 動画の統計の伸びを取得して表示
+ * @param {HTMLElement} container - 伸びの表示領域
+ * @returns {Promise<void>}
+ */
+async function loadVideoGrowth(container) {
+  const videoId = container.dataset.videoId;
+  const response = await fetch(`/api/videos/${encodeURIComponent(videoId)}/growth?window=604800`);
+  if (!response.ok) return;
+
+  const growth = await response.json();
+  if (!growth.points || growth.points.length < 2) return;
+
+  drawGrowthChart(document.getElementById("video-growth-chart"), growth.points);
+
+  const deltas = document.getElementById("video-growth-deltas");
+  deltas.innerHTML = Object.entries(GROWTH_LABELS)
+    .map(
+      ([field, label]) => `
+        <div class="video-growth-delta">
+          <span class="video-growth-label">${label}</span>
+          <span class="video-growth-value">+${growth.deltas[field] || 0}</span>
+          <span class="video-growth-rate">(${growth.rates_per_hour[field] || 0}/時間)</span>
+        </div>
+      `
+    )
+    .join("");
+
+  container.style.display = "block";
+}
+
 /**
  * 動画詳細ページの初期化処理
- * 将来的な機能拡張のためのプレースホルダー
- * 例: 動画の再生、統計情報の更新、コメント機能など
  */
 document.addEventListener("DOMContentLoaded", function () {
-  // 動画詳細ページの初期化処理
-  console.log("動画詳細ページが読み込まれました");
-
-  // 将来的な機能拡張のためのプレースホルダー
-  // 例: 動画の再生、統計情報の更新、コメント機能など
+  // 統計の伸びを表示（スナップショットが2点以上ある場合のみ）
+  const growthContainer = document.getElementById("video-growth");
+  if (growthContainer) {
+    loadVideoGrowth(growthContainer).catch((error) => {
+      console.error("統計の伸びの取得に失敗しました:", error);
+    });
+  }
 });
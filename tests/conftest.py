@@ -0,0 +1,32 @@
+"""テスト共通のフィクスチャ（ローカル代替サーバーへの接続）"""
+
+import pytest
+import requests
+
+from app.config import Config
+from app.services.store import store
+from tools.fake_tiktok_api import FakeTikTokServer, FakeApiOptions
+
+class FakeApi:
+    """起動中の代替サーバーと、受け付けたリクエスト数の取得"""
+
+    def __init__(self, server: FakeTikTokServer):
+        self.server = server
+
+    def request_counts(self):
+        """エンドポイントごとのリクエスト数"""
+        return requests.get(f"{self.server.base_url}/_fake/stats").json()["requests"]
+
+@pytest.fixture(scope="session")
+def fake_server():
+    # 動画は1ページ（20件）に収まる件数にし、初回同期の残りのページの取得が発生しないようにする
+    server = FakeTikTokServer(FakeApiOptions(videos=15, rate_limit_scale=0)).start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def fake_api(fake_server, monkeypatch):
+    """接続先を代替サーバーに切り替え、永続ストアを無効にする（キャッシュのみで検証する）"""
+    monkeypatch.setattr(Config, "TIKTOK_API_BASE_URL", fake_server.base_url)
+    monkeypatch.setattr(store, "enabled", False)
+    return FakeApi(fake_server)
@@ -0,0 +1,14 @@
+"""エンゲージメント率の丸め（ベクトル化した丸めとPythonのround()の一致）"""
+
+import numpy as np
+
+from app.services.metrics import _round1
+
+def test_round1_matches_python_round_near_ties():
+    rng = np.random.default_rng(0)
+    # x.x5 の境界とその前後の値（np.roundは10倍の誤差でround()と結果が異なることがある）
+    ties = np.arange(0, 10_000) / 10 + 0.05
+    values = np.concatenate([ties, np.nextafter(ties, 0), np.nextafter(ties, np.inf),
+                             rng.uniform(0, 100, 10_000), [0.0, 0.15, 0.25, 2.675]])
+
+    assert _round1(values).tolist() == [round(value, 1) for value in values.tolist()]
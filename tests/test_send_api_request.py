@@ -0,0 +1,45 @@
+"""TikTok API呼び出しのレート制限・サーキットブレーカー・再試行の組み合わせ"""
+
+import pytest
+import requests
+
+from app.services import utils
+from app.services.circuit_breaker import circuit_breakers, CircuitOpenError
+from app.services.rate_limiter import rate_limiter
+
+URL = "https://open.tiktokapis.com/v2/video/query/"
+
+def _response(status: int, headers=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b"{}"
+    return response
+
+@pytest.fixture(autouse=True)
+def reset_breakers():
+    circuit_breakers.reset_all()
+    yield
+    circuit_breakers.reset_all()
+
+def test_retry_after_429_in_fail_mode_waits_for_the_bucket(monkeypatch):
+    responses = [_response(429, {"Retry-After": "1"}), _response(200)]
+    monkeypatch.setattr(utils.http_client, "request", lambda *args, **kwargs: responses.pop(0))
+
+    # Retry-Afterはバケットにのみ反映し、再試行はバケットの次の枠まで待つため失敗しない
+    response = utils.send_api_request("POST", URL, "retry-after-fail-mode-token", rate_limit_mode="fail")
+
+    assert response.status_code == 200
+    assert responses == []
+
+def test_open_breaker_does_not_consume_rate_limit_tokens(monkeypatch):
+    access_token = "open-breaker-token"
+    breaker = circuit_breakers.get("video/query")
+    monkeypatch.setattr(breaker, "state", "open")
+    monkeypatch.setattr(breaker, "opened_at", float("inf"))
+    before = rate_limiter.remaining(access_token, "video/query")["remaining"]
+
+    with pytest.raises(CircuitOpenError):
+        utils.send_api_request("POST", URL, access_token)
+
+    assert rate_limiter.remaining(access_token, "video/query")["remaining"] == before
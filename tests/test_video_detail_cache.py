@@ -0,0 +1,40 @@
+"""ダッシュボードから動画詳細ページへの遷移でのキャッシュのヒット"""
+
+from app.services.async_client import fetch_dashboard_data, fetch_video_detail_data
+from app.services.cache import video_cache
+
+def _detail_hits() -> int:
+    return video_cache.counters.snapshot().get("video:detail", {}).get("hit", 0)
+
+def test_video_detail_after_dashboard_uses_seeded_cache(fake_api):
+    # 代替サーバーは act.fake.<open_id> のトークンをそのアカウントとして扱う
+    open_id = "detail_cache_test"
+    access_token = f"act.fake.{open_id}"
+
+    _, videos = fetch_dashboard_data(access_token, open_id, max_count=20, incremental=True)
+    assert videos
+    video_id = videos[0]["id"]
+
+    requests_before = fake_api.request_counts()
+    hits_before = _detail_hits()
+
+    details, profile = fetch_video_detail_data(access_token, video_id, open_id=open_id)
+
+    assert details["id"] == video_id
+    assert "follower_count" in profile
+    # 一覧の取得時に保存した動画詳細とプロフィールを使い、APIは呼ばない
+    assert fake_api.request_counts() == requests_before
+    assert _detail_hits() > hits_before
+
+def test_video_detail_is_not_shared_across_accounts(fake_api):
+    open_id = "detail_cache_owner_test"
+    _, videos = fetch_dashboard_data(f"act.fake.{open_id}", open_id, max_count=20, incremental=True)
+    other_open_id = "detail_cache_other_test"
+
+    requests_before = fake_api.request_counts()
+    # 別のアカウントの名前空間には保存されていないため、APIに問い合わせる（他人の動画は返らない）
+    details, _ = fetch_video_detail_data(f"act.fake.{other_open_id}", videos[0]["id"], open_id=other_open_id)
+
+    requests_after = fake_api.request_counts()
+    assert requests_after.get("video/query", 0) == requests_before.get("video/query", 0) + 1
+    assert details == {}
@@ -0,0 +1,23 @@
+"""動画検索の投稿日時による絞り込み"""
+
+from datetime import datetime
+
+from app.services.video_query import VideoQueryService
+
+def _video(video_id: str, created: datetime) -> dict:
+    return {"id": video_id, "create_time": int(created.timestamp()), "view_count": 100, "like_count": 10,
+            "comment_count": 1, "share_count": 1}
+
+def test_date_only_until_includes_the_whole_day():
+    videos = [
+        _video("morning", datetime(2024, 3, 1, 0, 0, 0)),
+        _video("night", datetime(2024, 3, 1, 23, 59, 59)),
+        _video("next_day", datetime(2024, 3, 2, 0, 0, 0)),
+    ]
+
+    results, total = VideoQueryService().search("date_only_until", 1, videos, since="2024-03-01",
+                                                until="2024-03-01", sort_by="create_time", descending=False)
+
+    # 日付のみの上限はその日の終わりまでを含み、翌日0時の動画は含まない
+    assert [video["id"] for video in results] == ["morning", "night"]
+    assert total == 2
@@ -0,0 +1,47 @@
+"""永続ストアからの動画の同期状態の復元（初回同期の途中で停止した場合の再開）"""
+
+import pytest
+
+from app.services import video_sync as video_sync_module
+from app.services.store import Store
+from app.services.video_sync import VideoSync
+
+@pytest.fixture
+def sync_store(fake_api, tmp_path, monkeypatch):
+    # 1ページ5件にして、代替サーバーの15件を3ページに分ける
+    monkeypatch.setattr(video_sync_module, "VIDEO_LIST_PAGE_SIZE", 5)
+    test_store = Store(str(tmp_path / "store.db"))
+    monkeypatch.setattr(video_sync_module, "store", test_store)
+    monkeypatch.setattr("app.services.get_video_list.store", test_store)
+    yield test_store
+    test_store.close()
+
+def _restore(open_id: str):
+    return VideoSync(max_videos=100)._load_stored(open_id)
+
+def test_videos_without_sync_state_are_not_restored(sync_store):
+    sync_store.upsert_videos([{"id": "detail_only", "create_time": 1}], "no_state_test")
+
+    # 動画詳細ページなどで個別に保存された動画だけでは一覧が欠けているため、APIから取得し直す
+    assert _restore("no_state_test") is None
+
+def test_interrupted_backfill_resumes_from_stored_cursor(sync_store):
+    open_id = "resume_backfill_test"
+    access_token = f"act.fake.{open_id}"
+    first = VideoSync(max_videos=100)
+    first._fetch_first_page(access_token, open_id)
+
+    # 残りのページを取得する前に停止した場合、保存済みのカーソルから再開する
+    account = _restore(open_id)
+    assert len(account.videos) == 5
+    assert account.backfill_cursor is not None
+
+    resumed = VideoSync(max_videos=100)
+    resumed._accounts[open_id] = account
+    resumed._backfill(access_token, open_id, account)
+    assert len(account.videos) == 15
+
+    # 最後まで取得した後は、保存済みの全件をそのまま復元する
+    restored = _restore(open_id)
+    assert len(restored.videos) == 15
+    assert restored.backfill_cursor is None
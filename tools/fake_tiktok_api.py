@@ -0,0 +1,584 @@
+"""ローカル用のTikTok API代替サーバー
+
+アプリが利用するエンドポイント（oauth/token, user/info, video/list, video/query,
+creator_info, 投稿初期化, アップロードPUT, status/fetch）を実装し、
+レイテンシ分布・エラー率・レート制限（429）・大規模な動画カタログを再現できる。
+実際の認証情報なしで負荷試験やベンチマークを行うためのもの。
+
+使い方:
+    python -m tools.fake_tiktok_api --port 8765 --videos 5000 --latency-ms 80 --error-rate 0.01
+
+アプリの接続先を切り替える（.env）:
+    TIKTOK_API_BASE_URL=http://127.0.0.1:8765
+    TIKTOK_AUTH_URL=http://127.0.0.1:8765/v2/auth/authorize
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+# エンドポイントごとのレート制限（リクエスト数/分）: TikTok APIの公開値に合わせる
+DEFAULT_RATE_LIMITS = {
+    "user/info": 600,
+    "video/list": 600,
+    "video/query": 600,
+    "creator_info": 20,
+    "publish/init": 6,
+    "status/fetch": 30,
+}
+
+# 動画一覧・詳細で返せるフィールド
+VIDEO_FIELDS = (
+    "id", "title", "video_description", "duration", "cover_image_url", "embed_link",
+    "embed_html", "share_url", "view_count", "like_count", "comment_count", "share_count",
+    "create_time", "height", "width",
+)
+
+# video/list, video/query の1回あたりの上限件数
+MAX_PAGE_SIZE = 20
+
+class FakeApiOptions:
+    """代替サーバーの動作設定"""
+
+    def __init__(self, videos: int = 200, latency_ms: float = 0.0, latency_dist: str = "fixed",
+                 latency_jitter_ms: float = 0.0, endpoint_latency_ms: Optional[Dict[str, float]] = None,
+                 error_rate: float = 0.0, rate_limits: Optional[Dict[str, int]] = None,
+                 rate_limit_scale: float = 1.0, new_videos_per_minute: float = 0.0,
+                 views_per_minute: float = 0.0, seed: int = 0):
+        """
+        Args:
+            videos: アカウントごとの動画数
+            latency_ms: 基準レイテンシ（ミリ秒）
+            latency_dist: レイテンシ分布（fixed, uniform, normal, lognormal）
+            latency_jitter_ms: 分布の広がり（uniformは±幅、normalは標準偏差、lognormalはσ×基準値）
+            endpoint_latency_ms: エンドポイントごとの基準レイテンシ上書き
+            error_rate: 5xxを返す確率（0〜1）
+            rate_limits: エンドポイントごとのレート制限（リクエスト数/分、0で無制限）
+            rate_limit_scale: レート制限の倍率（0で無効）
+            new_videos_per_minute: 起動後に1分あたり追加される新着動画数
+            views_per_minute: 1分あたりに各動画の再生数が増える量
+            seed: 乱数シード（カタログと障害注入の再現用）
+        """
+        self.videos = videos
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_jitter_ms = latency_jitter_ms
+        self.endpoint_latency_ms = endpoint_latency_ms or {}
+        self.error_rate = error_rate
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits)
+        self.rate_limit_scale = rate_limit_scale
+        self.new_videos_per_minute = new_videos_per_minute
+        self.views_per_minute = views_per_minute
+        self.seed = seed
+
+class _Catalog:
+    """アカウントごとの合成動画カタログ（作成日時の新しい順）"""
+
+    def __init__(self, open_id: str, options: FakeApiOptions, started_at: float):
+        self.open_id = open_id
+        self.options = options
+        self.started_at = started_at
+        seed = int(hashlib.sha256(f"{options.seed}:{open_id}".encode()).hexdigest()[:12], 16)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        # 起動時点より前に投稿された動画（新しい順、作成日時は重複しない）
+        newest = int(started_at) - 60
+        self.videos: List[Dict[str, Any]] = []
+        create_time = newest
+        for index in range(options.videos):
+            create_time -= self.rng.randint(600, 3 * 86400)
+            self.videos.append(self._make_video(index, create_time))
+        self.by_id = {video["id"]: video for video in self.videos}
+        self.added = 0
+
+    def _make_video(self, index: int, create_time: int) -> Dict[str, Any]:
+        """合成動画を1件作成"""
+        video_id = str(7000000000000000000 + int(hashlib.sha256(f"{self.open_id}:{index}:{create_time}".encode()).hexdigest()[:15], 16) % 10 ** 18)
+        views = int(self.rng.lognormvariate(8, 1.5))
+        return {
+            "id": video_id,
+            "title": f"Synthetic video #{index}",
+            "video_description": f"Synthetic video #{index} #fake",
+            "duration": self.rng.randint(5, 180),
+            "cover_image_url": f"https://picsum.photos/seed/{video_id}/540/960",
+            "embed_link": f"https://www.tiktok.com/embed/v2/{video_id}",
+            "embed_html": "",
+            "share_url": f"https://www.tiktok.com/@fake/video/{video_id}",
+            "view_count": views,
+            "like_count": int(views * self.rng.uniform(0.01, 0.15)),
+            "comment_count": int(views * self.rng.uniform(0.0005, 0.01)),
+            "share_count": int(views * self.rng.uniform(0.0005, 0.02)),
+            "create_time": create_time,
+            "height": 1920,
+            "width": 1080,
+        }
+
+    def refresh(self) -> None:
+        """経過時間に応じて新着動画を追加"""
+        if self.options.new_videos_per_minute <= 0:
+            return
+        elapsed_minutes = (time.time() - self.started_at) / 60
+        expected = int(elapsed_minutes * self.options.new_videos_per_minute)
+        with self.lock:
+            while self.added < expected:
+                self.added += 1
+                newest = self.videos[0]["create_time"] if self.videos else int(time.time())
+                create_time = max(newest + 1, int(time.time()))
+                video = self._make_video(self.options.videos + self.added, create_time)
+                self.videos.insert(0, video)
+                self.by_id[video["id"]] = video
+
+    def view(self, video: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+        """指定フィールドのみを含む動画データ（統計は経過時間に応じて増加）"""
+        result = {field: video[field] for field in fields if field in video}
+        if self.options.views_per_minute > 0:
+            growth = int((time.time() - max(self.started_at, video["create_time"])) / 60 * self.options.views_per_minute)
+            if "view_count" in result:
+                result["view_count"] += growth
+            if "like_count" in result:
+                result["like_count"] += growth // 20
+        return result
+
+    def page(self, cursor: Optional[int], max_count: int) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """カーソル（UTCミリ秒）より古い動画を1ページ分取得"""
+        self.refresh()
+        with self.lock:
+            videos = self.videos
+            start = 0
+            if cursor:
+                # 作成日時の降順リストから、カーソルより古い最初の位置を二分探索
+                low, high = 0, len(videos)
+                while low < high:
+                    mid = (low + high) // 2
+                    if videos[mid]["create_time"] * 1000 >= cursor:
+                        low = mid + 1
+                    else:
+                        high = mid
+                start = low
+            items = videos[start:start + max_count]
+            has_more = start + max_count < len(videos)
+        next_cursor = items[-1]["create_time"] * 1000 if items else (cursor or 0)
+        return items, next_cursor, has_more
+
+class FakeTikTokApi:
+    """代替サーバーの状態（カタログ・レート制限・アップロード）"""
+
+    def __init__(self, options: FakeApiOptions):
+        self.options = options
+        self.started_at = time.time()
+        self.rng = random.Random(options.seed)
+        self.lock = threading.Lock()
+        self.catalogs: Dict[str, _Catalog] = {}
+        self.buckets: Dict[Tuple[str, str], List[float]] = {}
+        self.uploads: Dict[str, Dict[str, Any]] = {}
+        self.publish_count = 0
+        self.request_counts: Dict[str, int] = {}
+
+    def catalog(self, open_id: str) -> _Catalog:
+        with self.lock:
+            catalog = self.catalogs.get(open_id)
+            if catalog is None:
+                catalog = self.catalogs[open_id] = _Catalog(open_id, self.options, self.started_at)
+            return catalog
+
+    def latency(self, endpoint: str) -> float:
+        """注入するレイテンシ（秒）"""
+        base = self.options.endpoint_latency_ms.get(endpoint, self.options.latency_ms)
+        jitter = self.options.latency_jitter_ms
+        with self.lock:
+            if self.options.latency_dist == "uniform":
+                value = self.rng.uniform(base - jitter, base + jitter)
+            elif self.options.latency_dist == "normal":
+                value = self.rng.gauss(base, jitter)
+            elif self.options.latency_dist == "lognormal" and base > 0:
+                value = self.rng.lognormvariate(0, jitter / base if jitter else 0.5) * base
+            else:
+                value = base
+        return max(value, 0.0) / 1000
+
+    def should_fail(self) -> bool:
+        """5xxを注入するかどうか"""
+        if self.options.error_rate <= 0:
+            return False
+        with self.lock:
+            return self.rng.random() < self.options.error_rate
+
+    def take_rate_limit(self, token: str, endpoint: str) -> Optional[float]:
+        """レート制限の枠を消費（超過時は再試行までの秒数を返す）"""
+        limit = self.options.rate_limits.get(endpoint, 0) * self.options.rate_limit_scale
+        if limit <= 0:
+            return None
+        capacity = max(limit, 1.0)
+        rate = capacity / 60
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.get((token, endpoint), [capacity, now])
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens < 1:
+                self.buckets[(token, endpoint)] = [tokens, now]
+                return (1 - tokens) / rate
+            self.buckets[(token, endpoint)] = [tokens - 1, now]
+        return None
+
+    def count(self, endpoint: str) -> None:
+        with self.lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+def _open_id_from_token(token: str) -> str:
+    """アクセストークンから open_id を導出（act.fake.<open_id> 形式、それ以外はハッシュ）"""
+    if token.startswith("act.fake."):
+        return token[len("act.fake."):]
+    return "fake_" + hashlib.sha256(token.encode()).hexdigest()[:16]
+
+def _make_handler(api: FakeTikTokApi):
+    """APIの状態を束縛したリクエストハンドラーを作成"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        # --- 共通処理 ---
+
+        def _read_body(self) -> bytes:
+            length = int(self.headers.get("Content-Length", 0) or 0)
+            return self.rfile.read(length) if length else b""
+
+        def _read_json(self) -> Dict[str, Any]:
+            body = self._read_body()
+            try:
+                return json.loads(body) if body else {}
+            except ValueError:
+                return {}
+
+        def _send(self, status: int, payload: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _ok(self, data: Dict[str, Any]) -> None:
+            self._send(200, {"data": data, "error": {"code": "ok", "message": "", "log_id": "fake"}})
+
+        def _error(self, status: int, code: str, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+            self._send(status, {"error": {"code": code, "message": message, "log_id": "fake"}}, headers)
+
+        def _token(self) -> Optional[str]:
+            auth = self.headers.get("Authorization", "")
+            return auth[len("Bearer "):] if auth.startswith("Bearer ") else None
+
+        def _guard(self, endpoint: str) -> Optional[str]:
+            """認証・レイテンシ・障害・レート制限を適用（続行できる場合はトークンを返す）"""
+            api.count(endpoint)
+            token = self._token()
+            if not token:
+                self._read_body()
+                self._error(401, "access_token_invalid", "The access token is invalid or not found in the request.")
+                return None
+            time.sleep(api.latency(endpoint))
+            retry_after = api.take_rate_limit(token, endpoint)
+            if retry_after is not None:
+                self._read_body()
+                self._error(429, "rate_limit_exceeded", "API rate limit was exceeded.",
+                            {"Retry-After": str(max(int(retry_after + 0.999), 1))})
+                return None
+            if api.should_fail():
+                self._read_body()
+                self._error(503, "internal_error", "Injected failure.")
+                return None
+            return token
+
+        def _fields(self, query: Dict[str, List[str]]) -> List[str]:
+            raw = query.get("fields", [""])[0]
+            return [field for field in raw.split(",") if field]
+
+        # --- ルーティング ---
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            query = parse_qs(parts.query)
+            if parts.path == "/v2/auth/authorize/" or parts.path == "/v2/auth/authorize":
+                self._authorize(query)
+            elif parts.path == "/v2/user/info/":
+                self._user_info(query)
+            elif parts.path == "/_fake/stats":
+                with api.lock:
+                    self._send(200, {"requests": dict(api.request_counts), "uploads": len(api.uploads),
+                                     "publishes": api.publish_count})
+            else:
+                self._error(404, "not_found", f"Unknown path: {parts.path}")
+
+        def do_POST(self):
+            parts = urlsplit(self.path)
+            query = parse_qs(parts.query)
+            routes = {
+                "/v2/oauth/token/": self._oauth_token,
+                "/v2/video/list/": self._video_list,
+                "/v2/video/query/": self._video_query,
+                "/v2/post/publish/creator_info/query/": self._creator_info,
+                "/v2/post/publish/video/init/": self._publish_init,
+                "/v2/post/publish/inbox/video/init/": self._publish_init,
+                "/v2/post/publish/status/fetch/": self._status_fetch,
+            }
+            handler = routes.get(parts.path)
+            if handler is None:
+                self._read_body()
+                self._error(404, "not_found", f"Unknown path: {parts.path}")
+                return
+            handler(query)
+
+        def do_PUT(self):
+            parts = urlsplit(self.path)
+            if parts.path == "/upload/":
+                self._upload(parse_qs(parts.query))
+            else:
+                self._read_body()
+                self._error(404, "not_found", f"Unknown path: {parts.path}")
+
+        # --- エンドポイント ---
+
+        def _authorize(self, query: Dict[str, List[str]]) -> None:
+            """認可画面の代わりに即座にコールバックへリダイレクト"""
+            redirect_uri = query.get("redirect_uri", [""])[0]
+            state = query.get("state", [""])[0]
+            code = "fakecode." + hashlib.sha256(str(time.time()).encode()).hexdigest()[:8]
+            self.send_response(302)
+            self.send_header("Location", f"{redirect_uri}?{urlencode({'code': code, 'state': state})}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def _oauth_token(self, query) -> None:
+            api.count("oauth/token")
+            body = parse_qs(self._read_body().decode("utf-8"))
+            code = body.get("code", [""])[0]
+            if not code:
+                self._error(400, "invalid_request", "code is required")
+                return
+            time.sleep(api.latency("oauth/token"))
+            open_id = "fake_" + hashlib.sha256(code.encode()).hexdigest()[:16]
+            self._send(200, {
+                "access_token": f"act.fake.{open_id}",
+                "open_id": open_id,
+                "expires_in": 86400,
+                "refresh_token": f"rft.fake.{open_id}",
+                "refresh_expires_in": 31536000,
+                "scope": "user.info.basic,user.info.profile,user.info.stats,video.list,video.publish,video.upload",
+                "token_type": "Bearer",
+            })
+
+        def _user_info(self, query) -> None:
+            token = self._guard("user/info")
+            if token is None:
+                return
+            open_id = _open_id_from_token(token)
+            catalog = api.catalog(open_id)
+            user = {
+                "open_id": open_id,
+                "union_id": f"union_{open_id}",
+                "display_name": f"Fake {open_id[-6:]}",
+                "username": f"fake_{open_id[-6:]}",
+                "avatar_url": f"https://picsum.photos/seed/{open_id}/200/200",
+                "bio_description": "Synthetic account served by tools.fake_tiktok_api",
+                "profile_web_link": f"https://www.tiktok.com/@fake_{open_id[-6:]}",
+                "profile_deep_link": f"https://vm.tiktok.com/fake_{open_id[-6:]}",
+                "is_verified": False,
+                "follower_count": 1000 + len(catalog.videos) * 37,
+                "following_count": 120,
+                "likes_count": sum(video["like_count"] for video in catalog.videos[:1000]),
+                "video_count": len(catalog.videos),
+            }
+            fields = self._fields(query) or list(user)
+            self._ok({"user": {field: user[field] for field in fields if field in user}})
+
+        def _video_list(self, query) -> None:
+            token = self._guard("video/list")
+            if token is None:
+                return
+            body = self._read_json()
+            max_count = min(int(body.get("max_count") or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+            cursor = body.get("cursor")
+            catalog = api.catalog(_open_id_from_token(token))
+            items, next_cursor, has_more = catalog.page(int(cursor) if cursor else None, max_count)
+            fields = self._fields(query) or ["id"]
+            self._ok({
+                "videos": [catalog.view(video, fields) for video in items],
+                "cursor": next_cursor,
+                "has_more": has_more,
+            })
+
+        def _video_query(self, query) -> None:
+            token = self._guard("video/query")
+            if token is None:
+                return
+            body = self._read_json()
+            video_ids = ((body.get("filters") or {}).get("video_ids")) or []
+            if len(video_ids) > MAX_PAGE_SIZE:
+                self._error(400, "invalid_params", f"video_ids must contain at most {MAX_PAGE_SIZE} ids")
+                return
+            catalog = api.catalog(_open_id_from_token(token))
+            catalog.refresh()
+            fields = self._fields(query) or ["id"]
+            videos = [catalog.view(catalog.by_id[video_id], fields) for video_id in video_ids if video_id in catalog.by_id]
+            self._ok({"videos": videos, "cursor": 0, "has_more": False})
+
+        def _creator_info(self, query) -> None:
+            token = self._guard("creator_info")
+            if token is None:
+                return
+            self._read_body()
+            open_id = _open_id_from_token(token)
+            self._ok({
+                "creator_avatar_url": f"https://picsum.photos/seed/{open_id}/200/200",
+                "creator_username": f"fake_{open_id[-6:]}",
+                "creator_nickname": f"Fake {open_id[-6:]}",
+                "privacy_level_options": ["FOLLOWER_OF_CREATOR", "MUTUAL_FOLLOW_FRIENDS", "SELF_ONLY"],
+                "comment_disabled": False,
+                "duet_disabled": False,
+                "stitch_disabled": False,
+                "max_video_post_duration_sec": 600,
+            })
+
+        def _publish_init(self, query) -> None:
+            token = self._guard("publish/init")
+            if token is None:
+                return
+            body = self._read_json()
+            source = body.get("source_info") or {}
+            with api.lock:
+                api.publish_count += 1
+                number = api.publish_count
+            publish_id = f"v_pub_file~v2-1.{7500000000000000000 + number}"
+            upload_id = hashlib.sha256(publish_id.encode()).hexdigest()[:16]
+            with api.lock:
+                api.uploads[upload_id] = {
+                    "publish_id": publish_id,
+                    "open_id": _open_id_from_token(token),
+                    "video_size": int(source.get("video_size") or 0),
+                    "received": 0,
+                    "chunks": {},
+                }
+            host = self.headers.get("Host", "127.0.0.1")
+            self._ok({"publish_id": publish_id, "upload_url": f"http://{host}/upload/?upload_id={upload_id}"})
+
+        def _upload(self, query) -> None:
+            api.count("upload")
+            time.sleep(api.latency("upload"))
+            data = self._read_body()
+            upload_id = query.get("upload_id", [""])[0]
+            with api.lock:
+                upload = api.uploads.get(upload_id)
+            if upload is None:
+                self._error(404, "not_found", "Unknown upload_id")
+                return
+            if api.should_fail():
+                self._error(503, "internal_error", "Injected failure.")
+                return
+            # 受信したバイト数は失敗させなかったチャンクのみを数え、同じContent-Rangeの再送は上書きにする
+            content_range = self.headers.get("Content-Range", "")
+            with api.lock:
+                upload["chunks"][content_range] = len(data)
+                upload["received"] = sum(upload["chunks"].values())
+                received = upload["received"]
+            self._send(201 if received >= upload["video_size"] else 206)
+
+        def _status_fetch(self, query) -> None:
+            token = self._guard("status/fetch")
+            if token is None:
+                return
+            body = self._read_json()
+            publish_id = body.get("publish_id")
+            with api.lock:
+                upload = next((u for u in api.uploads.values() if u["publish_id"] == publish_id), None)
+            if upload is None:
+                self._error(400, "invalid_publish_id", "Unknown publish_id")
+                return
+            status = "PUBLISH_COMPLETE" if upload["received"] >= upload["video_size"] else "PROCESSING_UPLOAD"
+            self._ok({"status": status, "uploaded_bytes": upload["received"]})
+
+    return Handler
+
+class FakeTikTokServer:
+    """代替サーバーをバックグラウンドスレッドで起動する"""
+
+    def __init__(self, options: Optional[FakeApiOptions] = None, host: str = "127.0.0.1", port: int = 0):
+        self.api = FakeTikTokApi(options or FakeApiOptions())
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self.api))
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTikTokServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def _parse_endpoint_latency(values: List[str]) -> Dict[str, float]:
+    """--endpoint-latency video/query=200 形式を解析"""
+    result = {}
+    for value in values:
+        endpoint, _, ms = value.partition("=")
+        result[endpoint] = float(ms)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--videos", type=int, default=200, help="アカウントごとの動画数")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="基準レイテンシ（ミリ秒）")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "normal", "lognormal"], default="fixed")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0, help="レイテンシ分布の広がり（ミリ秒）")
+    parser.add_argument("--endpoint-latency", action="append", default=[], metavar="ENDPOINT=MS",
+                        help="エンドポイント別の基準レイテンシ（例: video/query=200）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="5xxを返す確率（0〜1）")
+    parser.add_argument("--rate-limit-scale", type=float, default=1.0,
+                        help="レート制限の倍率（0で無効、0.1でTikTokの1/10）")
+    parser.add_argument("--new-videos-per-minute", type=float, default=0.0, help="1分あたりの新着動画数")
+    parser.add_argument("--views-per-minute", type=float, default=0.0, help="1分あたりの各動画の再生数増加")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    args = parser.parse_args()
+
+    options = FakeApiOptions(
+        videos=args.videos,
+        latency_ms=args.latency_ms,
+        latency_dist=args.latency_dist,
+        latency_jitter_ms=args.latency_jitter_ms,
+        endpoint_latency_ms=_parse_endpoint_latency(args.endpoint_latency),
+        error_rate=args.error_rate,
+        rate_limit_scale=args.rate_limit_scale,
+        new_videos_per_minute=args.new_videos_per_minute,
+        views_per_minute=args.views_per_minute,
+        seed=args.seed,
+    )
+    server = FakeTikTokServer(options, host=args.host, port=args.port)
+    print(f"Fake TikTok API: {server.base_url}")
+    print(f"  TIKTOK_API_BASE_URL={server.base_url}")
+    print(f"  TIKTOK_AUTH_URL={server.base_url}/v2/auth/authorize")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()